@@ -3,6 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 import os
@@ -39,6 +40,10 @@ def decode_access_token(token: str):
     except JWTError:
         return None
 
+def token_digest(token: str) -> bytes:
+    """SHA-256 digest of a JWT; the blacklist table stores this instead of the raw token"""
+    return hashlib.sha256(token.encode()).digest()
+
 async def blacklist_token(token: str, exp: Optional[datetime] = None, db: Optional[AsyncSession] = None):
     """Blacklist a JWT token until its expiration"""
     if db is None:
@@ -50,7 +55,7 @@ async def blacklist_token(token: str, exp: Optional[datetime] = None, db: Option
     expires_at = exp if exp else datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
     
     blacklist_entry = TokenBlacklist(
-        token=token,
+        token=token_digest(token),
         expires_at=expires_at
     )
     
@@ -64,7 +69,7 @@ async def is_token_blacklisted(token: str, db: Optional[AsyncSession] = None) ->
         async for session in get_postgres_db():
             db = session
             try:
-                query = select(TokenBlacklist).where(TokenBlacklist.token == token)
+                query = select(TokenBlacklist).where(TokenBlacklist.token == token_digest(token))
                 result = await db.execute(query)
                 existing = result.scalar_one_or_none()
                 if not existing:
@@ -80,7 +85,7 @@ async def is_token_blacklisted(token: str, db: Optional[AsyncSession] = None) ->
             break
         return False
     else:
-        query = select(TokenBlacklist).where(TokenBlacklist.token == token)
+        query = select(TokenBlacklist).where(TokenBlacklist.token == token_digest(token))
         result = await db.execute(query)
         existing = result.scalar_one_or_none()
         if not existing:
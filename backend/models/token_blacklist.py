@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Index
+from sqlalchemy import Column, Integer, LargeBinary, DateTime, Index
 from datetime import datetime
 from config.database import Base
 
@@ -6,10 +6,10 @@ class TokenBlacklist(Base):
     __tablename__ = "token_blacklist"
     
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String(500), unique=True, nullable=False, index=True)
+    token = Column(LargeBinary(32), unique=True, nullable=False, index=True)  # Raw SHA-256 digest of the JWT
     expires_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     def __repr__(self):
-        return f"<TokenBlacklist(id={self.id}, token='{self.token[:20]}...')>"
+        return f"<TokenBlacklist(id={self.id}, token='{self.token[:6].hex()}...')>"
 
@@ -2,6 +2,7 @@
 Database Connection and Schema Verification Script
 This script checks database connection and ensures all tables are created
 """
+import argparse
 import asyncio
 import sys
 import os
@@ -13,18 +14,39 @@ if sys.platform == 'win32':
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent))
+# Add parent directory to path to allow imports from src
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from dotenv import load_dotenv
-load_dotenv()
-
-from config.database import (
-    POSTGRES_HOST, POSTGRES_PORT, POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD,
-    engine, Base, init_postgres_db
-)
+from src.config.settings import settings
+from src.config.database import engine, Base, init_postgres_db, warm_pool
 from sqlalchemy import text, inspect
-from models import resume, jd_analysis, user_db, token_blacklist
+from src.models import resume, jd_analysis, user_db, token_blacklist
+
+POSTGRES_HOST = settings._clean_postgres_host
+POSTGRES_PORT = settings._clean_postgres_port
+POSTGRES_DB = settings._clean_postgres_db
+POSTGRES_USER = settings._clean_postgres_user
+POSTGRES_PASSWORD = settings._clean_postgres_password
+
+# Bump whenever init_postgres_db() gains new tables or indexes
+SCHEMA_VERSION = "2026_10_16"
+
+# Local marker recording the last schema version this checkout applied
+MIGRATION_STATE_FILE = Path(__file__).resolve().parent.parent / ".migration_state"
+
+REQUIRED_TABLES = [
+    'users',
+    'resumes',
+    'jd_analysis',
+    'match_results',
+    'token_blacklist'
+]
+
+# Non-table relations created by init_postgres_db()'s DDL
+REQUIRED_RELATIONS = [
+    'resume_skill_summary',
+    'freelancer_seq'
+]
 
 async def check_connection():
     """Test database connection"""
@@ -40,6 +62,7 @@ async def check_connection():
     
     # First, try to create database if it doesn't exist
     import psycopg2
+    from psycopg2 import sql
     from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
     
     try:
@@ -55,12 +78,12 @@ async def check_connection():
         cursor = conn.cursor()
         
         # Check if database exists
-        cursor.execute(f"SELECT 1 FROM pg_database WHERE datname = '{POSTGRES_DB}'")
+        cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s", (POSTGRES_DB,))
         exists = cursor.fetchone()
         
         if not exists:
             # Create database
-            cursor.execute(f'CREATE DATABASE "{POSTGRES_DB}"')
+            cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(POSTGRES_DB)))
             print(f"[OK] Created database '{POSTGRES_DB}'")
         else:
             print(f"[OK] Database '{POSTGRES_DB}' already exists")
@@ -85,7 +108,9 @@ async def check_connection():
             version = result.scalar()
             print(f"[OK] Database connection successful!")
             print(f"   PostgreSQL version: {version.split(',')[0]}")
-            return True
+        await warm_pool()
+        print(f"[OK] Connection pool warmed ({settings.db_pool_size} connections)")
+        return True
     except Exception as e:
         print(f"[ERROR] Database connection failed!")
         print(f"   Error: {e}")
@@ -100,7 +125,7 @@ async def check_database_exists():
     try:
         async with engine.begin() as conn:
             result = await conn.execute(
-                text(f"SELECT 1 FROM pg_database WHERE datname = '{POSTGRES_DB}'")
+                text("SELECT 1 FROM pg_database WHERE datname = :n").bindparams(n=POSTGRES_DB)
             )
             exists = result.scalar()
             if exists:
@@ -119,13 +144,7 @@ async def check_tables():
     print("TABLE EXISTENCE CHECK")
     print("=" * 60)
     
-    required_tables = [
-        'users',
-        'resumes',
-        'jd_analysis',
-        'match_results',
-        'token_blacklist'
-    ]
+    required_tables = REQUIRED_TABLES
     
     try:
         async with engine.begin() as conn:
@@ -165,10 +184,22 @@ async def check_indexes():
         'idx_resumes_skills',
         'idx_resumes_uploaded_at',
         'idx_resumes_source_type',
-        'idx_match_results_job_id',
-        'idx_match_results_score',
-        'idx_users_email',
-        'idx_token_blacklist_token'
+        'idx_resumes_meta_data_gin',
+        'idx_resumes_parsed_data_gin',
+        'idx_resumes_company_source_id',
+        'idx_resumes_gmail_source_id',
+        'idx_resumes_company_uploaded_at',
+        'idx_submitted_at',
+        'idx_jd_extracted_keywords',
+        'idx_jd_required_skills',
+        'idx_jd_preferred_skills',
+        'idx_match_results_job_score',
+        'idx_match_results_resume_id',
+        'idx_match_results_source_type',
+        'idx_resume_skill_summary_key',
+        'ix_users_email',
+        'ix_token_blacklist_token',
+        'idx_token_blacklist_expires_at'
     ]
     
     try:
@@ -200,15 +231,46 @@ async def check_indexes():
         return False
 
 async def build_schema():
-    """Build database schema"""
+    """Build database schema unless the current schema version is already recorded"""
     print("\n" + "=" * 60)
     print("BUILDING DATABASE SCHEMA")
     print("=" * 60)
     
     try:
+        async with engine.begin() as conn:
+            await conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version VARCHAR(32) PRIMARY KEY,
+                    applied_at TIMESTAMP NOT NULL DEFAULT NOW()
+                );
+            """))
+            result = await conn.execute(
+                text("SELECT 1 FROM schema_migrations WHERE version = :v").bindparams(v=SCHEMA_VERSION)
+            )
+            if result.scalar():
+                print(f"[OK] Schema version {SCHEMA_VERSION} already applied, skipping")
+                MIGRATION_STATE_FILE.write_text(SCHEMA_VERSION)
+                return True
+        
         # Initialize database (creates tables and indexes)
-        await init_postgres_db()
-        print("[OK] Schema initialization completed!")
+        if not await init_postgres_db():
+            print("[ERROR] Schema initialization failed (see the log above)")
+            return False
+        
+        # Confirm the tables, view and sequence exist before recording the version as applied
+        async with engine.begin() as conn:
+            for relation in REQUIRED_TABLES + REQUIRED_RELATIONS:
+                result = await conn.execute(
+                    text("SELECT to_regclass(:t)").bindparams(t=f"public.{relation}")
+                )
+                if result.scalar() is None:
+                    print(f"[ERROR] '{relation}' missing after schema initialization")
+                    return False
+            await conn.execute(
+                text("INSERT INTO schema_migrations (version) VALUES (:v) ON CONFLICT DO NOTHING").bindparams(v=SCHEMA_VERSION)
+            )
+        MIGRATION_STATE_FILE.write_text(SCHEMA_VERSION)
+        print(f"[OK] Schema initialization completed (version {SCHEMA_VERSION})!")
         return True
     except Exception as e:
         print(f"[ERROR] Error building schema: {e}")
@@ -216,8 +278,12 @@ async def build_schema():
         traceback.print_exc()
         return False
 
-async def main():
+async def main(verify: bool = False, skip_if_cached: bool = False):
     """Main function"""
+    if skip_if_cached and MIGRATION_STATE_FILE.exists() and MIGRATION_STATE_FILE.read_text().strip() == SCHEMA_VERSION:
+        print(f"[OK] Schema version {SCHEMA_VERSION} recorded in {MIGRATION_STATE_FILE.name}, nothing to do")
+        return True
+
     print("\n" + "=" * 60)
     print("TECHBANK.AI DATABASE SETUP & VERIFICATION")
     print("=" * 60)
@@ -248,6 +314,10 @@ async def main():
         print("\n❌ Schema build failed!")
         return False
     
+    if not verify:
+        print("\n[OK] Database is ready! Re-run with --verify to list tables and indexes.")
+        return True
+    
     # Step 4: Verify tables
     all_tables_exist, missing = await check_tables()
     
@@ -273,8 +343,13 @@ async def main():
     return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check database connection and build schema")
+    parser.add_argument("--verify", action="store_true", help="List existing tables and indexes after setup")
+    parser.add_argument("--skip-if-cached", action="store_true",
+                        help=f"Exit immediately if {MIGRATION_STATE_FILE.name} already records the current schema version")
+    args = parser.parse_args()
     try:
-        result = asyncio.run(main())
+        result = asyncio.run(main(verify=args.verify, skip_if_cached=args.skip_if_cached))
         sys.exit(0 if result else 1)
     except KeyboardInterrupt:
         print("\n\n[WARNING] Interrupted by user")
@@ -1,17 +1,18 @@
 import asyncio
 from sqlalchemy import select
 from src.models.user_db import User
-from src.config.database import get_postgres_db
+from src.config.database import AsyncSessionLocal
 
 async def main():
-    async for session in get_postgres_db():
-        query = select(User)
-        result = await session.execute(query)
-        users = result.scalars().all()
-        print(f"Found {len(users)} users:")
-        for user in users:
+    async with AsyncSessionLocal() as session:
+        # Stream rows in batches so memory stays bounded regardless of user count
+        query = select(User.id, User.email, User.mode).order_by(User.id).execution_options(yield_per=500)
+        result = await session.stream(query)
+        count = 0
+        async for user in result:
             print(f"ID: {user.id}, Email: {user.email}, Mode: {user.mode}")
-        break
+            count += 1
+        print(f"Found {count} users.")
 
 if __name__ == "__main__":
     asyncio.run(main())
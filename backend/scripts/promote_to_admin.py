@@ -1,22 +1,20 @@
 import asyncio
 import sys
-from sqlalchemy import select
+from sqlalchemy import update
 from src.models.user_db import User
-from src.config.database import get_postgres_db
+from src.config.database import AsyncSessionLocal
 
 async def promote(email):
-    async for session in get_postgres_db():
-        query = select(User).where(User.email == email)
-        result = await session.execute(query)
-        user = result.scalar_one_or_none()
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            update(User).where(User.email == email).values(mode="admin")
+        )
+        await session.commit()
         
-        if user:
-            user.mode = "admin"
-            await session.commit()
+        if result.rowcount:
             print(f"Successfully promoted {email} to admin.")
         else:
             print(f"User {email} not found.")
-        break
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
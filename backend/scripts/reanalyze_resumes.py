@@ -1,4 +1,5 @@
 import asyncio
+import hashlib
 import sys
 import os
 
@@ -17,6 +18,8 @@ from src.utils.logger import get_logger
 
 logger = get_logger("reanalyze_resumes")
 
+ANALYZED_MODEL = openai_service.OPENAI_MODEL
+
 async def reanalyze_resume_id(resume_id, current_index, total_count):
     async with AsyncSessionLocal() as session:
         try:
@@ -51,6 +54,14 @@ async def reanalyze_resume_id(resume_id, current_index, total_count):
             if not raw_text or len(raw_text.strip()) < 50:
                 logger.warning(f"⚠️ Resume {resume.id} has insufficient text. Skipping.")
                 return False
+
+            # Skip resumes already analyzed from identical text with the current model
+            raw_text_sha256 = hashlib.sha256(raw_text.encode()).hexdigest()
+            meta = resume.meta_data or {}
+            if (meta.get('raw_text_sha256') == raw_text_sha256
+                    and meta.get('last_analyzed_model') == ANALYZED_MODEL):
+                logger.info(f"⏭️ {resume.filename} unchanged since last analysis. Skipping.")
+                return True
             
             # 2. Use updated GPT-4o parser
             parsed_data = await openai_service.parse_resume_with_gpt(raw_text)
@@ -72,7 +83,8 @@ async def reanalyze_resume_id(resume_id, current_index, total_count):
             if resume.meta_data is None:
                 resume.meta_data = {}
             temp_meta = dict(resume.meta_data)
-            temp_meta['last_analyzed_model'] = 'gpt-4o'
+            temp_meta['last_analyzed_model'] = ANALYZED_MODEL
+            temp_meta['raw_text_sha256'] = raw_text_sha256
             resume.meta_data = temp_meta
             
             # 4. Repopulate work history (Experiences)
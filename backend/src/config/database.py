@@ -1,13 +1,20 @@
 """Database configuration and connection management."""
+import asyncio
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import text
+from sqlalchemy import text, DateTime
 from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 from typing import AsyncGenerator
 
 from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 def create_database_if_not_exists():
     """Create the database if it doesn't exist (sync operation for startup)."""
@@ -24,7 +31,10 @@ def create_database_if_not_exists():
             port=url.port,
             user=url.username,
             password=url.password,
-            database="postgres"
+            database="postgres",
+            # Runs in a worker thread (see init_postgres_db) that cancellation can't interrupt,
+            # so bound the wait for an unreachable server
+            connect_timeout=10
         )
         conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
         cursor = conn.cursor()
@@ -34,11 +44,10 @@ def create_database_if_not_exists():
         exists = cursor.fetchone()
         
         if not exists:
-            # Create database (use identifier quoting for safety)
-            # Note: CREATE DATABASE doesn't support parameterization, so we validate the name
+            # Create database (CREATE DATABASE can't take a bound parameter, so quote the identifier)
             if not target_db.replace('_', '').replace('-', '').isalnum():
                 raise ValueError(f"Invalid database name: {target_db}")
-            cursor.execute(f'CREATE DATABASE "{target_db}"')
+            cursor.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(target_db)))
             print(f"✅ Created database '{target_db}'")
         else:
             print(f"✅ Database '{target_db}' already exists")
@@ -63,7 +72,22 @@ def create_database_if_not_exists():
 # Use the centralized async URL from settings (which handles encoding and whitespace)
 engine = create_async_engine(
     settings.async_database_url,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
     pool_pre_ping=True,
+    pool_recycle=settings.db_pool_recycle,
+    # Room for every distinct statement the app issues, so none is recompiled after eviction
+    query_cache_size=settings.db_query_cache_size,
+    connect_args={
+        # Server-side prepared statements reused per connection (asyncpg's default keeps 100)
+        "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+        # Keep idle pooled connections alive through NAT/firewall timeouts
+        "server_settings": {
+            "tcp_keepalives_idle": "30",
+            "tcp_keepalives_interval": "10",
+        }
+    },
     echo=False,  # Set to True for SQL query logging
     future=True
 )
@@ -79,6 +103,23 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+class utcnow(FunctionElement):
+    """Current UTC time as a naive timestamp, computed by the database."""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    # now() follows the session TimeZone; the timestamp columns store naive UTC
+    return "timezone('utc', now())"
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
 async def get_postgres_db() -> AsyncGenerator[AsyncSession, None]:
     """Async database session dependency."""
     async with AsyncSessionLocal() as session:
@@ -92,13 +133,166 @@ async def get_postgres_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
-async def init_postgres_db():
-    """Initialize PostgreSQL tables (async)."""
+async def warm_pool():
+    """Open pool_size connections up front so the first queries don't pay connect latency."""
+    async def _ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_ping() for _ in range(settings.db_pool_size)))
+
+
+# Idempotent schema and index DDL run at startup; sent to Postgres as one batch
+SCHEMA_DDL = (
+    # token_blacklist stores raw 32-byte SHA-256 digests. Older tables hold raw JWTs or hex
+    # digests in a text column: hash the raw tokens, then convert the column to BYTEA.
+    """DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = 'token_blacklist' AND column_name = 'token' AND data_type <> 'bytea'
+        ) THEN
+            UPDATE token_blacklist SET token = encode(sha256(convert_to(token, 'UTF8')), 'hex')
+            WHERE length(token) <> 64;
+            ALTER TABLE token_blacklist ALTER COLUMN token TYPE BYTEA USING decode(token, 'hex');
+        END IF;
+    END $$;""",
+
+    # Resume indexes
+    "CREATE INDEX IF NOT EXISTS idx_resumes_skills ON resumes USING GIN (skills);",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_uploaded_at ON resumes (uploaded_at DESC);",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_source_type ON resumes (source_type);",
+    # JSONB containment (@>) lookups: user_type filters and duplicate-email checks
+    "CREATE INDEX IF NOT EXISTS idx_resumes_meta_data_gin ON resumes USING GIN (meta_data jsonb_path_ops);",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_parsed_data_gin ON resumes USING GIN (parsed_data jsonb_path_ops);",
+    # Partial indexes for the per-source predicates: employee/gmail upserts look up source_id
+    # within one source_type, and the employee listing pages by uploaded_at
+    "CREATE INDEX IF NOT EXISTS idx_resumes_company_source_id ON resumes (source_id) WHERE source_type = 'company_employee';",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_gmail_source_id ON resumes (source_id) WHERE source_type = 'gmail';",
+    "CREATE INDEX IF NOT EXISTS idx_resumes_company_uploaded_at ON resumes (uploaded_at DESC) WHERE source_type = 'company_employee';",
+
+    # JD Analysis indexes
+    "CREATE INDEX IF NOT EXISTS idx_submitted_at ON jd_analysis (submitted_at DESC);",
+    # Array containment (@>, &&) on JD skills/keywords
+    "CREATE INDEX IF NOT EXISTS idx_jd_extracted_keywords ON jd_analysis USING GIN (extracted_keywords);",
+    "CREATE INDEX IF NOT EXISTS idx_jd_required_skills ON jd_analysis USING GIN (required_skills);",
+    "CREATE INDEX IF NOT EXISTS idx_jd_preferred_skills ON jd_analysis USING GIN (preferred_skills);",
+
+    # Match Results indexes
+    # (job_id, match_score DESC) serves both the per-job filter and its ranking order,
+    # replacing the single-column job_id and match_score indexes
+    "CREATE INDEX IF NOT EXISTS idx_match_results_job_score ON match_results (job_id, match_score DESC);",
+    "DROP INDEX IF EXISTS idx_match_results_job_id;",
+    "DROP INDEX IF EXISTS ix_match_results_job_id;",
+    "DROP INDEX IF EXISTS idx_match_results_score;",
+    "CREATE INDEX IF NOT EXISTS idx_match_results_resume_id ON match_results (resume_id);",
+    "CREATE INDEX IF NOT EXISTS idx_match_results_source_type ON match_results (source_type);",
+
+    # Dashboard skill counts per (meta_data.user_type, source_type, skill). Skills come from the
+    # skills column, falling back to the parsed technical skills (or all_skills) for resumes
+    # stored without any. Refreshed periodically (see refresh_skill_summary); the unique index
+    # is what REFRESH ... CONCURRENTLY requires.
+    """CREATE MATERIALIZED VIEW IF NOT EXISTS resume_skill_summary AS
+    SELECT COALESCE(r.meta_data->>'user_type', '') AS meta_user_type,
+           r.source_type,
+           btrim(s.skill, E' \\t\\r\\n') AS skill,
+           COUNT(*) AS resume_count
+    FROM resumes r
+    CROSS JOIN LATERAL (
+        SELECT CASE
+            WHEN CASE WHEN jsonb_typeof(r.parsed_data->'resume_technical_skills') = 'array'
+                      THEN jsonb_array_length(r.parsed_data->'resume_technical_skills') > 0 END
+                THEN r.parsed_data->'resume_technical_skills'
+            WHEN jsonb_typeof(r.parsed_data->'all_skills') = 'array'
+                THEN r.parsed_data->'all_skills'
+            ELSE '[]'::jsonb
+        END AS skills
+    ) AS parsed
+    CROSS JOIN LATERAL unnest(
+        CASE WHEN COALESCE(cardinality(r.skills), 0) > 0 THEN r.skills::text[]
+        ELSE ARRAY(SELECT jsonb_array_elements_text(parsed.skills)) END
+    ) AS s(skill)
+    WHERE btrim(s.skill, E' \\t\\r\\n') <> ''
+    GROUP BY 1, 2, 3;""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_resume_skill_summary_key ON resume_skill_summary (meta_user_type, source_type, skill);",
+
+    # Only lowercased emails may be written (rows from before the constraint are not rechecked)
+    """DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'users_email_lowercase') THEN
+            ALTER TABLE users ADD CONSTRAINT users_email_lowercase CHECK (email = lower(email)) NOT VALID;
+        END IF;
+    END $$;""",
+
+    # Timestamp defaults filled by Postgres (the models declare server_default=utcnow()).
+    # Only columns still lacking it are altered, so boots after the first take no
+    # ACCESS EXCLUSIVE locks here.
+    """DO $$
+    DECLARE
+        col record;
+    BEGIN
+        FOR col IN
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = current_schema()
+              AND (table_name::text, column_name::text) IN (
+                  ('users', 'created_at'), ('users', 'updated_at'), ('resumes', 'uploaded_at'),
+                  ('jd_analysis', 'submitted_at'), ('match_results', 'created_at'),
+                  ('token_blacklist', 'created_at')
+              )
+              AND column_default IS DISTINCT FROM 'timezone(''utc''::text, now())'
+        LOOP
+            EXECUTE format(
+                'ALTER TABLE %I ALTER COLUMN %I SET DEFAULT timezone(''utc'', now())',
+                col.table_name, col.column_name
+            );
+        END LOOP;
+    END $$;""",
+
+    # Freelancer ID numbers continue after the highest one already issued
+    "CREATE SEQUENCE IF NOT EXISTS freelancer_seq;",
+    r"""SELECT setval('freelancer_seq', s.max_num)
+    FROM (
+        SELECT MAX(split_part(freelancer_id, '-', 3)::int) AS max_num
+        FROM users WHERE freelancer_id ~ '^FL-\d+-\d+$'
+    ) s, freelancer_seq
+    WHERE s.max_num >= CASE WHEN freelancer_seq.is_called THEN freelancer_seq.last_value + 1 ELSE freelancer_seq.last_value END;""",
+
+    # Token blacklist indexes
+    # Ranged DELETE of expired rows by the periodic cleanup
+    "CREATE INDEX IF NOT EXISTS idx_token_blacklist_expires_at ON token_blacklist (expires_at);",
+
+    # Duplicates of primary keys, unique indexes or the explicit indexes above. Column-level
+    # (index=True) indexes are only declared where a unique constraint needs them.
+    "DROP INDEX IF EXISTS ix_users_id;",
+    "DROP INDEX IF EXISTS ix_experiences_id;",
+    "DROP INDEX IF EXISTS ix_certifications_id;",
+    "DROP INDEX IF EXISTS ix_resumes_id;",
+    "DROP INDEX IF EXISTS ix_resumes_source_type;",
+    "DROP INDEX IF EXISTS ix_jd_analysis_id;",
+    "DROP INDEX IF EXISTS ix_jd_analysis_submitted_at;",
+    "DROP INDEX IF EXISTS idx_job_id;",
+    "DROP INDEX IF EXISTS ix_match_results_id;",
+    "DROP INDEX IF EXISTS ix_match_results_resume_id;",
+    "DROP INDEX IF EXISTS ix_match_results_source_type;",
+    "DROP INDEX IF EXISTS idx_users_email;",
+    "DROP INDEX IF EXISTS ix_token_blacklist_id;",
+    "DROP INDEX IF EXISTS idx_token_blacklist_token;",
+)
+
+
+async def refresh_skill_summary():
+    """Recompute resume_skill_summary without blocking dashboard reads of the old contents."""
+    async with engine.begin() as conn:
+        await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY resume_skill_summary"))
+
+
+async def init_postgres_db() -> bool:
+    """Initialize PostgreSQL tables (async). Returns True when the schema is in place."""
     target_db = settings._clean_postgres_db
     try:
-        # Create database if it doesn't exist (sync operation)
+        # Create database if it doesn't exist (sync psycopg2 call, kept off the event loop)
         print(f"Checking if database '{target_db}' exists...")
-        if not create_database_if_not_exists():
+        if not await asyncio.to_thread(create_database_if_not_exists):
             print("Warning: Could not create database. Continuing anyway...")
         
         # Test connection first
@@ -112,32 +306,19 @@ async def init_postgres_db():
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
         
-        # Create indexes
+        # Create indexes (and apply in-place column migrations)
         try:
-            async with engine.begin() as conn:
-                # Resume indexes
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_resumes_skills ON resumes USING GIN (skills);"))
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_resumes_uploaded_at ON resumes (uploaded_at DESC);"))
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_resumes_source_type ON resumes (source_type);"))
-                
-                # JD Analysis indexes
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_job_id ON jd_analysis (job_id);"))
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_submitted_at ON jd_analysis (submitted_at DESC);"))
-                
-                # Match Results indexes
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_match_results_job_id ON match_results (job_id);"))
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_match_results_resume_id ON match_results (resume_id);"))
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_match_results_score ON match_results (match_score DESC);"))
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_match_results_source_type ON match_results (source_type);"))
-                
-                # User indexes
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_users_email ON users (email);"))
-                
-                # Token blacklist indexes
-                await conn.execute(text("CREATE INDEX IF NOT EXISTS idx_token_blacklist_token ON token_blacklist (token);"))
+            async with engine.connect() as conn:
+                # One round trip: asyncpg runs a parameterless multi-statement string
+                # through the simple query protocol, as a single implicit transaction
+                raw_conn = await conn.get_raw_connection()
+                await raw_conn.driver_connection.execute("\n".join(SCHEMA_DDL))
             print("PostgreSQL tables and indexes initialized")
         except Exception as e:
-            print(f"PostgreSQL index initialization warning: {e}")
+            # The batch is one transaction, so none of it (migrations, view, indexes) was applied
+            logger.error(f"PostgreSQL schema DDL failed, schema changes rolled back: {e}")
+            return False
+        return True
     except Exception as e:
         error_msg = str(e)
         if "password authentication failed" in error_msg.lower():
@@ -155,3 +336,4 @@ async def init_postgres_db():
             print(f"Error connecting to PostgreSQL: {e}")
         # Don't raise - allow app to start without PostgreSQL for now
         print("Warning: Continuing without PostgreSQL connection. Some features may not work.")
+        return False
@@ -1,6 +1,7 @@
 """Centralized settings management using Pydantic Settings."""
 from pydantic_settings import BaseSettings
 from typing import Optional, Any
+from functools import cached_property
 from urllib.parse import quote_plus
 
 class Settings(BaseSettings):
@@ -15,6 +16,15 @@ class Settings(BaseSettings):
     
     # Unified Database URL (Optional override)
     database_url: Optional[str] = None
+
+    # Connection Pool Configuration (per process: keep workers * (pool_size + max_overflow)
+    # below the server's max_connections)
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout: int = 30  # Seconds to wait for a free connection before erroring
+    db_pool_recycle: int = 1800  # Seconds before a pooled connection is replaced
+    db_query_cache_size: int = 1200  # SQLAlchemy compiled-SQL cache entries
+    db_prepared_statement_cache_size: int = 500  # asyncpg prepared statements kept per connection
     
     # Server Configuration
     host: str = "0.0.0.0"
@@ -24,11 +34,24 @@ class Settings(BaseSettings):
     jwt_secret_key: str = "your-secret-key-change-this"
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
+    token_blacklist_gc_interval_seconds: int = 300  # How often expired blacklist rows are purged
+    user_email_filter_check_interval_seconds: int = 300  # How often the login email filter is checked for completeness
     
     # OpenAI Configuration
     openai_api_key: Optional[str] = None
     openai_model: str = "gpt-4o"
-    openai_max_tokens: int = 4096
+    openai_max_tokens: int = 4096  # Ceiling for every completion
+    # Per-call output caps; allocated max_tokens counts against the TPM rate limit
+    openai_max_tokens_parse: int = 1200
+    openai_max_tokens_jd: int = 1000
+    openai_max_tokens_match: int = 800
+    openai_parse_batch_size: int = 8  # Resumes per GPT request for bulk parsing (capped so the batch fits openai_max_tokens)
+    openai_max_concurrency: int = 8  # Concurrent GPT requests when scoring candidates
+    openai_rps: float = 8.0  # GPT requests started per second (match to account RPM / 60)
+    openai_max_retries: int = 6  # SDK retries with exponential backoff on 429/5xx
+    # Candidates at or above both thresholds keep their traditional score and skip GPT matching
+    high_confidence_traditional_score: float = 90.0
+    high_confidence_skill_match: float = 95.0
     
     # Google Drive Configuration
     google_drive_credentials_path: Optional[str] = None
@@ -38,10 +61,19 @@ class Settings(BaseSettings):
     # Celery Configuration
     celery_broker_url: str = "redis://localhost:6379/0"
     celery_result_backend: str = "redis://localhost:6379/0"
+
+    # Redis Cache Configuration
+    redis_url: str = "redis://localhost:6379/0"
+    gpt_cache_ttl_seconds: int = 7 * 86400
+    parsed_resume_cache_ttl_seconds: int = 30 * 86400
+    dashboard_stats_cache_ttl_seconds: int = 60
+    dashboard_statement_timeout_ms: int = 5000  # Per-statement cap for the dashboard's aggregate queries
+    skill_summary_refresh_interval_seconds: int = 300  # How often dashboard skill counts are recomputed
     
     # File Upload Configuration
     upload_dir: str = "uploads"
     max_file_size_mb: int = 10
+    inline_parse_max_bytes: int = 200 * 1024  # Larger bulk uploads may be parsed by Celery
     
     # CORS Configuration
     cors_origins: str = "*"  # Comma-separated origins or "*" for all
@@ -50,27 +82,28 @@ class Settings(BaseSettings):
     google_client_id: Optional[str] = None
     google_client_secret: Optional[str] = None
     
-    @property
+    # Derived connection values are computed once; settings are not modified after startup
+    @cached_property
     def _clean_postgres_host(self) -> str:
         return self.postgres_host.strip()
 
-    @property
+    @cached_property
     def _clean_postgres_port(self) -> str:
         return str(self.postgres_port).strip()
 
-    @property
+    @cached_property
     def _clean_postgres_db(self) -> str:
         return self.postgres_db.strip()
 
-    @property
+    @cached_property
     def _clean_postgres_user(self) -> str:
         return self.postgres_user.strip()
 
-    @property
+    @cached_property
     def _clean_postgres_password(self) -> str:
         return self.postgres_password
 
-    @property
+    @cached_property
     def async_database_url(self) -> str:
         """Constructs the async PostgreSQL URL (postgresql+asyncpg)."""
         if self.database_url:
@@ -93,7 +126,7 @@ class Settings(BaseSettings):
         
         return f"postgresql+asyncpg://{auth}@{host}:{port}/{db}"
 
-    @property
+    @cached_property
     def sync_database_url(self) -> str:
         """Constructs the sync PostgreSQL URL (postgresql) or DSN."""
         if self.database_url:
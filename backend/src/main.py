@@ -3,6 +3,7 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 from starlette.responses import JSONResponse, Response
@@ -12,8 +13,11 @@ from starlette.middleware.base import BaseHTTPMiddleware
 load_dotenv()
 
 # Import database config
-from src.config.database import init_postgres_db
+from src.config.database import init_postgres_db, refresh_skill_summary, warm_pool
 from src.config.settings import settings
+from src.services.cache import close_redis_client
+from src.services.openai_service import init_openai_client, close_openai_client
+from src.middleware.auth_middleware import ensure_revocation_cache, listen_for_revocations, purge_expired_blacklist_entries
 
 # Import routes
 from src.routes import auth, resume, jd_analysis, admin
@@ -22,28 +26,131 @@ from src.routes import user_profile_api
 
 # Import logger and middleware
 from src.utils.logger import get_logger
-from src.middleware.error_middleware import TraceIDMiddleware, create_error_response
+from src.middleware.error_middleware import TraceLogMiddleware, create_error_response, schema_pending
 
 logger = get_logger(__name__)
 
+async def _migrate_then_set(schema_ready: asyncio.Event):
+    """
+    Run schema initialization in the background and signal when it has finished, then
+    load the Redis lookup caches. Those loads are not schema work (token and email lookups
+    use Postgres until they complete), so writes are not held back while they run.
+    """
+    try:
+        # Initialize PostgreSQL tables (includes users, resumes, jd_analysis, etc.)
+        initialized = await init_postgres_db()
+        if initialized:
+            logger.info("PostgreSQL database initialized")
+            # Open the pool's connections now rather than on the first requests
+            try:
+                await warm_pool()
+                logger.info(f"Database connection pool warmed ({settings.db_pool_size} connections)")
+            except Exception as e:
+                logger.warning(f"Database pool warm-up failed: {e}")
+        else:
+            logger.warning("PostgreSQL initialization did not complete; continuing without it")
+    finally:
+        schema_ready.set()
+    if initialized:
+        await _warm_lookup_caches()
+
+
+async def _warm_lookup_caches():
+    """Load the Redis copies of the token blacklist and the login email filter."""
+    # Serve token revocation checks from Redis rather than Postgres
+    try:
+        copied = await ensure_revocation_cache()
+        if copied is not None:
+            logger.info(f"Loaded {copied} revoked tokens into Redis")
+    except Exception as e:
+        logger.warning(f"Token revocation cache warm-up failed: {e}")
+    # Let login turn away unknown emails without a Postgres lookup
+    try:
+        added = await auth.ensure_user_email_filter()
+        if added is not None:
+            logger.info(f"Loaded {added} user emails into the login filter")
+    except Exception as e:
+        logger.warning(f"User email filter warm-up failed: {e}")
+
+
+async def _blacklist_gc_loop():
+    """Periodically purge expired token blacklist rows and keep the Redis copy of the blacklist complete."""
+    while True:
+        await asyncio.sleep(settings.token_blacklist_gc_interval_seconds)
+        try:
+            removed = await purge_expired_blacklist_entries()
+            if removed:
+                logger.info(f"Purged {removed} expired blacklisted tokens")
+        except Exception as e:
+            logger.warning(f"Token blacklist cleanup failed: {e}")
+        # Reload Redis after it restarted or missed a revocation, so lookups stop falling back to Postgres
+        try:
+            copied = await ensure_revocation_cache()
+            if copied is not None:
+                logger.info(f"Reloaded {copied} revoked tokens into Redis")
+        except Exception as e:
+            logger.warning(f"Token revocation cache reload failed: {e}")
+
+
+async def _user_email_filter_loop():
+    """Periodically reload the login email filter after Redis restarted or missed a new user."""
+    while True:
+        await asyncio.sleep(settings.user_email_filter_check_interval_seconds)
+        try:
+            added = await auth.ensure_user_email_filter()
+            if added is not None:
+                logger.info(f"Reloaded {added} user emails into the login filter")
+        except Exception as e:
+            logger.warning(f"User email filter reload failed: {e}")
+
+
+async def _skill_summary_refresh_loop():
+    """Periodically refresh the dashboard's pre-aggregated skill counts."""
+    while True:
+        await asyncio.sleep(settings.skill_summary_refresh_interval_seconds)
+        try:
+            await refresh_skill_summary()
+        except Exception as e:
+            logger.warning(f"Skill summary refresh failed: {e}")
+
+
 # Lifespan context manager for startup and shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting TechBank.ai Backend...")
     
-    # Initialize PostgreSQL tables (includes users, resumes, jd_analysis, etc.)
-    await init_postgres_db()
+    # Accept traffic immediately; write requests wait on schema_ready (see TraceLogMiddleware)
+    app.state.schema_ready = asyncio.Event()
+    schema_task = asyncio.create_task(_migrate_then_set(app.state.schema_ready))
+    blacklist_gc_task = asyncio.create_task(_blacklist_gc_loop())
+    # Revocations made by other workers, applied to this worker's token blacklist cache
+    revocation_task = asyncio.create_task(listen_for_revocations())
+    skill_summary_task = asyncio.create_task(_skill_summary_refresh_loop())
+    user_email_filter_task = asyncio.create_task(_user_email_filter_loop())
+    google_certs_task = asyncio.create_task(auth.warm_google_certs())
+    await auth.warm_employee_index()
+    await init_openai_client()
     
-    logger.info("PostgreSQL database initialized")
     logger.info(f"Server running on http://{settings.host}:{settings.port}")
     
     yield
     
     # Shutdown
     logger.info("Shutting down TechBank.ai Backend...")
+    if not schema_task.done():
+        schema_task.cancel()
+    blacklist_gc_task.cancel()
+    revocation_task.cancel()
+    skill_summary_task.cancel()
+    user_email_filter_task.cancel()
+    if not google_certs_task.done():
+        google_certs_task.cancel()
+    await close_redis_client()
+    await close_openai_client()
     logger.info("Shutdown complete")
 
+
 # Create FastAPI app
 app = FastAPI(
     title="TechBank.ai API",
@@ -63,9 +170,6 @@ app.add_middleware(
     max_age=3600,
 )
 
-# Add trace ID middleware after CORS
-app.add_middleware(TraceIDMiddleware)
-
 # Mount static files (for serving uploaded files)
 if os.path.exists("uploads"):
     app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -81,19 +185,8 @@ app.include_router(jd_analysis.router)
 app.include_router(admin.router)
 app.include_router(user_profile_api.router)
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    """Log all requests."""
-    trace_id = getattr(request.state, 'trace_id', 'N/A')
-    logger.info(f"{request.method} {request.url.path} [Trace: {trace_id}]")
-    try:
-        response = await call_next(request)
-        logger.info(f"Completed {request.method} {request.url.path} -> {response.status_code} [Trace: {trace_id}]")
-        return response
-    except Exception as e:
-        logger.error(f"Error handling {request.method} {request.url.path} [Trace: {trace_id}]: {e}")
-        raise
+# Trace ID + request logging + the startup write gate; added last so it is the outermost middleware
+app.add_middleware(TraceLogMiddleware)
 
 
 # Centralized exception handlers
@@ -118,8 +211,17 @@ async def unhandled_exception_handler(request: Request, exc: Exception):
 
 # Health check endpoint
 @app.get("/health")
-async def health_check():
-    """Health check endpoint."""
+async def health_check(request: Request):
+    """Health check endpoint. Returns 503 until startup schema initialization finishes."""
+    if schema_pending(request.app):
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "starting",
+                "service": "TechBank.ai Backend",
+                "version": "1.0.0"
+            }
+        )
     return {
         "status": "healthy",
         "service": "TechBank.ai Backend",
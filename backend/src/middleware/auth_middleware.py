@@ -3,13 +3,26 @@ from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Dict, Hashable, Optional, Tuple
+import asyncio
+import hashlib
+import math
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete
+from sqlalchemy import bindparam, select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from redis.exceptions import RedisError
 
-from src.config.database import get_postgres_db
+from src.config.database import get_postgres_db, AsyncSessionLocal
 from src.config.settings import settings
 from src.models.token_blacklist import TokenBlacklist
+from src.services.cache import (
+    REDIS_RETRY_AFTER_SECONDS, cache_hash_delete, cache_hash_get_many, cache_hash_prune, cache_hash_set,
+    cache_publish, subscribe
+)
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
 
 # JWT Configuration from settings
 JWT_SECRET_KEY = settings.jwt_secret_key
@@ -32,68 +45,236 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+
+
+class _TTLCache:
+    """Small process-local cache with a per-entry TTL; evicts the oldest entry when full."""
+
+    def __init__(self, maxsize: int):
+        self._maxsize = maxsize
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: float):
+        if ttl_seconds <= 0:
+            return
+        if key not in self._data and len(self._data) >= self._maxsize:
+            # Dicts keep insertion order, so the first key is the oldest
+            self._data.pop(next(iter(self._data)))
+        self._data[key] = (value, time.monotonic() + ttl_seconds)
+
+
+def token_digest(token: str) -> bytes:
+    """32-byte SHA-256 digest of a JWT; the blacklist stores and indexes this (as BYTEA) instead of the raw token."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+# Verified payloads of recently seen tokens, so repeat requests skip signature verification.
+# Entries never outlive the token's own exp.
+JWT_CACHE_TTL_SECONDS = 60
+_jwt_cache = _TTLCache(maxsize=50_000)
+
+
 def decode_access_token(token: str):
     """Decode and verify JWT token."""
+    key = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+    cached = _jwt_cache.get(key)
+    if cached is not None:
+        return dict(cached)
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+    exp = payload.get("exp")
+    ttl = JWT_CACHE_TTL_SECONDS if exp is None else min(JWT_CACHE_TTL_SECONDS, exp - time.time())
+    _jwt_cache.set(key, payload, ttl)
+    return dict(payload)
+
+
+# In-process (L1) cache of blacklist lookups, keyed by token digest.
+# Revocations are shared between workers through Redis (L2) and announced on BLACKLIST_CHANNEL,
+# which every worker applies to its L1. "Not blacklisted" answers still expire after
+# BLACKLIST_CACHE_TTL_SECONDS, which bounds staleness if an announcement is missed while Redis is down.
+BLACKLIST_CACHE_TTL_SECONDS = 60
+BLACKLIST_CHANNEL = "blk_invalidate"
+_blacklist_cache = _TTLCache(maxsize=100_000)
+
+# Postgres stays the durable record. Redis holds revocations in one hash, field = hex digest,
+# value = epoch seconds at which the token expires. While its REVOCATIONS_LOADED_FIELD is unexpired
+# the hash holds every unexpired revocation, so a Redis miss is a definite "not revoked" and Postgres
+# is not queried. Keeping the marker inside the same key means memory-pressure eviction drops the
+# revocations and the marker together, never one without the other; lookups then use Postgres
+# until the next warm_revocation_cache().
+REVOCATIONS_KEY = "blk:revoked"
+REVOCATIONS_LOADED_FIELD = "loaded"
+REVOCATIONS_LOADED_TTL_SECONDS = 3600
+# Set when a revocation could not be written to Redis; the next ensure_revocation_cache() reloads
+_revocation_share_failed = False
+
+
+async def _share_revocation(digest: bytes, ttl_seconds: float):
+    """Store a revocation in Redis and tell the other workers about it."""
+    global _revocation_share_failed
+    ttl = math.ceil(ttl_seconds)
+    if ttl <= 0:
+        return
+    if not await cache_hash_set(REVOCATIONS_KEY, {digest.hex(): time.time() + ttl}):
+        # Stop other workers trusting a hash that lacks this token (if Redis is reachable at all)
+        _revocation_share_failed = True
+        await cache_hash_delete(REVOCATIONS_KEY, REVOCATIONS_LOADED_FIELD)
+    await cache_publish(BLACKLIST_CHANNEL, f"{digest.hex()}:{ttl}")
 
 
 async def blacklist_token(token: str, exp: Optional[datetime] = None, db: Optional[AsyncSession] = None):
     """Blacklist a JWT token until its expiration."""
     if db is None:
-        # Get database session if not provided
-        async for session in get_postgres_db():
-            db = session
-            break
+        # No session provided: use a short-lived one that is closed on exit
+        async with AsyncSessionLocal() as session:
+            return await blacklist_token(token, exp, session)
     
     expires_at = exp if exp else datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
+    digest = token_digest(token)
     
-    blacklist_entry = TokenBlacklist(
-        token=token,
+    # One Core INSERT, no ORM unit of work; revoking an already-revoked token is a no-op
+    stmt = pg_insert(TokenBlacklist).values(
+        token=digest,
         expires_at=expires_at
-    )
+    ).on_conflict_do_nothing(index_elements=["token"])
     
-    db.add(blacklist_entry)
+    await db.execute(stmt)
     await db.commit()
+    # Visible to this process immediately, and to the others via Redis, until the token would have expired anyway
+    ttl_seconds = (expires_at - datetime.utcnow()).total_seconds()
+    _blacklist_cache.set(digest, True, ttl_seconds)
+    await _share_revocation(digest, ttl_seconds)
 
 
-async def is_token_blacklisted(token: str, db: Optional[AsyncSession] = None) -> bool:
-    """Check if token is blacklisted."""
-    if db is None:
-        # Get database session if not provided
-        async for session in get_postgres_db():
-            db = session
-            try:
-                query = select(TokenBlacklist).where(TokenBlacklist.token == token)
-                result = await db.execute(query)
-                existing = result.scalar_one_or_none()
-                if not existing:
-                    return False
-                # Expire old blacklist entries proactively
-                if existing.expires_at < datetime.utcnow():
-                    await db.execute(delete(TokenBlacklist).where(TokenBlacklist.id == existing.id))
-                    await db.commit()
-                    return False
-                return True
-            finally:
-                await db.close()
-            break
+# Existence check on the token index; expired entries are filtered server-side, never loaded.
+# Built once at import with bind parameters, so cache misses don't rebuild the statement
+# and always hit the same compiled-SQL cache entry.
+_BLACKLIST_LOOKUP = (
+    select(TokenBlacklist.expires_at)
+    .where(TokenBlacklist.token == bindparam("digest"), TokenBlacklist.expires_at > bindparam("now"))
+    .limit(1)
+)
+
+
+async def _query_blacklist(digest: bytes, db: AsyncSession) -> bool:
+    now = datetime.utcnow()
+    expires_at = (await db.execute(_BLACKLIST_LOOKUP, {"digest": digest, "now": now})).scalar()
+    if expires_at is None:
+        _blacklist_cache.set(digest, False, BLACKLIST_CACHE_TTL_SECONDS)
         return False
-    else:
-        query = select(TokenBlacklist).where(TokenBlacklist.token == token)
-        result = await db.execute(query)
-        existing = result.scalar_one_or_none()
-        if not existing:
-            return False
-        # Expire old blacklist entries proactively
-        if existing.expires_at < datetime.utcnow():
-            await db.execute(delete(TokenBlacklist).where(TokenBlacklist.id == existing.id))
-            await db.commit()
+    ttl_seconds = (expires_at - now).total_seconds()
+    _blacklist_cache.set(digest, True, ttl_seconds)
+    # Revoked before Redis held it (or Redis lost it): put it back for the other workers
+    await cache_hash_set(REVOCATIONS_KEY, {digest.hex(): time.time() + ttl_seconds})
+    return True
+
+
+async def is_token_blacklisted(token: str, db: Optional[AsyncSession] = None) -> bool:
+    """Check if token is blacklisted: in-process cache, then Redis, then Postgres."""
+    digest = token_digest(token)
+    cached = _blacklist_cache.get(digest)
+    if cached is not None:
+        return cached
+    found = await cache_hash_get_many(REVOCATIONS_KEY, (digest.hex(), REVOCATIONS_LOADED_FIELD))
+    if found is not None:
+        now = time.time()
+        expires_at, loaded_until = (float(value) if value is not None else 0.0 for value in found)
+        if expires_at > now:
+            _blacklist_cache.set(digest, True, expires_at - now)
+            return True
+        if loaded_until > now:
+            _blacklist_cache.set(digest, False, BLACKLIST_CACHE_TTL_SECONDS)
             return False
-        return True
+    
+    if db is None:
+        # No session provided: use a short-lived one that is closed on exit
+        async with AsyncSessionLocal() as session:
+            return await _query_blacklist(digest, session)
+    return await _query_blacklist(digest, db)
+
+
+async def listen_for_revocations():
+    """Apply revocations announced by other workers to this process's blacklist cache. Runs until cancelled."""
+    while True:
+        try:
+            async for data in subscribe(BLACKLIST_CHANNEL):
+                hex_digest, _, ttl = data.decode().partition(":")
+                _blacklist_cache.set(bytes.fromhex(hex_digest), True, float(ttl))
+        except (RedisError, OSError, ValueError) as e:
+            logger.warning(f"Token revocation channel unavailable, retrying in {REDIS_RETRY_AFTER_SECONDS}s: {e}")
+        await asyncio.sleep(REDIS_RETRY_AFTER_SECONDS)
+
+
+# Rows copied to Redis per round trip by warm_revocation_cache
+REVOCATION_WARM_BATCH_SIZE = 1000
+
+
+async def warm_revocation_cache() -> int:
+    """
+    Copy unexpired blacklist rows from Postgres (the source of truth) into Redis, so
+    lookups are answered there even after Redis restarts empty. Returns rows copied.
+    """
+    global _revocation_share_failed
+    copied = 0
+    complete = True
+    async with AsyncSessionLocal() as db:
+        now = datetime.utcnow()
+        epoch_now = time.time()
+        result = await db.stream(
+            select(TokenBlacklist.token, TokenBlacklist.expires_at).where(TokenBlacklist.expires_at > now)
+        )
+        async for rows in result.partitions(REVOCATION_WARM_BATCH_SIZE):
+            complete &= await cache_hash_set(REVOCATIONS_KEY, {
+                digest.hex(): epoch_now + (expires_at - now).total_seconds() for digest, expires_at in rows
+            })
+            copied += len(rows)
+    if complete and await cache_hash_set(
+        REVOCATIONS_KEY, {REVOCATIONS_LOADED_FIELD: time.time() + REVOCATIONS_LOADED_TTL_SECONDS}
+    ):
+        _revocation_share_failed = False
+    return copied
+
+
+async def ensure_revocation_cache() -> Optional[int]:
+    """Warm the Redis revocation cache if it is not known to be complete. Returns rows copied, or None if skipped."""
+    if not _revocation_share_failed:
+        found = await cache_hash_get_many(REVOCATIONS_KEY, (REVOCATIONS_LOADED_FIELD,))
+        if found is None:
+            # Redis unavailable; lookups use Postgres anyway
+            return None
+        loaded_until = found[0]
+        if loaded_until is not None and float(loaded_until) > time.time():
+            return None
+    return await warm_revocation_cache()
+
+
+def _revocation_expired(field: bytes, value: bytes) -> bool:
+    return float(value) <= time.time()
+
+
+async def purge_expired_blacklist_entries() -> int:
+    """
+    Delete blacklist rows whose tokens have expired, in one ranged statement, and drop
+    them from the Redis copy. Returns rows removed.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(delete(TokenBlacklist).where(TokenBlacklist.expires_at < datetime.utcnow()))
+        await db.commit()
+    # Also removes an expired REVOCATIONS_LOADED_FIELD, which ensure_revocation_cache() then reloads
+    await cache_hash_prune(REVOCATIONS_KEY, _revocation_expired)
+    return result.rowcount
 
 
 async def get_current_user(
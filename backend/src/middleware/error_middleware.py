@@ -1,26 +1,70 @@
 """Enhanced error handling middleware with trace IDs."""
-import uuid
-from fastapi import Request, HTTPException
+import secrets
+from typing import Any
+
 from starlette.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
-from typing import Callable
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Methods still served while startup schema initialization is running
+SAFE_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
 
-class TraceIDMiddleware(BaseHTTPMiddleware):
-    """Middleware to add trace IDs to requests for better error tracking."""
-    
-    async def dispatch(self, request: Request, call_next: Callable):
-        """Add trace ID to request and response."""
-        trace_id = str(uuid.uuid4())
-        request.state.trace_id = trace_id
-        
-        response = await call_next(request)
-        response.headers["X-Trace-ID"] = trace_id
-        return response
+
+def schema_pending(app: Any) -> bool:
+    """True while startup schema initialization is still running."""
+    schema_ready = getattr(app.state, "schema_ready", None)
+    return schema_ready is not None and not schema_ready.is_set()
+
+
+class TraceLogMiddleware:
+    """
+    Pure ASGI middleware that assigns each request a trace ID, logs the request and
+    its outcome, and returns the ID in the X-Trace-ID header. Writes are rejected
+    with 503 until startup schema initialization has finished. Register it last so it
+    wraps every other middleware and they all see request.state.trace_id.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # 64 random bits: unique enough for tracing, and short in headers and logs
+        trace_id = secrets.token_hex(8)
+        # Backs request.state for everything downstream
+        scope.setdefault("state", {})["trace_id"] = trace_id
+        method, path = scope["method"], scope["path"]
+        logger.info(f"{method} {path} [Trace: {trace_id}]")
+
+        status_code = None
+
+        async def send_with_trace_id(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-trace-id", trace_id.encode())]
+            await send(message)
+
+        try:
+            if method not in SAFE_METHODS and schema_pending(scope["app"]):
+                response = create_error_response(
+                    status_code=503,
+                    message="Service is starting up, please retry shortly",
+                    trace_id=trace_id
+                )
+                await response(scope, receive, send_with_trace_id)
+            else:
+                await self.app(scope, receive, send_with_trace_id)
+        except Exception as e:
+            logger.error(f"Error handling {method} {path} [Trace: {trace_id}]: {e}")
+            raise
+        logger.info(f"Completed {method} {path} -> {status_code} [Trace: {trace_id}]")
 
 
 def create_error_response(
@@ -1,15 +1,14 @@
 """JD Analysis SQLAlchemy models."""
 from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ARRAY, ForeignKey
 from sqlalchemy.dialects.postgresql import JSONB
-from datetime import datetime
-from src.config.database import Base
+from src.config.database import Base, utcnow
 
 
 class JDAnalysis(Base):
     """Job Description Analysis database model."""
     __tablename__ = "jd_analysis"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     job_id = Column(String(100), unique=True, nullable=False, index=True)
     jd_filename = Column(String(255))
     jd_text = Column(Text)
@@ -19,7 +18,7 @@ class JDAnalysis(Base):
     required_experience = Column(Float, default=0.0)
     education = Column(String(500))
     job_level = Column(String(50))  # entry, mid, senior
-    submitted_at = Column(DateTime, default=datetime.utcnow, index=True)
+    submitted_at = Column(DateTime, server_default=utcnow())
     submitted_by = Column(String(100))  # Admin email
     
     def __repr__(self):
@@ -30,10 +29,10 @@ class MatchResult(Base):
     """Match Result database model."""
     __tablename__ = "match_results"
     
-    id = Column(Integer, primary_key=True, index=True)
-    job_id = Column(String(100), ForeignKey('jd_analysis.job_id', ondelete='CASCADE'), nullable=False, index=True)
-    resume_id = Column(Integer, ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False, index=True)
-    source_type = Column(String(50), nullable=True, index=True)  # Track resume source type
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String(100), ForeignKey('jd_analysis.job_id', ondelete='CASCADE'), nullable=False)  # Indexed with match_score in init_postgres_db
+    resume_id = Column(Integer, ForeignKey('resumes.id', ondelete='CASCADE'), nullable=False)
+    source_type = Column(String(50), nullable=True)  # Track resume source type
     source_id = Column(String(100), nullable=True)  # Track resume source ID
     match_score = Column(Float)  # Overall score 0-100 (will be replaced by universal_fit_score)
     skill_match_score = Column(Float)  # Legacy - maps to skill_evidence_score
@@ -52,7 +51,7 @@ class MatchResult(Base):
     communication_score = Column(Float, default=0.0)  # 5% - Resume quality, clarity
     factor_breakdown = Column(JSONB, nullable=True)  # Detailed reasoning per factor
     
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
     
     def __repr__(self):
         return f"<MatchResult(job_id='{self.job_id}', resume_id={self.resume_id}, score={self.match_score})>"
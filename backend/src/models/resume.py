@@ -2,15 +2,15 @@
 from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ARRAY, UniqueConstraint, ForeignKey, Date
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
-from datetime import datetime
-from src.config.database import Base
+from src.config.database import Base, utcnow
+from src.utils.user_type_mapper import get_user_type_from_source_type, normalize_user_type
 
 
 class Experience(Base):
     """Structured work experience table."""
     __tablename__ = "experiences"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False)
     
     company = Column(String(255), nullable=True)
@@ -28,7 +28,7 @@ class Certification(Base):
     """Structured certification table."""
     __tablename__ = "certifications"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False)
     
     name = Column(String(255), nullable=False)
@@ -43,10 +43,10 @@ class Resume(Base):
     """Resume database model."""
     __tablename__ = "resumes"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     
     # Polymorphic source identification
-    source_type = Column(String(50), nullable=False, index=True)  # 'company_employee', 'gmail', 'admin', 'freelancer', 'guest'
+    source_type = Column(String(50), nullable=False)  # 'company_employee', 'gmail', 'admin', 'freelancer', 'guest'
     source_id = Column(String(100), nullable=True)  # employee_id, message_id, etc.
     source_metadata = Column(JSONB)  # Source-specific metadata (employee_id, department, gmail metadata, etc.)
     
@@ -57,7 +57,7 @@ class Resume(Base):
     parsed_data = Column(JSONB)  # Structured data: name, email, phone, skills, etc.
     skills = Column(ARRAY(String))  # Array of extracted skills
     experience_years = Column(Float)  # Years of experience
-    uploaded_at = Column(DateTime, default=datetime.utcnow)
+    uploaded_at = Column(DateTime, server_default=utcnow())
     uploaded_by = Column(String(100))  # Admin email who uploaded
     meta_data = Column(JSONB)  # Additional metadata (renamed from 'metadata' - reserved in SQLAlchemy)
     
@@ -76,17 +76,13 @@ class Resume(Base):
             self.meta_data = {}
         
         if 'user_type' not in self.meta_data or not self.meta_data.get('user_type'):
-            # Import here to avoid circular dependency
-            from src.utils.user_type_mapper import get_user_type_from_source_type
             self.meta_data['user_type'] = get_user_type_from_source_type(self.source_type)
     
     def get_user_type(self):
         """Get normalized user_type from meta_data or derive from source_type."""
         if self.meta_data and self.meta_data.get('user_type'):
-            from src.utils.user_type_mapper import normalize_user_type
             return normalize_user_type(self.meta_data['user_type'])
         else:
-            from src.utils.user_type_mapper import get_user_type_from_source_type
             return get_user_type_from_source_type(self.source_type)
     
     def __repr__(self):
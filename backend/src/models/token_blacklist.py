@@ -1,18 +1,22 @@
 """Token Blacklist SQLAlchemy model."""
-from sqlalchemy import Column, Integer, String, DateTime, Index
-from datetime import datetime
-from src.config.database import Base
+from sqlalchemy import Column, Integer, LargeBinary, DateTime, Index
+from src.config.database import Base, utcnow
 
 
 class TokenBlacklist(Base):
     """Token Blacklist database model."""
     __tablename__ = "token_blacklist"
     
-    id = Column(Integer, primary_key=True, index=True)
-    token = Column(String(500), unique=True, nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    token = Column(LargeBinary(32), unique=True, nullable=False, index=True)  # Raw SHA-256 digest of the JWT
     expires_at = Column(DateTime, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    
+    # Ranged DELETE of expired rows by the periodic cleanup (also in SCHEMA_DDL for existing tables)
+    __table_args__ = (
+        Index('idx_token_blacklist_expires_at', 'expires_at'),
+    )
     
     def __repr__(self):
-        return f"<TokenBlacklist(id={self.id}, token='{self.token[:20]}...')>"
+        return f"<TokenBlacklist(id={self.id}, token='{self.token[:6].hex()}...')>"
 
@@ -1,5 +1,5 @@
 """User Pydantic schemas."""
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional
 from datetime import datetime
 
@@ -44,6 +44,16 @@ class UserResponse(BaseModel):
     notice_period: Optional[int] = 0
     created_at: Optional[datetime] = None
 
+    @field_validator("mode", mode="before")
+    @classmethod
+    def _default_mode(cls, value):
+        return value or "user"
+
+    class Config:
+        # Built straight from User rows; immutable once built
+        from_attributes = True
+        frozen = True
+
 
 # User in Database (MongoDB Document)
 class UserInDB(BaseModel):
@@ -1,14 +1,17 @@
 """User SQLAlchemy model."""
-from sqlalchemy import Column, Integer, String, DateTime, Boolean
-from datetime import datetime
-from src.config.database import Base
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, Sequence, CheckConstraint
+from src.config.database import Base, utcnow
+
+
+# Numeric part of FL-<year>-NNNN freelancer IDs (catch-up with existing users is in SCHEMA_DDL)
+freelancer_seq = Sequence("freelancer_seq", metadata=Base.metadata)
 
 
 class User(Base):
     """User database model."""
     __tablename__ = "users"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False)
     email = Column(String(255), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
@@ -25,8 +28,17 @@ class User(Base):
     ready_to_relocate = Column(Boolean, default=False)
     preferred_location = Column(String(100), nullable=True)
     notice_period = Column(Integer, default=0) # Notice period in days
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utcnow())
+    updated_at = Column(DateTime, server_default=utcnow(), onupdate=utcnow())
+    
+    # Fetch the database-computed timestamps via RETURNING after UPDATE as well as INSERT
+    __mapper_args__ = {"eager_defaults": True}
+    
+    # Emails are stored lowercased, so lookups by lower(input) hit the unique email index
+    # directly (added NOT VALID to existing tables in SCHEMA_DDL)
+    __table_args__ = (
+        CheckConstraint("email = lower(email)", name="users_email_lowercase"),
+    )
     
     def __repr__(self):
         return f"<User(id={self.id}, email='{self.email}')>"
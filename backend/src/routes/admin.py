@@ -1,162 +1,261 @@
+import asyncio
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete
-from datetime import datetime, timedelta
+from sqlalchemy import select, func, delete, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import defer, raiseload, selectinload
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
 from src.models.resume import Resume
 from src.models.jd_analysis import JDAnalysis, MatchResult
 from src.models.user_db import User
-from src.config.database import get_postgres_db
+from src.models.user import UserResponse
+from src.config.database import get_postgres_db, AsyncSessionLocal
 from src.middleware.auth_middleware import get_admin_user
 from src.utils.logger import get_logger
 from src.utils.user_type_mapper import normalize_user_type, get_user_type_from_source_type
 from src.utils.response_formatter import format_resume_response
+from src.config.settings import settings
+from src.services.cache import (
+    DASHBOARD_STATS_CACHE_PREFIX, DASHBOARD_STATS_CACHE_VERSION, DASHBOARD_STATS_FALLBACK_KEY,
+    DASHBOARD_STATS_FALLBACK_TTL_SECONDS, cache_delete, cache_get_json, cache_set_json, cached_json,
+    invalidate_dashboard_stats
+)
 
 logger = get_logger(__name__)
-router = APIRouter(prefix="/api/admin", tags=["Admin"])
+# Responses are serialized with orjson (handles datetimes natively)
+router = APIRouter(prefix="/api/admin", tags=["Admin"], default_response_class=ORJSONResponse)
 
-@router.get("/stats")
-async def get_dashboard_stats(
-    current_user: dict = Depends(get_admin_user),
-    db: AsyncSession = Depends(get_postgres_db)
-):
-    """Get dashboard statistics with breakdown by user type and upload trends (Admin only)"""
-    try:
-        # Get PostgreSQL stats (including users)
-        total_users_result = await db.execute(select(func.count(User.id)))
-        total_users = total_users_result.scalar()
-        
-        total_resumes_result = await db.execute(select(func.count(Resume.id)))
-        total_resumes = total_resumes_result.scalar()
-        
-        total_jd_analyses_result = await db.execute(select(func.count(JDAnalysis.id)))
-        total_jd_analyses = total_jd_analyses_result.scalar()
-        
-        total_matches_result = await db.execute(select(func.count(MatchResult.id)))
-        total_matches = total_matches_result.scalar()
-        
-        # Get all resumes with formatted responses and prefetch relationships
-        from sqlalchemy.orm import selectinload
-        all_resumes_query = select(Resume).options(
-            selectinload(Resume.work_history),
-            selectinload(Resume.certificates)
-        ).order_by(Resume.uploaded_at.desc())
-        all_resumes_result = await db.execute(all_resumes_query)
-        all_resumes = all_resumes_result.scalars().all()
-
-        # Initialize trend data structure
-        target_user_types = ['Company Employee', 'Freelancer', 'Guest User']
-        
-        # Helper to get normalized date/month/quarter
-        def get_trend_keys(dt):
-            year = dt.year
-            month = dt.month
-            quarter = (month - 1) // 3 + 1
-            return {
-                'day': dt.date().isoformat(),
-                'month': f"{year}-{month:02d}",
-                'quarter': f"{year}-Q{quarter}"
-            }
+# SQLSTATE Postgres reports when statement_timeout cancels a query
+QUERY_CANCELED_SQLSTATE = '57014'
 
-        trends = {
-            'day': {},
-            'month': {},
-            'quarter': {}
-        }
+# Resume ids deleted per statement by bulk_delete_resumes
+BULK_DELETE_CHUNK_SIZE = 1000
 
-        # Last 365 days for comprehensive trends
-        one_year_ago = datetime.utcnow() - timedelta(days=365)
-
-        user_type_counts = {ut: 0 for ut in target_user_types}
-        user_type_skills = {ut: {} for ut in target_user_types}
-        skill_count = {}
-
-        for resume in all_resumes:
-            # Normalize user type
-            meta = resume.meta_data or {}
-            user_type = normalize_user_type(meta.get('user_type') or get_user_type_from_source_type(resume.source_type))
-            
-            # Global and Type-based counts/skills (for existing dashboard cards)
-            if user_type in target_user_types:
-                user_type_counts[user_type] += 1
-                
-                # Robust skill extraction
-                skills_list = resume.skills or []
-                if not skills_list and resume.parsed_data:
-                     # fallback to parsed data
-                     skills_list = resume.parsed_data.get('resume_technical_skills', []) or resume.parsed_data.get('all_skills', [])
-
-                if skills_list:
-                    for skill in skills_list:
-                        # Normalize skill
-                        skill = skill.strip()
-                        if not skill: continue
-                        
-                        # Add to user type breakdown
-                        user_type_skills[user_type][skill] = user_type_skills[user_type].get(skill, 0) + 1
-                        
-                        # Add to global count (regardless of who uploaded it)
-                        skill_count[skill] = skill_count.get(skill, 0) + 1
-
-            # Populate Trends
-            if resume.uploaded_at >= one_year_ago:
-                keys = get_trend_keys(resume.uploaded_at)
-                for period in ['day', 'month', 'quarter']:
-                    key = keys[period]
-                    if key not in trends[period]:
-                        trends[period][key] = {ut: 0 for ut in target_user_types}
-                        trends[period][key]['name'] = key
-                    
-                    if user_type in target_user_types:
-                        trends[period][key][user_type] += 1
-
-        # Format trends for Recharts (sorted lists)
-        formatted_trends = {
-            p: sorted(trends[p].values(), key=lambda x: x['name'])
-            for p in ['day', 'month', 'quarter']
-        }
-        
-        # Only take last 30 days for 'day' to avoid bloated response, but keep full year for others
-        formatted_trends['day'] = formatted_trends['day'][-30:]
+# Exact table counts shown on the first page of a listing are reused for later pages this long
+TABLE_COUNT_CACHE_TTL_SECONDS = 30
 
-        top_skills = sorted(skill_count.items(), key=lambda x: x[1], reverse=True)[:10]
-        top_skills_by_user_type = {
-            ut: sorted(skills_dict.items(), key=lambda x: x[1], reverse=True)[:5]
-            for ut, skills_dict in user_type_skills.items()
-        }
 
-        # Get all JD analyses
-        recent_jd_query = select(JDAnalysis).order_by(JDAnalysis.submitted_at.desc())
-        recent_jd_result = await db.execute(recent_jd_query)
-        recent_jd = recent_jd_result.scalars().all()
+def _table_count_key(table: str) -> str:
+    return f"admin:count:{table}"
 
-        return {
-            'total_users': total_users,
-            'total_records': total_resumes, # Renamed for frontend consistency
-            'total_jd_analyses': total_jd_analyses,
-            'total_matches': total_matches,
-            'departmentDistribution': user_type_counts, # Keep name for backwards compatibility during transition
-            'user_type_breakdown': user_type_counts,
-            'top_skills': [{'skill': skill, 'count': count} for skill, count in top_skills],
-            'top_skills_by_user_type': {
-                ut: [{'skill': skill, 'count': count} for skill, count in skills_list]
-                for ut, skills_list in top_skills_by_user_type.items()
-            },
-            'trends': formatted_trends,
-            'recentResumes': [ # Renamed for frontend consistency
-                format_resume_response(r)
-                for r in all_resumes[:50] # Limit to latest 50 for performance
-            ],
-            'recent_jd_analyses': [
-                {
-                    'job_id': jd.job_id,
-                    'filename': jd.jd_filename,
-                    'submitted_at': jd.submitted_at.isoformat() if jd.submitted_at else None
-                }
-                for jd in recent_jd
-            ],
-            'departments': target_user_types
-        }
-    
+
+async def fast_count(db: AsyncSession, table: str, exact: bool) -> int:
+    """
+    Row count for paginated listings. The exact COUNT(*) (a full scan) runs when exact is
+    set and is cached briefly; otherwise the cached count or the planner's pg_class
+    estimate is used, falling back to COUNT(*) when the table has never been analyzed.
+    """
+    if not exact:
+        cached = await cache_get_json(_table_count_key(table))
+        if cached is not None:
+            return cached
+        estimate = (await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"), {"t": table}
+        )).scalar()
+        if estimate and estimate > 0:
+            return estimate
+    # Table names come from the models, never from the request
+    total = (await db.execute(text(f'SELECT COUNT(*) FROM "{table}"'))).scalar()
+    await cache_set_json(_table_count_key(table), total, TABLE_COUNT_CACHE_TTL_SECONDS)
+    return total
+
+async def _run_dashboard_query(stmt, consume):
+    """
+    Run one dashboard query in its own session, so get_dashboard_stats can issue them
+    concurrently (an AsyncSession can't be shared between concurrent awaits).
+    consume reads the rows before the session closes.
+    """
+    async with AsyncSessionLocal() as session:
+        # Bound each query so a slow scan can't hold pooled connections indefinitely
+        await session.execute(text(f"SET LOCAL statement_timeout = {int(settings.dashboard_statement_timeout_ms)}"))
+        return consume(await session.execute(stmt))
+
+@cached_json(DASHBOARD_STATS_CACHE_PREFIX, ttl=settings.dashboard_stats_cache_ttl_seconds, version=DASHBOARD_STATS_CACHE_VERSION)
+async def _compute_dashboard_stats() -> dict:
+    """
+    Build the dashboard payload. Cached in Redis under DASHBOARD_STATS_CACHE_KEY, and
+    concurrent misses share one computation, so a burst of admins after an invalidation
+    runs the six queries once instead of holding six pooled connections each.
+    """
+    # Per-resume user types are resolved from (meta_data.user_type, source_type) pairs,
+    # so the aggregate queries group by both
+    meta_user_type = Resume.meta_data['user_type'].astext
+    one_year_ago = datetime.utcnow() - timedelta(days=365)
+    upload_day = func.date_trunc('day', Resume.uploaded_at)
+
+    (
+        (total_users, total_resumes, total_jd_analyses, total_matches),
+        type_counts_rows,
+        skill_rows,
+        daily_rows,
+        recent_resumes,
+        recent_jd
+    ) = await asyncio.gather(
+        # Get PostgreSQL stats (including users), all four counts in one round trip
+        _run_dashboard_query(select(
+            select(func.count(User.id)).scalar_subquery(),
+            select(func.count(Resume.id)).scalar_subquery(),
+            select(func.count(JDAnalysis.id)).scalar_subquery(),
+            select(func.count(MatchResult.id)).scalar_subquery()
+        ), lambda result: result.one()),
+        _run_dashboard_query(
+            select(meta_user_type, Resume.source_type, func.count())
+            .group_by(meta_user_type, Resume.source_type),
+            lambda result: result.all()
+        ),
+        # Skill counts come pre-aggregated from the resume_skill_summary materialized view
+        # (refreshed every skill_summary_refresh_interval_seconds by a startup task), one row per
+        # (meta_data.user_type, source_type, skill)
+        _run_dashboard_query(
+            text("SELECT meta_user_type, source_type, skill, resume_count FROM resume_skill_summary"),
+            lambda result: result.all()
+        ),
+        # Trends over the last 365 days: daily counts from SQL, rolled up to months and quarters here
+        _run_dashboard_query(
+            select(upload_day, meta_user_type, Resume.source_type, func.count())
+            .where(Resume.uploaded_at >= one_year_ago)
+            .group_by(upload_day, meta_user_type, Resume.source_type),
+            lambda result: result.all()
+        ),
+        # Latest 50 resumes, the only rows the dashboard shows. format_resume_response reads
+        # every column except raw_text (the largest one) plus both relationships; anything
+        # else raises instead of lazy loading one query per row.
+        _run_dashboard_query(
+            select(Resume).options(
+                defer(Resume.raw_text, raiseload=True),
+                selectinload(Resume.work_history),
+                selectinload(Resume.certificates),
+                raiseload("*")
+            ).order_by(Resume.uploaded_at.desc()).limit(50),
+            lambda result: result.scalars().all()
+        ),
+        # Latest 50 JD analyses (listing columns only), matching the recent resumes cap
+        _run_dashboard_query(
+            select(
+                JDAnalysis.job_id, JDAnalysis.jd_filename, JDAnalysis.submitted_at
+            ).order_by(JDAnalysis.submitted_at.desc()).limit(50),
+            lambda result: result.all()
+        )
+    )
+
+    # User types broken out on the dashboard
+    target_user_types = ['Company Employee', 'Freelancer', 'Guest User']
+
+    def resolve_user_type(meta_type, source_type):
+        return normalize_user_type(meta_type or get_user_type_from_source_type(source_type))
+
+    user_type_counts = {ut: 0 for ut in target_user_types}
+    for meta_type, source_type, count in type_counts_rows:
+        user_type = resolve_user_type(meta_type, source_type)
+        if user_type in target_user_types:
+            user_type_counts[user_type] += count
+
+    user_type_skills = {ut: Counter() for ut in target_user_types}
+    skill_count = Counter()
+    for meta_type, source_type, skill, count in skill_rows:
+        user_type = resolve_user_type(meta_type, source_type)
+        if user_type not in target_user_types:
+            continue
+        user_type_skills[user_type][skill] += count
+        skill_count[skill] += count
+
+    # Buckets keyed by integers (day ordinal, months and quarters since year 0), each holding
+    # one count per target user type; names are formatted once, for the buckets returned
+    user_type_index = {ut: i for i, ut in enumerate(target_user_types)}
+    trends = {
+        'day': defaultdict(lambda: [0] * len(target_user_types)),
+        'month': defaultdict(lambda: [0] * len(target_user_types)),
+        'quarter': defaultdict(lambda: [0] * len(target_user_types))
+    }
+    for day, meta_type, source_type, count in daily_rows:
+        index = user_type_index.get(resolve_user_type(meta_type, source_type))
+        buckets = (
+            trends['day'][day.toordinal()],
+            trends['month'][day.year * 12 + day.month - 1],
+            trends['quarter'][day.year * 4 + (day.month - 1) // 3]
+        )
+        # Every day with uploads gets a bucket, even if none are from a target user type
+        if index is not None:
+            for counts in buckets:
+                counts[index] += count
+
+    bucket_names = {
+        'day': lambda key: date.fromordinal(key).isoformat(),
+        'month': lambda key: f"{key // 12}-{key % 12 + 1:02d}",
+        'quarter': lambda key: f"{key // 4}-Q{key % 4 + 1}"
+    }
+    # Only take last 30 days for 'day' to avoid bloated response, but keep full year for others
+    bucket_keys = {p: sorted(trends[p]) for p in trends}
+    bucket_keys['day'] = bucket_keys['day'][-30:]
+
+    # Format trends for Recharts (sorted lists)
+    formatted_trends = {
+        p: [
+            {**dict(zip(target_user_types, trends[p][key])), 'name': bucket_names[p](key)}
+            for key in bucket_keys[p]
+        ]
+        for p in ['day', 'month', 'quarter']
+    }
+
+    # most_common(n) picks the top n with a heap rather than sorting every skill
+    top_skills = skill_count.most_common(10)
+    top_skills_by_user_type = {
+        ut: skills_counter.most_common(5)
+        for ut, skills_counter in user_type_skills.items()
+    }
+
+    stats = {
+        'total_users': total_users,
+        'total_records': total_resumes, # Renamed for frontend consistency
+        'total_jd_analyses': total_jd_analyses,
+        'total_matches': total_matches,
+        'departmentDistribution': user_type_counts, # Keep name for backwards compatibility during transition
+        'user_type_breakdown': user_type_counts,
+        'top_skills': [{'skill': skill, 'count': count} for skill, count in top_skills],
+        'top_skills_by_user_type': {
+            ut: [{'skill': skill, 'count': count} for skill, count in skills_list]
+            for ut, skills_list in top_skills_by_user_type.items()
+        },
+        'trends': formatted_trends,
+        'recentResumes': [ # Renamed for frontend consistency
+            format_resume_response(r)
+            for r in recent_resumes
+        ],
+        'recent_jd_analyses': [
+            {
+                'job_id': jd.job_id,
+                'filename': jd.jd_filename,
+                'submitted_at': jd.submitted_at
+            }
+            for jd in recent_jd
+        ],
+        'departments': target_user_types
+    }
+    await cache_set_json(DASHBOARD_STATS_FALLBACK_KEY, stats, DASHBOARD_STATS_FALLBACK_TTL_SECONDS)
+    return stats
+
+
+@router.get("/stats")
+async def get_dashboard_stats(
+    current_user: dict = Depends(get_admin_user)
+):
+    """Get dashboard statistics with breakdown by user type and upload trends (Admin only)"""
+    # Same payload for every admin; served from Redis for a short TTL (falls through when Redis is down)
+    # Returned as ORJSONResponse directly, skipping FastAPI's jsonable_encoder pass over the large payload
+    try:
+        return ORJSONResponse(await _compute_dashboard_stats())
+    except DBAPIError as e:
+        if getattr(e.orig, 'sqlstate', None) != QUERY_CANCELED_SQLSTATE:
+            logger.error(f"Get stats error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        # Timed out: serve the last good payload rather than retrying the heavy queries
+        logger.warning(f"Dashboard stats timed out after {settings.dashboard_statement_timeout_ms}ms")
+        fallback = await cache_get_json(DASHBOARD_STATS_FALLBACK_KEY)
+        if fallback is not None:
+            return ORJSONResponse(fallback)
+        raise HTTPException(status_code=503, detail="Dashboard statistics are temporarily unavailable, please retry shortly")
     except Exception as e:
         logger.error(f"Get stats error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -170,10 +269,10 @@ async def list_users(
 ):
     """List all users (Admin only)"""
     try:
-        total_result = await db.execute(select(func.count(User.id)))
-        total = total_result.scalar()
+        # Exact on the first page; later pages reuse it or settle for an estimate
+        total = await fast_count(db, User.__tablename__, exact=skip == 0)
         
-        users_query = select(User).order_by(User.created_at.desc()).offset(skip).limit(limit)
+        users_query = select(User).options(raiseload("*")).order_by(User.created_at.desc()).offset(skip).limit(limit)
         users_result = await db.execute(users_query)
         users = users_result.scalars().all()
         
@@ -181,16 +280,7 @@ async def list_users(
             'total': total,
             'skip': skip,
             'limit': limit,
-            'users': [
-                {
-                    'id': user.id,
-                    'name': user.name,
-                    'email': user.email,
-                    'mode': user.mode or 'user',
-                    'created_at': user.created_at.isoformat() if user.created_at else None
-                }
-                for user in users
-            ]
+            'users': [UserResponse.model_validate(user).model_dump() for user in users]
         }
     
     except Exception as e:
@@ -205,15 +295,14 @@ async def delete_user(
 ):
     """Delete user (Admin only)"""
     try:
-        query = select(User).where(User.id == user_id)
-        result = await db.execute(query)
-        user = result.scalar_one_or_none()
+        result = await db.execute(delete(User).where(User.id == user_id).returning(User.id))
         
-        if not user:
+        if result.scalar_one_or_none() is None:
             raise HTTPException(status_code=404, detail="User not found")
         
-        await db.execute(delete(User).where(User.id == user_id))
         await db.commit()
+        await invalidate_dashboard_stats()
+        await cache_delete(_table_count_key(User.__tablename__))
         
         logger.info(f"Deleted user: {user_id}")
         return {"message": "User deleted successfully"}
@@ -232,16 +321,16 @@ async def bulk_delete_resumes(
 ):
     """Bulk delete resumes (Admin only)"""
     try:
+        # One DELETE ... RETURNING per chunk of ids (bounded to stay well under the bind parameter limit);
+        # ids that don't exist simply aren't returned
         deleted_count = 0
-        for resume_id in resume_ids:
-            query = select(Resume).where(Resume.id == resume_id)
-            result = await db.execute(query)
-            resume = result.scalar_one_or_none()
-            if resume:
-                await db.execute(delete(Resume).where(Resume.id == resume_id))
-                deleted_count += 1
+        for start in range(0, len(resume_ids), BULK_DELETE_CHUNK_SIZE):
+            chunk = resume_ids[start:start + BULK_DELETE_CHUNK_SIZE]
+            result = await db.execute(delete(Resume).where(Resume.id.in_(chunk)).returning(Resume.id))
+            deleted_count += len(result.scalars().all())
         
         await db.commit()
+        await invalidate_dashboard_stats()
         
         logger.info(f"Bulk deleted {deleted_count} resumes")
         return {
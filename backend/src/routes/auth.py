@@ -1,30 +1,73 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from pydantic import BaseModel, EmailStr
-from datetime import datetime, timedelta
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+import asyncio
+import csv
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
 from starlette.responses import Response
 
 from src.models.user import UserCreate, UserLogin, UserResponse
-from src.models.user_db import User
-from src.config.database import get_postgres_db
+from src.models.user_db import User, freelancer_seq
+from src.config.database import get_postgres_db, AsyncSessionLocal
 from src.middleware.auth_middleware import create_access_token, get_current_user, blacklist_token, decode_access_token
+from src.services.cache import (
+    bloom_add, bloom_exists, cache_delete, cache_exists_many, cache_get_value, cache_set_value
+)
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
-router = APIRouter(prefix="/api/auth", tags=["Authentication"])
+router = APIRouter(prefix="/api/auth", tags=["Authentication"], default_response_class=ORJSONResponse)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing: argon2id for new hashes. bcrypt hashes from before the switch still
+# verify and are replaced with argon2 on the user's next successful login.
+_password_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    if hashed_password.startswith(_BCRYPT_PREFIXES):
+        import bcrypt  # Only needed for accounts that have not logged in since the argon2 switch
+        if not bcrypt.checkpw(plain_password.encode(), hashed_password.encode()):
+            return False, None
+        return True, _password_hasher.hash(plain_password)
+    try:
+        _password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False, None
+    if _password_hasher.check_needs_rehash(hashed_password):
+        return True, _password_hasher.hash(plain_password)
+    return True, None
+
+
+# Hashing is deliberately slow, so it runs off the event loop. argon2 releases the GIL, so
+# threads hash on every core; a pool of one thread per core caps concurrent hashes (64 MiB
+# each) and keeps a burst of logins from taking over the default asyncio.to_thread pool.
+_hash_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, _password_hasher.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Check the password; also return a replacement hash when the stored one uses outdated settings."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_executor, _verify_and_update, plain_password, hashed_password
+    )
 
 
 class ForgotPasswordRequest(BaseModel):
@@ -45,28 +88,146 @@ class ResetPasswordRequest(BaseModel):
     new_password: str
 
 
-_reset_tokens: Dict[str, Dict[str, datetime]] = {}
+# Built once at import; every user lookup by email reuses the same statement and compiled SQL
+_USER_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+# Redis Bloom filter of registered emails: login and reset-code requests for addresses it
+# certainly lacks are answered without a database query. It is only trusted while
+# USER_EMAIL_FILTER_LOADED_KEY exists, which load_user_email_filter() sets once every
+# stored email has been added; without it (Redis restarted, RedisBloom missing) lookups
+# go to Postgres as before. Deleted users stay in the filter and simply fall through.
+USER_EMAIL_FILTER_KEY = "users:bloom"
+USER_EMAIL_FILTER_LOADED_KEY = "users:bloom:loaded"
+USER_EMAIL_FILTER_LOADED_TTL_SECONDS = 3600
+USER_EMAIL_FILTER_CAPACITY = 1_000_000
+USER_EMAIL_FILTER_ERROR_RATE = 0.001
+USER_EMAIL_FILTER_LOAD_BATCH_SIZE = 1000
+# Set when a new email could not be added; the next ensure_user_email_filter() reloads
+_user_email_filter_add_failed = False
+
+
+async def _email_may_be_registered(email: str) -> bool:
+    """False only when the email filter is complete and certainly lacks email."""
+    return await bloom_exists(USER_EMAIL_FILTER_KEY, email, USER_EMAIL_FILTER_LOADED_KEY) is not False
+
+
+async def _add_to_user_email_filter(email: str):
+    global _user_email_filter_add_failed
+    if not await bloom_add(
+        USER_EMAIL_FILTER_KEY, [email], USER_EMAIL_FILTER_CAPACITY, USER_EMAIL_FILTER_ERROR_RATE
+    ):
+        # Stop other workers trusting a filter that lacks this user (if Redis is reachable at all)
+        _user_email_filter_add_failed = True
+        await cache_delete(USER_EMAIL_FILTER_LOADED_KEY)
+
+
+async def load_user_email_filter() -> int:
+    """Add every registered email to the filter and mark it complete. Returns emails added."""
+    global _user_email_filter_add_failed
+    added = 0
+    complete = True
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(select(User.email))
+        async for rows in result.partitions(USER_EMAIL_FILTER_LOAD_BATCH_SIZE):
+            complete &= await bloom_add(
+                USER_EMAIL_FILTER_KEY, [email for (email,) in rows],
+                USER_EMAIL_FILTER_CAPACITY, USER_EMAIL_FILTER_ERROR_RATE
+            )
+            added += len(rows)
+    if complete and await cache_set_value(USER_EMAIL_FILTER_LOADED_KEY, "1", USER_EMAIL_FILTER_LOADED_TTL_SECONDS):
+        _user_email_filter_add_failed = False
+    return added
+
+
+async def ensure_user_email_filter() -> Optional[int]:
+    """Load the email filter if it is not known to be complete. Returns emails added, or None if skipped."""
+    if not _user_email_filter_add_failed:
+        found = await cache_exists_many((USER_EMAIL_FILTER_LOADED_KEY,))
+        if found is None or found[0]:
+            # Redis unavailable (lookups use Postgres anyway) or already complete
+            return None
+    return await load_user_email_filter()
+
+# Password reset codes live in Redis so they expire on their own and work across workers
+RESET_CODE_TTL_SECONDS = 600
+
+
+def _reset_code_key(email: str) -> str:
+    """Redis key for an already-lowercased email."""
+    return f"pwreset:{email}"
 
 
 def _generate_reset_code() -> str:
     """Generate a 6-digit numeric reset code."""
-    import secrets
     return f"{secrets.randbelow(10**6):06d}"
 
+
+# Go up 4 levels: src/routes/auth.py -> src/routes -> src -> backend -> Project Root
+_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+_EMPLOYEE_CSV_PATHS = (
+    os.path.join(_ROOT_DIR, "Company_employee.csv"),
+    os.path.join(_ROOT_DIR, "backend", "Company_employee.csv"),
+)
+
+# employee_id (upper-cased) -> emails (lower-cased) from Company_employee.csv,
+# reloaded when the file's path or mtime changes
+_employee_index: Dict[str, Set[str]] = {}
+_employee_index_source: Optional[Tuple[str, float]] = None
+
+
+def _get_employee_index() -> Optional[Dict[str, Set[str]]]:
+    """Company employee records keyed by employee ID, or None if the CSV is missing."""
+    global _employee_index, _employee_index_source
+    
+    path = next((p for p in _EMPLOYEE_CSV_PATHS if os.path.isfile(p)), None)
+    if path is None:
+        return None
+    
+    source = (path, os.stat(path).st_mtime)
+    if source != _employee_index_source:
+        index: Dict[str, Set[str]] = {}
+        # utf-8-sig: files saved by Excel start with a BOM that would otherwise stick to the first header
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                csv_id = (row.get('employee_id') or '').strip().upper()
+                csv_email = (row.get('email') or '').strip().lower()
+                index.setdefault(csv_id, set()).add(csv_email)
+        _employee_index, _employee_index_source = index, source
+        logger.info(f"Loaded {len(index)} employee records from {path}")
+    return _employee_index
+
+
+async def warm_employee_index():
+    """Load the company employee index at startup so the first employee signup doesn't read the CSV."""
+    try:
+        index = await asyncio.to_thread(_get_employee_index)
+    except (OSError, csv.Error) as e:
+        logger.warning(f"Company employee index warm-up failed: {e}")
+        return
+    if index is None:
+        logger.warning(f"Company employee file not found at any of {_EMPLOYEE_CSV_PATHS}")
+
+
+def _record_freelancer(freelancer_id: str, name: str, email: str):
+    """Append the new freelancer to Freelancers.csv (audit trail only; IDs come from freelancer_seq)."""
+    freelancers_csv = os.path.join(_ROOT_DIR, "Freelancers.csv")
+    try:
+        file_exists = os.path.isfile(freelancers_csv)
+        with open(freelancers_csv, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(['freelancer_id', 'full_name', 'email', 'registration_date'])
+            
+            writer.writerow([freelancer_id, name, email, datetime.now().isoformat()])
+    except OSError as e:
+        logger.error(f"Failed to record freelancer {freelancer_id} in {freelancers_csv}: {e}")
+
+
 @router.post("/signup", response_model=UserResponse)
 async def signup(user: UserCreate, db: AsyncSession = Depends(get_postgres_db)):
     """Register a new user with role verification"""
-    import csv
-    import os
-    
+    email = user.email.lower()
     try:
-        # Check if user already exists
-        query = select(User).where(User.email == user.email.lower())
-        result = await db.execute(query)
-        existing_user = result.scalar_one_or_none()
-        if existing_user:
-            raise HTTPException(status_code=409, detail="User with this email already exists")
-            
         # Role-based Logic
         freelancer_id = None
         employee_id = None
@@ -76,41 +237,14 @@ async def signup(user: UserCreate, db: AsyncSession = Depends(get_postgres_db)):
             if not user.employee_id:
                 raise HTTPException(status_code=400, detail="Employee ID is required for Company Employees")
                 
-            # Go up 4 levels: src/routes/auth.py -> src/routes -> src -> backend -> Project Root
-            root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-            csv_path = os.path.join(root_dir, "Company_employee.csv")
+            employee_index = _get_employee_index()
+            if employee_index is None:
+                logger.error(f"Verification file not found at any of {_EMPLOYEE_CSV_PATHS}")
+                raise HTTPException(status_code=500, detail="Verification system configuration error: CSV file missing")
+            
+            # Check matches (case-insensitive)
+            verified = email in employee_index.get(user.employee_id.strip().upper(), ())
             
-            verified = False
-            try:
-                with open(csv_path, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f)
-                    for row in reader:
-                        # Check matches (case-insensitive)
-                        csv_id = row.get('employee_id', '').strip().upper()
-                        csv_email = row.get('email', '').strip().lower()
-                        
-                        if csv_id == user.employee_id.strip().upper() and csv_email == user.email.lower():
-                            verified = True
-                            break
-            except FileNotFoundError:
-                # Try backend directory as fallback
-                fallback_path = os.path.join(os.path.dirname(root_dir), "backend", "Company_employee.csv")
-                if os.path.exists(fallback_path):
-                     try:
-                        with open(fallback_path, 'r', encoding='utf-8') as f:
-                            reader = csv.DictReader(f)
-                            for row in reader:
-                                if row.get('employee_id', '').strip().upper() == user.employee_id.strip().upper() and \
-                                   row.get('email', '').strip().lower() == user.email.lower():
-                                    verified = True
-                                    break
-                     except:
-                        pass
-                
-                if not verified and not os.path.exists(fallback_path):
-                    logger.error(f"Verification file not found at {csv_path} or {fallback_path}")
-                    raise HTTPException(status_code=500, detail="Verification system configuration error: CSV file missing")
-                
             if not verified:
                 raise HTTPException(status_code=403, detail="Verification failed: Employee ID and Email do not match company records")
             
@@ -119,42 +253,18 @@ async def signup(user: UserCreate, db: AsyncSession = Depends(get_postgres_db)):
         # 2. Freelancer ID Generation
         elif user.employment_type == "Freelancer":
             try:
-                root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-                freelancers_csv = os.path.join(root_dir, "Freelancers.csv")
-                
-                # Ensure file exists with header
-                file_exists = os.path.isfile(freelancers_csv)
-                
-                # Determine next ID
-                next_id_num = 1
-                if file_exists:
-                    with open(freelancers_csv, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                        # Simple count of non-empty lines minus header
-                        data_lines = [l for l in lines if l.strip() and ',' in l]
-                        if len(data_lines) > 1: # Header + data
-                            next_id_num = len(data_lines)
-                
+                next_id_num = await db.scalar(freelancer_seq.next_value())
                 year = datetime.now().year
                 freelancer_id = f"FL-{year}-{next_id_num:04d}"
-                
-                # Append to CSV
-                with open(freelancers_csv, 'a', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    if not file_exists:
-                        writer.writerow(['freelancer_id', 'full_name', 'email', 'registration_date'])
-                    
-                    writer.writerow([freelancer_id, user.name, user.email.lower(), datetime.now().isoformat()])
-                    
             except Exception as e:
                 logger.error(f"Freelancer ID generation failed: {e}")
                 raise HTTPException(status_code=500, detail="Failed to generate Freelancer ID")
 
-        # Create new user
-        new_user = User(
+        # Create new user; the unique email index doubles as the "already registered" check
+        stmt = pg_insert(User).values(
             name=user.name,
-            email=user.email.lower(),
-            password_hash=hash_password(user.password),
+            email=email,
+            password_hash=await hash_password(user.password),
             dob=user.dob,
             state=user.state,
             city=user.city,
@@ -168,25 +278,19 @@ async def signup(user: UserCreate, db: AsyncSession = Depends(get_postgres_db)):
             ready_to_relocate=user.ready_to_relocate,
             preferred_location=user.preferred_location,
             notice_period=user.notice_period
-        )
-        
-        # Insert into database
-        db.add(new_user)
+        ).on_conflict_do_nothing(index_elements=["email"]).returning(User)
+        new_user = (await db.execute(stmt)).scalar_one_or_none()
+        if new_user is None:
+            raise HTTPException(status_code=409, detail="User with this email already exists")
         await db.commit()
-        await db.refresh(new_user)
+        await _add_to_user_email_filter(email)
+        
+        if freelancer_id:
+            _record_freelancer(freelancer_id, user.name, email)
         
         logger.info(f"New user registered: {user.email} ({user.employment_type})")
         
-        return UserResponse(
-            id=new_user.id,
-            name=new_user.name,
-            email=new_user.email,
-            mode=new_user.mode,
-            employment_type=new_user.employment_type,
-            employee_id=new_user.employee_id,
-            freelancer_id=new_user.freelancer_id,
-            created_at=new_user.created_at
-        )
+        return UserResponse.model_validate(new_user)
     
     except HTTPException:
         raise
@@ -198,20 +302,27 @@ async def signup(user: UserCreate, db: AsyncSession = Depends(get_postgres_db)):
             error_detail = "Database table 'users' does not exist. Please restart the backend to create tables."
         raise HTTPException(status_code=500, detail=f"Internal server error: {error_detail}")
 
-@router.post("/login")
+# Returns the response directly, skipping FastAPI's response encoding step
+@router.post("/login", response_model=None)
 async def login(credentials: UserLogin, db: AsyncSession = Depends(get_postgres_db)):
     """Login user and return JWT token"""
+    email = credentials.email.lower()
     try:
+        if not await _email_may_be_registered(email):
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+        
         # Find user by email
-        query = select(User).where(User.email == credentials.email.lower())
-        result = await db.execute(query)
+        result = await db.execute(_USER_BY_EMAIL, {"email": email})
         user = result.scalar_one_or_none()
         if not user:
             raise HTTPException(status_code=401, detail="Invalid email or password")
         
         # Verify password
-        if not verify_password(credentials.password, user.password_hash):
+        valid, new_hash = await verify_and_update_password(credentials.password, user.password_hash)
+        if not valid:
             raise HTTPException(status_code=401, detail="Invalid email or password")
+        if new_hash:
+            user.password_hash = new_hash
         
         # Create JWT token
         token_data = {
@@ -223,7 +334,7 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_postgres_
         
         logger.info(f"User logged in: {user.email}")
         
-        return {
+        return ORJSONResponse({
             "access_token": access_token,
             "token_type": "bearer",
             "user": {
@@ -232,7 +343,7 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_postgres_
                 "email": user.email,
                 "mode": user.mode or "user"
             }
-        }
+        })
     
     except HTTPException:
         raise
@@ -240,26 +351,39 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_postgres_
         logger.error(f"Login error: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# Browsers may reuse /me for this long without asking; after that they revalidate with the ETag
+ME_CACHE_CONTROL = "private, max-age=30"
+
+
+def _user_etag(user: User) -> str:
+    """Strong ETag for a user's /me body; changes whenever the row is updated."""
+    version = user.updated_at or user.created_at
+    stamp = version.isoformat() if version else ""
+    return '"' + hashlib.blake2b(f"{user.id}:{stamp}".encode(), digest_size=8).hexdigest() + '"'
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
+    request: Request,
+    response: Response,
     current_user: dict = Depends(get_current_user),
     db: AsyncSession = Depends(get_postgres_db)
 ):
     """Get current user information"""
     try:
-        query = select(User).where(User.email == current_user["email"])
-        result = await db.execute(query)
+        result = await db.execute(_USER_BY_EMAIL, {"email": current_user["email"]})
         user = result.scalar_one_or_none()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
-        return UserResponse(
-            id=user.id,
-            name=user.name,
-            email=user.email,
-            mode=user.mode or "user",
-            created_at=user.created_at
-        )
+        # The cached body depends on the bearer token, so caches must key on it
+        headers = {"ETag": _user_etag(user), "Cache-Control": ME_CACHE_CONTROL, "Vary": "Authorization"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if headers["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+            return Response(status_code=304, headers=headers)
+        
+        response.headers.update(headers)
+        return UserResponse.model_validate(user)
     
     except HTTPException:
         raise
@@ -299,16 +423,18 @@ async def send_password_reset_code(
     """
     Send a password reset verification code to the user's email.
     """
+    email = payload.email.lower()
     try:
-        query = select(User).where(User.email == payload.email.lower())
-        result = await db.execute(query)
-        user = result.scalar_one_or_none()
+        user = None
+        if await _email_may_be_registered(email):
+            result = await db.execute(_USER_BY_EMAIL, {"email": email})
+            user = result.scalar_one_or_none()
         if not user:
             raise HTTPException(status_code=404, detail="User with this email was not found")
 
         code = _generate_reset_code()
-        expires_at = datetime.utcnow() + timedelta(minutes=10)
-        _reset_tokens[payload.email.lower()] = {"code": code, "expires_at": expires_at}
+        if not await cache_set_value(_reset_code_key(email), code, RESET_CODE_TTL_SECONDS):
+            raise HTTPException(status_code=503, detail="Password reset is temporarily unavailable")
 
         # For development: log the code so it can be used in the frontend
         logger.info(f"Password reset code for {payload.email}: {code}")
@@ -326,16 +452,13 @@ async def verify_password_reset_code(payload: VerifyCodeRequest):
     """
     Verify the password reset code for the given email.
     """
+    email = payload.email.lower()
     try:
-        record = _reset_tokens.get(payload.email.lower())
-        if not record:
+        code = await cache_get_value(_reset_code_key(email))
+        if not code:
             raise HTTPException(status_code=400, detail="Invalid or expired verification code")
 
-        if record["expires_at"] < datetime.utcnow():
-            _reset_tokens.pop(payload.email.lower(), None)
-            raise HTTPException(status_code=400, detail="Verification code has expired")
-
-        if record["code"] != payload.code:
+        if not hmac.compare_digest(code.encode(), payload.code.encode()):
             raise HTTPException(status_code=400, detail="Invalid verification code")
 
         return {"message": "Verification code is valid"}
@@ -354,25 +477,25 @@ async def reset_password(
     """
     Reset the user's password using a verified code.
     """
+    email = payload.email.lower()
     try:
-        record = _reset_tokens.get(payload.email.lower())
-        if not record or record["code"] != payload.code or record["expires_at"] < datetime.utcnow():
+        code = await cache_get_value(_reset_code_key(email))
+        if not code or not hmac.compare_digest(code.encode(), payload.code.encode()):
             raise HTTPException(status_code=400, detail="Invalid or expired verification code")
 
         # Find user
-        query = select(User).where(User.email == payload.email.lower())
-        result = await db.execute(query)
+        result = await db.execute(_USER_BY_EMAIL, {"email": email})
         user = result.scalar_one_or_none()
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
 
         # Update password
-        user.password_hash = hash_password(payload.new_password)
+        user.password_hash = await hash_password(payload.new_password)
         await db.commit()
         await db.refresh(user)
 
-        # Invalidate the used token
-        _reset_tokens.pop(payload.email.lower(), None)
+        # Invalidate the used code
+        await cache_delete(_reset_code_key(email))
 
         logger.info(f"Password reset for user: {user.email}")
         return {"message": "Password has been reset successfully"}
@@ -384,16 +507,79 @@ async def reset_password(
 
 
 # Google OAuth
-from google.oauth2 import id_token
+from google.auth import jwt as google_jwt
 from google.auth.transport import requests as google_requests
+from jose import JWTError, jwt
 from src.config.settings import settings
 
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+# Google rotates its signing keys every few days; tokens with an unknown key ID force a refetch
+GOOGLE_CERTS_TTL_SECONDS = 3600
+# ...but at most this often, so tokens with made-up key IDs can't trigger a fetch per request
+GOOGLE_CERTS_MIN_REFETCH_SECONDS = 60
+
+# One requests.Session for all cert fetches, so the TLS connection is kept alive
+_google_request = google_requests.Request()
+_google_certs: Dict[str, str] = {}
+_google_certs_expires_at = 0.0
+_google_certs_fetched_at = float("-inf")
+# Serializes fetches; callers are worker threads (see google_login)
+_google_certs_lock = threading.Lock()
+
+
+def _get_google_certs(key_id: Optional[str]) -> Dict[str, str]:
+    """
+    Google's ID token signing certificates, fetched at most once per TTL unless key_id is
+    new, and never more than once per GOOGLE_CERTS_MIN_REFETCH_SECONDS. Raises ValueError
+    for a key ID that is still unknown within that window.
+    """
+    global _google_certs, _google_certs_expires_at, _google_certs_fetched_at
+    if time.monotonic() < _google_certs_expires_at and key_id in _google_certs:
+        return _google_certs
+    
+    with _google_certs_lock:
+        now = time.monotonic()
+        # Another thread may have fetched while this one waited for the lock
+        if now < _google_certs_expires_at and key_id in _google_certs:
+            return _google_certs
+        if now - _google_certs_fetched_at < GOOGLE_CERTS_MIN_REFETCH_SECONDS:
+            raise ValueError(f"Unknown Google signing key: {key_id}")
+        # Counted from the attempt, so a failing endpoint is not retried on every request either
+        _google_certs_fetched_at = now
+        response = _google_request(GOOGLE_CERTS_URL, method="GET")
+        if response.status != 200:
+            raise ValueError(f"Could not fetch Google certificates: HTTP {response.status}")
+        _google_certs = json.loads(response.data)
+        _google_certs_expires_at = time.monotonic() + GOOGLE_CERTS_TTL_SECONDS
+        return _google_certs
+
+
+async def warm_google_certs():
+    """Fetch Google's signing certificates (and open the session) ahead of the first Google login."""
+    if not settings.google_client_id:
+        return
+    try:
+        await asyncio.to_thread(_get_google_certs, None)
+    except Exception as e:
+        logger.warning(f"Google certificate warm-up failed: {e}")
+
+
+def _verify_google_id_token(credential: str) -> dict:
+    """Check a Google ID token's signature, audience, expiry and issuer against the cached certificates."""
+    certs = _get_google_certs(jwt.get_unverified_header(credential).get("kid"))
+    id_info = google_jwt.decode(credential, certs=certs, audience=settings.google_client_id)
+    if id_info.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {id_info.get('iss')}")
+    return id_info
+
+
 class GoogleLoginRequest(BaseModel):
     credential: str  # The ID token from Google
 
 
 
-@router.post("/google-login")
+@router.post("/google-login", response_model=None)
 async def google_login(
     payload: GoogleLoginRequest,
     db: AsyncSession = Depends(get_postgres_db)
@@ -404,12 +590,9 @@ async def google_login(
     try:
         # Verify the token
         try:
-            id_info = id_token.verify_oauth2_token(
-                payload.credential,
-                google_requests.Request(),
-                settings.google_client_id
-            )
-        except ValueError as e:
+            # Occasional certificate fetch and the RSA check run off the event loop
+            id_info = await asyncio.to_thread(_verify_google_id_token, payload.credential)
+        except (ValueError, JWTError) as e:
             raise HTTPException(status_code=401, detail=f"Invalid Google token: {str(e)}")
 
         email = id_info.get("email")
@@ -420,19 +603,17 @@ async def google_login(
         name = id_info.get("name", "Unknown")
         
         # Check if user exists
-        query = select(User).where(User.email == email)
-        result = await db.execute(query)
+        result = await db.execute(_USER_BY_EMAIL, {"email": email})
         user = result.scalar_one_or_none()
 
         if not user:
             # Create new user
-            import secrets
             random_password = secrets.token_urlsafe(16)
             
             user = User(
                 name=name,
                 email=email,
-                password_hash=hash_password(random_password),
+                password_hash=await hash_password(random_password),
                 mode="user",
                 source="google" if hasattr(User, "source") else None # Handle if source column missing
                 # Add default values for other fields if necessary
@@ -440,6 +621,7 @@ async def google_login(
             db.add(user)
             await db.commit()
             await db.refresh(user)
+            await _add_to_user_email_filter(email)
             logger.info(f"New Google user registered: {email}")
         else:
             logger.info(f"Google user logged in: {email}")
@@ -452,7 +634,7 @@ async def google_login(
         }
         access_token = create_access_token(token_data)
 
-        return {
+        return ORJSONResponse({
             "access_token": access_token,
             "token_type": "bearer",
             "user": {
@@ -461,7 +643,7 @@ async def google_login(
                 "email": user.email,
                 "mode": user.mode or "user"
             }
-        }
+        })
 
     except HTTPException:
         raise
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query, Form, Body
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import defer, raiseload, selectinload
 from typing import List, Dict, Any, Optional
 import uuid
 from datetime import datetime
@@ -13,13 +13,12 @@ from src.middleware.auth_middleware import get_admin_user, get_current_user
 from src.services.storage import save_uploaded_file
 from src.services.file_processor import extract_text_from_file
 from src.services import openai_service
-from src.services.matching_engine import calculate_match_score, calculate_traditional_score
+from src.services.matching_engine import score_candidates, batch_traditional_scores
 from src.utils.validators import validate_file_type
 from src.utils.logger import get_logger
 from src.utils.user_type_mapper import normalize_user_type, get_user_type_from_source_type, get_source_type_from_user_type
 from src.utils.response_formatter import format_resume_response
 from src.config.settings import settings
-import asyncio
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api/jd", tags=["JD Analysis"])
@@ -126,7 +125,7 @@ async def analyze_jd(
         existing_results = {mr.resume_id: mr for mr in existing_results_list}
 
         # Phase 1: Traditional scoring for all resumes (fast)
-        prelim = []
+        candidates = []
         for resume in all_resumes:
             try:
                 parsed = resume.parsed_data or {}
@@ -139,6 +138,8 @@ async def analyze_jd(
                     'skills': extracted_skills,
                     'experience_years': resume.experience_years if resume.experience_years is not None else (parsed.get('resume_experience') or 0),
                     'raw_text': resume.raw_text or '',
+                    # Lowercased once here; phase 1 and the phase 3 confidence gate both match keywords on it
+                    'raw_text_lower': (resume.raw_text or '').lower(),
                     'summary': parsed.get('summary', '') or (resume.raw_text[:500] if resume.raw_text else ''),
                     'education': f"{parsed.get('resume_degree', 'Not mentioned')} - {parsed.get('resume_university', 'Not mentioned')}",
                     'role': parsed.get('resume_role', getattr(resume, 'job_title', 'Not mentioned')), # Removed resume.role, checking job_title just in case
@@ -153,49 +154,28 @@ async def analyze_jd(
                     # Skip candidates who don't meet minimum experience
                     logger.debug(f"Resume {resume.id} filtered out: {candidate_exp} years < {min_exp_required} years required")
                     continue
-            
-                score = calculate_traditional_score(resume_data, jd_requirements)
-                # LOGGING: Check why score might be low
-                if score == 0:
-                     logger.debug(f"Resume {resume.id} score 0. Data: Skills={len(resume_data['skills'])}, Exp={resume_data['experience_years']}")
-
-                if score >= min_score:
-                    prelim.append((resume, resume_data, score))
+                
+                candidates.append((resume, resume_data))
             except Exception as e:
                 logger.error(f"Scoring/Processing failed for resume {resume.id}: {e}")
-
+        
+        # Score every candidate against this JD in one pass
+        scores = batch_traditional_scores([resume_data for _, resume_data in candidates], jd_requirements)
+        
+        all_scored = []
+        for (resume, resume_data), score in zip(candidates, scores):
+            if score is None:
+                continue
+            # LOGGING: Check why score might be low
+            if score == 0:
+                 logger.debug(f"Resume {resume.id} score 0. Data: Skills={len(resume_data['skills'])}, Exp={resume_data['experience_years']}")
+            all_scored.append((resume, resume_data, score))
+        
+        prelim = [entry for entry in all_scored if entry[2] >= min_score]
         logger.info(f"{len(prelim)}/{total_resumes} resumes passed minimum score {min_score} in phase 1")
 
         if len(prelim) < 5:
             logger.info("Phase 1 yielded too few results. Relaxing filter to include top potential candidates.")
-            all_scored = []
-            for resume in all_resumes:
-                try:
-                    parsed = resume.parsed_data or {}
-                    extracted_skills = resume.skills or parsed.get('resume_technical_skills', []) or parsed.get('all_skills', [])
-                    if isinstance(extracted_skills, str):
-                        extracted_skills = [s.strip() for s in extracted_skills.split(',') if s.strip()]
-                    resume_data = {
-                        'skills': extracted_skills,
-                        'experience_years': resume.experience_years if resume.experience_years is not None else (parsed.get('resume_experience') or 0),
-                        'raw_text': resume.raw_text or '',
-                        'summary': parsed.get('summary', '') or (resume.raw_text[:500] if resume.raw_text else ''),
-                        'education': f"{parsed.get('resume_degree', 'Not mentioned')} - {parsed.get('resume_university', 'Not mentioned')}",
-                        'role': parsed.get('resume_role', getattr(resume, 'job_title', 'Not mentioned')),
-                        'certifications': parsed.get('resume_certificates', [])
-                    }
-                    
-                    # HARD FILTER: Check minimum experience requirement (same as Phase 1)
-                    min_exp_required = jd_requirements.get('min_experience_years', 0)
-                    candidate_exp = resume_data['experience_years']
-                    
-                    if min_exp_required > 0 and candidate_exp < min_exp_required:
-                        # Skip candidates who don't meet minimum experience
-                        continue
-                    
-                    score = calculate_traditional_score(resume_data, jd_requirements)
-                    all_scored.append((resume, resume_data, score))
-                except Exception: continue
             all_scored.sort(key=lambda x: x[2], reverse=True)
             prelim = all_scored[:15]
             logger.info(f"Fallback: Passing top {len(prelim)} candidates to AI matching.")
@@ -273,10 +253,16 @@ async def analyze_jd(
              raise e
         
         # Phase 3: AI-enhanced scoring with DETACHED data (no DB session access)
-        semaphore = asyncio.Semaphore(5)
-        async def score_resume(detached_data):
+        # Resumes scored against this JD before reuse their stored result
+        to_score = [data for data in prelim_data if not existing_results.get(data['resume_id'])]
+        score_results = await score_candidates(to_score, jd_requirements)
+        scored = {data['resume_id']: score_result for data, score_result in zip(to_score, score_results)}
+        
+        def build_result(detached_data):
             try:
                 resume_id = detached_data['resume_id']
+                # Scoring-only field; the response already carries raw_text
+                detached_data.pop('raw_text_lower', None)
                 
                 # Use cached result if already computed
                 cached = existing_results.get(resume_id)
@@ -293,32 +279,30 @@ async def analyze_jd(
                         'candidate_name': detached_data.get('name')
                     }, False
                 
-                # Calculate match score - now completely isolated from DB
-                async with semaphore:
-                    score_result = await calculate_match_score(detached_data, jd_requirements)
-                    
-                    return {
-                        **detached_data,
-                        'match_score': score_result['total_score'],
-                        'skill_match': score_result['skill_match'],
-                        'experience_match': score_result['experience_match'],
-                        'semantic_score': score_result['semantic_score'],
-                        'matched_skills': score_result['matched_skills'],
-                        'missing_skills': score_result['missing_skills'],
-                        'match_explanation': score_result['match_explanation'],
-                        'learning_agility_score': score_result.get('learning_agility_score', 0.0),
-                        'domain_context_score': score_result.get('domain_context_score', 0.0),
-                        'communication_score': score_result.get('communication_score', 0.0),
-                        'factor_breakdown': score_result.get('factor_breakdown', {}),
-                        'candidate_name': detached_data.get('name')
-                    }, True
+                score_result = scored.get(resume_id)
+                if not score_result:
+                    return None, False
+                
+                return {
+                    **detached_data,
+                    'match_score': score_result['total_score'],
+                    'skill_match': score_result['skill_match'],
+                    'experience_match': score_result['experience_match'],
+                    'semantic_score': score_result['semantic_score'],
+                    'matched_skills': score_result['matched_skills'],
+                    'missing_skills': score_result['missing_skills'],
+                    'match_explanation': score_result['match_explanation'],
+                    'learning_agility_score': score_result.get('learning_agility_score', 0.0),
+                    'domain_context_score': score_result.get('domain_context_score', 0.0),
+                    'communication_score': score_result.get('communication_score', 0.0),
+                    'factor_breakdown': score_result.get('factor_breakdown', {}),
+                    'candidate_name': detached_data.get('name')
+                }, True
             except Exception as e:
                 logger.error(f"Error matching resume {detached_data.get('resume_id')}: {e}")
                 return None, False
 
-        # Run scoring tasks with detached data (NO database access here)
-        tasks = [score_resume(data) for data in prelim_data]
-        results = await asyncio.gather(*tasks)
+        results = [build_result(data) for data in prelim_data]
 
         for result, should_persist in results:
             if not result:
@@ -408,14 +392,23 @@ async def get_jd_results(
         match_result = await db.execute(match_query)
         match_results = match_result.scalars().all()
         
-        # Fetch resume details for each match
+        # Fetch every matched resume in one query (plus one per relationship) instead of one per match.
+        # format_resume_response reads every column except raw_text, and both relationships.
+        resumes_by_id = {}
+        resume_ids = {match.resume_id for match in match_results}
+        if resume_ids:
+            resume_query = select(Resume).where(Resume.id.in_(resume_ids)).options(
+                defer(Resume.raw_text, raiseload=True),
+                selectinload(Resume.work_history),
+                selectinload(Resume.certificates),
+                raiseload("*")
+            )
+            resume_result = await db.execute(resume_query)
+            resumes_by_id = {resume.id: resume for resume in resume_result.scalars()}
+        
         matches = []
         for match in match_results:
-            resume_query = select(Resume).where(Resume.id == match.resume_id)
-            resume_result = await db.execute(resume_query)
-            resume = resume_result.scalar_one_or_none()
-            
-
+            resume = resumes_by_id.get(match.resume_id)
             if resume:
                 base_response = format_resume_response(resume)
                 matches.append({
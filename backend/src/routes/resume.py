@@ -8,8 +8,9 @@ from datetime import datetime
 from src.models.resume import Resume
 from src.config.database import get_postgres_db
 from src.middleware.auth_middleware import get_admin_user, get_current_user, decode_access_token, is_token_blacklisted
-from src.services.storage import save_uploaded_file, delete_file
+from src.services.storage import save_uploaded_file_with_hash, delete_file
 from src.services.resume_parser import parse_resume
+from src.services.cache import invalidate_dashboard_stats
 from src.utils.validators import validate_file_type
 from src.utils.logger import get_logger
 from src.utils.response_formatter import format_resume_response, format_resume_list_response
@@ -138,9 +139,9 @@ async def search_resumes(
                 conditions.append(Resume.source_type == source_type)
             
             for user_type in normalized_user_types:
-                # Use JSONB operator for meta_data.user_type (PostgreSQL -> operator)
+                # JSONB containment (@>) so the GIN index on meta_data is used
                 conditions.append(
-                    Resume.meta_data['user_type'].astext == user_type
+                    Resume.meta_data.contains({'user_type': user_type})
                 )
             
             if conditions:
@@ -242,12 +243,12 @@ async def upload_resumes(
                     continue
                 
                 # Save file to disk
-                file_path, file_url = await save_uploaded_file(file, subfolder="resumes")
+                file_path, file_url, content_hash = await save_uploaded_file_with_hash(file, subfolder="resumes")
                 file_extension = file.filename.split('.')[-1]
                 
                 # Parse resume
                 logger.info(f"Parsing resume: {file.filename}")
-                parsed_data = await parse_resume(file_path, file_extension)
+                parsed_data = await parse_resume(file_path, file_extension, content_hash=content_hash)
                 
                 # Clean null bytes from parsed data
                 parsed_data = clean_dict_values(parsed_data)
@@ -256,7 +257,7 @@ async def upload_resumes(
                 resume_email = parsed_data.get('resume_contact_info')
                 existing_resume = None
                 if resume_email:
-                    stmt = select(Resume).where(Resume.parsed_data['resume_contact_info'].astext == resume_email)
+                    stmt = select(Resume).where(Resume.parsed_data.contains({'resume_contact_info': resume_email}))
                     result = await db.execute(stmt)
                     existing_resume = result.scalar_one_or_none()
 
@@ -322,6 +323,8 @@ async def upload_resumes(
                 logger.error(f"Failed to process {file.filename}: {e}")
                 errors.append(f"{file.filename}: {str(e)}")
         
+        if uploaded_resumes:
+            await invalidate_dashboard_stats()
         return {
             'success': len(uploaded_resumes),
             'failed': len(errors),
@@ -361,9 +364,9 @@ async def list_resumes(
             
             # Also check meta_data.user_type for backward compatibility
             for user_type in normalized_user_types:
-                # Use JSONB operator for meta_data.user_type (PostgreSQL -> operator)
+                # JSONB containment (@>) so the GIN index on meta_data is used
                 conditions.append(
-                    Resume.meta_data['user_type'].astext == user_type
+                    Resume.meta_data.contains({'user_type': user_type})
                 )
             
             if conditions:
@@ -436,6 +439,7 @@ async def delete_resume(
         # Delete from database
         await db.execute(delete(Resume).where(Resume.id == resume_id))
         await db.commit()
+        await invalidate_dashboard_stats()
         
         logger.info(f"Deleted resume: {resume_id}")
         return {"message": "Resume deleted successfully"}
@@ -541,7 +545,7 @@ async def upload_user_profile_resume(
             raise HTTPException(status_code=400, detail="Invalid file type. Only PDF and DOCX allowed.")
         
         # Save file to disk
-        file_path, file_url = await save_uploaded_file(file, subfolder="resumes")
+        file_path, file_url, content_hash = await save_uploaded_file_with_hash(file, subfolder="resumes")
         file_extension = file.filename.split('.')[-1]
         
         # Prepare form data for parser
@@ -563,7 +567,7 @@ async def upload_user_profile_resume(
         
         # Parse resume (parse_resume service now handles the robust merging)
         logger.info(f"Parsing user resume: {file.filename}")
-        parsed_data = await parse_resume(file_path, file_extension, form_data=form_data)
+        parsed_data = await parse_resume(file_path, file_extension, form_data=form_data, content_hash=content_hash)
         
         # Clean null bytes from parsed data
         parsed_data = clean_dict_values(parsed_data)
@@ -572,7 +576,7 @@ async def upload_user_profile_resume(
         resume_email = parsed_data.get('resume_contact_info') or uploader_email
         existing_resume = None
         if resume_email:
-            stmt = select(Resume).where(Resume.parsed_data['resume_contact_info'].astext == resume_email)
+            stmt = select(Resume).where(Resume.parsed_data.contains({'resume_contact_info': resume_email}))
             result = await db.execute(stmt)
             existing_resume = result.scalar_one_or_none()
 
@@ -652,6 +656,7 @@ async def upload_user_profile_resume(
         # Save structured data (Experience/Certification)
         await save_structured_resume_data(db, resume.id, parsed_data, clear_existing=True)
         await db.commit()
+        await invalidate_dashboard_stats()
         
         logger.info(f"Successfully processed user profile resume: {file.filename}")
         
@@ -1,58 +1,42 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+import asyncio
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from src.models.resume import Resume
+from celery.result import AsyncResult
 from src.config.database import get_postgres_db
+from src.config.settings import settings
 from src.middleware.auth_middleware import get_admin_user
-from src.services.storage import save_uploaded_file
-from src.services.resume_parser import parse_resume
+from src.services.storage import save_uploaded_file_with_hash
+from src.services.resume_parser import parse_resumes
 from src.utils.validators import validate_file_type
 from src.utils.logger import get_logger
-from src.utils.user_type_mapper import get_user_type_from_source_type
-from src.utils.resume_processor import save_structured_resume_data
+from src.utils.resume_processor import store_admin_resume
+from src.workers.celery_app import celery_app
+from src.workers.tasks import process_admin_resume
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api/resumes/admin", tags=["Admin Resume Uploads"])
 
 ALLOWED_EXTENSIONS = ['pdf', 'docx']
 
-def clean_null_bytes(text: str) -> str:
-    """Remove null bytes from text to prevent PostgreSQL errors"""
-    if text is None:
-        return ""
-    if isinstance(text, str):
-        return text.replace('\x00', '').replace('\0', '')
-    return str(text).replace('\x00', '').replace('\0', '')
-
-def clean_dict_values(data: dict) -> dict:
-    """Recursively clean null bytes from dictionary values"""
-    if not isinstance(data, dict):
-        return data
-    cleaned = {}
-    for key, value in data.items():
-        if isinstance(value, str):
-            cleaned[key] = clean_null_bytes(value)
-        elif isinstance(value, dict):
-            cleaned[key] = clean_dict_values(value)
-        elif isinstance(value, list):
-            cleaned[key] = [clean_null_bytes(str(v)) if isinstance(v, str) else v for v in value]
-        else:
-            cleaned[key] = value
-    return cleaned
-
 @router.post("/bulk")
 async def bulk_upload_resumes(
     files: List[UploadFile] = File(...),
+    background: bool = Query(False, description="Queue large files for background parsing"),
     current_user: dict = Depends(get_admin_user),
     db: AsyncSession = Depends(get_postgres_db)
 ):
     """
     Bulk upload multiple resume files (Admin only)
-    Processes files safely, uploads to Google Drive (if configured), and stores in database
+    Processes files safely, uploads to Google Drive (if configured), and stores in database.
+    With background=true, files above INLINE_PARSE_MAX_BYTES are parsed by a Celery
+    worker instead; their job ids are returned under 'queued' for /jobs/{job_id}.
     """
     try:
         uploaded_resumes = []
         errors = []
+        saved_files = []
+        queued = []
         
         for file in files:
             try:
@@ -62,46 +46,51 @@ async def bulk_upload_resumes(
                     continue
                 
                 # Save file to disk (or Google Drive if configured)
-                file_path, file_url = await save_uploaded_file(file, subfolder="resumes")
+                file_path, file_url, content_hash = await save_uploaded_file_with_hash(file, subfolder="resumes")
                 file_extension = file.filename.split('.')[-1]
+                file_size = file.size if hasattr(file, 'size') else 0
                 
-                # Parse resume
-                logger.info(f"Parsing resume: {file.filename}")
-                parsed_data = await parse_resume(file_path, file_extension)
+                if background and (file_size or 0) > settings.inline_parse_max_bytes:
+                    try:
+                        # Publishing to the broker blocks (and retries while it is down)
+                        job = await asyncio.to_thread(
+                            process_admin_resume.delay,
+                            file_path, file_url, file_extension, file.filename, file_size, current_user['email'],
+                            content_hash
+                        )
+                        queued.append({'filename': file.filename, 'job_id': job.id})
+                        continue
+                    except Exception as e:
+                        logger.warning(f"Could not queue {file.filename}, parsing inline: {e}")
                 
-                # Clean null bytes from parsed data
-                parsed_data = clean_dict_values(parsed_data)
+                saved_files.append((file, file_path, file_url, file_extension, content_hash))
+            
+            except Exception as e:
+                logger.error(f"Failed to process {file.filename}: {e}")
+                errors.append(f"{file.filename}: {str(e)}")
+        
+        # Parse all saved resumes together so OpenAI receives them in batches
+        logger.info(f"Parsing {len(saved_files)} resumes")
+        parsed_results = await parse_resumes([(path, ext, h) for _, path, _, ext, h in saved_files])
+        
+        for (file, _, file_url, _, _), parsed_data in zip(saved_files, parsed_results):
+            try:
+                if isinstance(parsed_data, Exception):
+                    raise parsed_data
                 
-                # Create resume record
-                resume = Resume(
-                    filename=file.filename,
-                    file_url=file_url,
-                    source_type='admin',
-                    source_id=None,
-                    raw_text=clean_null_bytes(parsed_data.get('raw_text', '')),
-                    parsed_data=parsed_data,
-                    skills=parsed_data.get('all_skills', parsed_data.get('resume_technical_skills', [])),
-                    experience_years=parsed_data.get('resume_experience', 0),
-                    uploaded_by=current_user['email'],
-                    meta_data={
-                        'parsing_method': parsed_data.get('parsing_method', 'unknown'),
-                        'file_size': file.size if hasattr(file, 'size') else 0,
-                        'user_type': get_user_type_from_source_type('admin')  # Always set normalized user_type
-                    }
+                resume = await store_admin_resume(
+                    db,
+                    parsed_data,
+                    file.filename,
+                    file_url,
+                    file.size if hasattr(file, 'size') else 0,
+                    current_user['email']
                 )
                 
-                db.add(resume)
-                await db.commit()
-                await db.refresh(resume)
-                
-                # Save structured child records (Experience, Certifications)
-                await save_structured_resume_data(db, resume.id, parsed_data)
-                await db.commit()
-                
                 uploaded_resumes.append({
                     'id': resume.id,
                     'filename': resume.filename,
-                    'candidate_name': parsed_data.get('resume_candidate_name', 'Unknown'),
+                    'candidate_name': resume.parsed_data.get('resume_candidate_name', 'Unknown'),
                     'skills': resume.skills,
                     'experience_years': resume.experience_years
                 })
@@ -116,10 +105,34 @@ async def bulk_upload_resumes(
             'success': len(uploaded_resumes),
             'failed': len(errors),
             'uploaded_resumes': uploaded_resumes,
-            'errors': errors
+            'errors': errors,
+            'queued': queued
         }
     
     except Exception as e:
         logger.error(f"Bulk upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+
+@router.get("/jobs/{job_id}")
+async def get_parse_job_status(
+    job_id: str,
+    current_user: dict = Depends(get_admin_user)
+):
+    """Poll a background resume parsing job queued by /bulk?background=true (Admin only)"""
+    try:
+        def _lookup():
+            job = AsyncResult(job_id, app=celery_app)
+            status = {'job_id': job_id, 'state': job.state}
+            if job.successful():
+                status['result'] = job.result
+            elif job.failed():
+                status['error'] = str(job.result)
+            return status
+        
+        # Result backend lookups are blocking Redis calls
+        return await asyncio.to_thread(_lookup)
+    except Exception as e:
+        logger.error(f"Job status lookup error for {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch job status")
+
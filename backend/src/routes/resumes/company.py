@@ -5,12 +5,13 @@ from datetime import datetime
 from src.models.resume import Resume
 from src.config.database import get_postgres_db
 from src.middleware.auth_middleware import get_admin_user
-from src.services.storage import save_uploaded_file
+from src.services.storage import save_uploaded_file_with_hash
 from src.services.resume_parser import parse_resume, merge_skills
 from src.utils.validators import validate_file_type
 from src.utils.logger import get_logger
 from src.utils.user_type_mapper import get_user_type_from_source_type
 from src.utils.resume_processor import save_structured_resume_data
+from src.services.cache import invalidate_dashboard_stats
 
 logger = get_logger(__name__)
 router = APIRouter(prefix="/api/resumes/company", tags=["Company Employee Resumes"])
@@ -61,7 +62,7 @@ async def upload_company_employee_resume(
             raise HTTPException(status_code=400, detail="Invalid file type. Only PDF and DOCX allowed.")
         
         # Save file to disk (or Google Drive if configured)
-        file_path, file_url = await save_uploaded_file(file, subfolder="resumes")
+        file_path, file_url, content_hash = await save_uploaded_file_with_hash(file, subfolder="resumes")
         file_extension = file.filename.split('.')[-1]
         
         # Prepare form data for parser
@@ -71,7 +72,7 @@ async def upload_company_employee_resume(
         
         # Parse resume
         logger.info(f"Parsing company employee resume: {file.filename} (employee_id: {employee_id})")
-        parsed_data = await parse_resume(file_path, file_extension, form_data=form_data)
+        parsed_data = await parse_resume(file_path, file_extension, form_data=form_data, content_hash=content_hash)
         
         # Clean null bytes from parsed data
         parsed_data = clean_dict_values(parsed_data)
@@ -116,6 +117,7 @@ async def upload_company_employee_resume(
             # Update structured child records
             await save_structured_resume_data(db, existing_resume.id, parsed_data, clear_existing=True)
             await db.commit()
+            await invalidate_dashboard_stats()
             
             logger.info(f"Updated existing company employee resume: {employee_id}")
             
@@ -159,6 +161,7 @@ async def upload_company_employee_resume(
             # Save structured child records
             await save_structured_resume_data(db, resume.id, parsed_data)
             await db.commit()
+            await invalidate_dashboard_stats()
             
             logger.info(f"Successfully uploaded company employee resume: {employee_id}")
             
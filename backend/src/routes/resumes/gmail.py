@@ -6,6 +6,7 @@ from src.config.database import get_postgres_db
 from src.middleware.auth_middleware import get_admin_user
 from src.services.resume_parser import parse_resume
 from src.utils.logger import get_logger
+from src.services.cache import invalidate_dashboard_stats
 import base64
 import tempfile
 import os
@@ -118,6 +119,7 @@ async def gmail_webhook(
                 await db.commit()
                 await db.refresh(resume)
                 logger.info(f"Successfully processed Gmail resume: {message_id}")
+            await invalidate_dashboard_stats()
             
             return {
                 'success': True,
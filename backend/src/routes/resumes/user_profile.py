@@ -5,12 +5,13 @@ from typing import Optional
 from src.models.resume import Resume
 from src.config.database import get_postgres_db
 from src.middleware.auth_middleware import decode_access_token
-from src.services.storage import save_uploaded_file
+from src.services.storage import save_uploaded_file_with_hash
 from src.services.resume_parser import parse_resume
 from src.utils.validators import validate_file_type
 from src.utils.logger import get_logger
 from src.utils.user_type_mapper import normalize_user_type, get_source_type_from_user_type
 from src.utils.resume_processor import save_structured_resume_data
+from src.services.cache import invalidate_dashboard_stats
 
 security = HTTPBearer(auto_error=False)
 logger = get_logger(__name__)
@@ -77,7 +78,7 @@ async def upload_user_profile_resume(
             raise HTTPException(status_code=400, detail="Invalid file type. Only PDF and DOCX allowed.")
         
         # Save file to disk
-        file_path, file_url = await save_uploaded_file(file, subfolder="resumes")
+        file_path, file_url, content_hash = await save_uploaded_file_with_hash(file, subfolder="resumes")
         file_extension = file.filename.split('.')[-1]
         
         # Prepare form data for parser
@@ -89,7 +90,7 @@ async def upload_user_profile_resume(
         
         # Parse resume
         logger.info(f"Parsing user resume: {file.filename}")
-        parsed_data = await parse_resume(file_path, file_extension, form_data=form_data)
+        parsed_data = await parse_resume(file_path, file_extension, form_data=form_data, content_hash=content_hash)
         
         # Clean null bytes from parsed data
         parsed_data = clean_dict_values(parsed_data)
@@ -132,6 +133,7 @@ async def upload_user_profile_resume(
         # Save structured child records
         await save_structured_resume_data(db, resume.id, parsed_data)
         await db.commit()
+        await invalidate_dashboard_stats()
         
         logger.info(f"Successfully uploaded user profile resume: {file.filename}")
         
@@ -0,0 +1,366 @@
+"""Redis-backed cache for expensive results (e.g. GPT responses)."""
+import asyncio
+import functools
+import hashlib
+import json
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+import orjson
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError, ResponseError
+
+from src.config.settings import settings
+from src.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Back off from Redis for this long after a failure so requests don't keep paying connect timeouts
+REDIS_RETRY_AFTER_SECONDS = 30
+
+# Initialize Redis client lazily to avoid import-time connections
+_client = None
+_unavailable_until = 0.0
+
+# Admin dashboard payload; dropped whenever resumes or users are added or removed.
+# Cached through cached_json, whose key for a call without arguments is "<prefix>:<version>"
+DASHBOARD_STATS_CACHE_PREFIX = "admin:dashboard:stats"
+DASHBOARD_STATS_CACHE_VERSION = "v1"
+DASHBOARD_STATS_CACHE_KEY = f"{DASHBOARD_STATS_CACHE_PREFIX}:{DASHBOARD_STATS_CACHE_VERSION}"
+# Last successfully computed dashboard payload, kept (not invalidated) as a fallback for slow databases
+DASHBOARD_STATS_FALLBACK_KEY = "admin:dashboard:stats:last:v1"
+DASHBOARD_STATS_FALLBACK_TTL_SECONDS = 86400
+
+# Set once Redis reports that the RedisBloom module (BF.* commands) is not loaded
+_bloom_unsupported = False
+
+# Calls currently being computed, by cache key; concurrent misses for the same key share one
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+def get_redis_client() -> Optional[aioredis.Redis]:
+    """Get or create the shared Redis client; None while Redis is marked unavailable."""
+    global _client
+    if time.monotonic() < _unavailable_until:
+        return None
+    if _client is None:
+        _client = aioredis.from_url(
+            settings.redis_url,
+            socket_connect_timeout=1,
+            socket_timeout=1,
+        )
+    return _client
+
+
+async def close_redis_client():
+    """Close the shared Redis client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+def _mark_unavailable(e: Exception):
+    global _unavailable_until
+    _unavailable_until = time.monotonic() + REDIS_RETRY_AFTER_SECONDS
+    logger.warning(f"Redis unavailable, caching disabled for {REDIS_RETRY_AFTER_SECONDS}s: {e}")
+
+
+def content_hash(value: Any) -> str:
+    """Short, stable hash of a string or JSON-serialisable value."""
+    # Stays on stdlib json so existing cache keys keep their spelling
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+
+async def cache_get_json(key: str) -> Optional[Any]:
+    """Return the cached JSON value for key, or None on miss or Redis failure."""
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return None
+    return orjson.loads(raw) if raw is not None else None
+
+
+def _dump_json(value: Any) -> bytes:
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+async def cache_set_json(key: str, value: Any, ttl: int):
+    """Store value as JSON under key for ttl seconds; failures are logged and ignored."""
+    await _cache_set_raw(key, _dump_json(value), ttl)
+
+
+async def _cache_set_raw(key: str, raw: bytes, ttl: int):
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        await client.setex(key, ttl, raw)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+
+
+async def cache_set_value(key: str, value: str, ttl: int) -> bool:
+    """Store a plain string under key for ttl seconds; False if Redis is unavailable."""
+    client = get_redis_client()
+    if client is None:
+        return False
+    try:
+        await client.setex(key, ttl, value)
+        return True
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return False
+
+
+async def cache_get_value(key: str) -> Optional[str]:
+    """Return the string stored under key, or None on miss or Redis failure."""
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        raw = await client.get(key)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return None
+    return raw.decode() if raw is not None else None
+
+
+async def cache_exists_many(keys: Sequence[str]) -> Optional[List[bool]]:
+    """Whether each key is cached, in one pipelined round trip; None if Redis is unavailable."""
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.exists(key)
+        return [bool(found) for found in await pipe.execute()]
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return None
+
+
+async def cache_hash_get_many(key: str, fields: Sequence[str]) -> Optional[List[Optional[bytes]]]:
+    """Values of fields in the hash at key (None for missing fields); None if Redis is unavailable."""
+    client = get_redis_client()
+    if client is None:
+        return None
+    try:
+        return await client.hmget(key, list(fields))
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return None
+
+
+async def cache_hash_set(key: str, mapping: Dict[str, Any]) -> bool:
+    """Set fields of the hash at key; False if Redis is unavailable."""
+    if not mapping:
+        return True
+    client = get_redis_client()
+    if client is None:
+        return False
+    try:
+        await client.hset(key, mapping=mapping)
+        return True
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return False
+
+
+async def cache_hash_delete(key: str, *fields: str) -> bool:
+    """Remove fields from the hash at key; False if Redis is unavailable."""
+    client = get_redis_client()
+    if client is None:
+        return False
+    try:
+        await client.hdel(key, *fields)
+        return True
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return False
+
+
+async def cache_hash_prune(key: str, is_stale: Callable[[bytes, bytes], bool], batch_size: int = 1000) -> int:
+    """Remove the fields of the hash at key for which is_stale(field, value) holds. Returns fields removed."""
+    client = get_redis_client()
+    if client is None:
+        return 0
+    removed = 0
+    stale: List[bytes] = []
+    try:
+        async for field, value in client.hscan_iter(key, count=batch_size):
+            if is_stale(field, value):
+                stale.append(field)
+            if len(stale) >= batch_size:
+                removed += await client.hdel(key, *stale)
+                stale.clear()
+        if stale:
+            removed += await client.hdel(key, *stale)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+    return removed
+
+
+async def cache_delete(key: str):
+    """Remove key from the cache; failures are logged and ignored."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        await client.delete(key)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+
+
+async def invalidate_dashboard_stats():
+    """Drop the cached admin dashboard stats so the next request recomputes them."""
+    await cache_delete(DASHBOARD_STATS_CACHE_KEY)
+
+
+async def cache_publish(channel: str, message: str):
+    """Publish message on a Redis pub/sub channel; failures are logged and ignored."""
+    client = get_redis_client()
+    if client is None:
+        return
+    try:
+        await client.publish(channel, message)
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+
+
+def _bloom_error(e: ResponseError):
+    """Handle a BF.* command error: a missing RedisBloom module disables Bloom filters for good."""
+    global _bloom_unsupported
+    if "unknown command" in str(e).lower():
+        _bloom_unsupported = True
+        logger.warning(f"RedisBloom not available, Bloom filters disabled: {e}")
+    else:
+        logger.warning(f"Bloom filter command failed: {e}")
+
+
+async def bloom_add(key: str, items: Sequence[str], capacity: int, error_rate: float) -> bool:
+    """
+    Add items to the Bloom filter at key, creating it with capacity/error_rate if it is missing.
+    False if Redis or the RedisBloom module is unavailable.
+    """
+    if not items:
+        return True
+    client = None if _bloom_unsupported else get_redis_client()
+    if client is None:
+        return False
+    try:
+        await client.execute_command("BF.INSERT", key, "CAPACITY", capacity, "ERROR", error_rate, "ITEMS", *items)
+        return True
+    except ResponseError as e:
+        _bloom_error(e)
+        return False
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return False
+
+
+async def bloom_exists(key: str, item: str, complete_key: str) -> Optional[bool]:
+    """
+    Whether item may be in the Bloom filter at key (False means certainly not). None when
+    complete_key is absent, i.e. the filter is not known to hold every item, when the filter
+    itself is gone (e.g. evicted) or when Redis or the RedisBloom module is unavailable.
+    """
+    client = None if _bloom_unsupported else get_redis_client()
+    if client is None:
+        return None
+    try:
+        pipe = client.pipeline(transaction=False)
+        # BF.EXISTS answers 0 for a missing filter, so both keys must still be there
+        pipe.exists(complete_key, key)
+        pipe.execute_command("BF.EXISTS", key, item)
+        present, found = await pipe.execute()
+    except ResponseError as e:
+        _bloom_error(e)
+        return None
+    except (RedisError, OSError) as e:
+        _mark_unavailable(e)
+        return None
+    return bool(found) if present == 2 else None
+
+
+async def subscribe(channel: str) -> AsyncIterator[bytes]:
+    """
+    Yield the payload of every message published on channel. Uses its own connection,
+    without the shared client's read timeout, since it sits idle between messages.
+    Redis errors propagate so the caller can back off and resubscribe.
+    """
+    client = aioredis.from_url(settings.redis_url, socket_connect_timeout=1)
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    try:
+        await pubsub.subscribe(channel)
+        async for message in pubsub.listen():
+            yield message["data"]
+    finally:
+        await pubsub.close()
+        await client.close()
+
+
+def cache_key(prefix: str, *args, version: str = "", **kwargs) -> str:
+    """Build the cache key cached_json uses for these call arguments."""
+    parts = [content_hash(arg) for arg in args]
+    if kwargs:
+        parts.append(content_hash(kwargs))
+    return ":".join([prefix, *parts, version])
+
+
+def cached_json(prefix: str, ttl: Optional[int] = None, version: str = ""):
+    """
+    Cache an async function's JSON-serialisable result in Redis.
+    The key is prefix, a hash per positional argument and the optional version
+    (e.g. the model name), so identical inputs skip the call entirely.
+    Concurrent calls with the same key while the first is still running wait for
+    it instead of repeating the call.
+    """
+    def decorator(func: Callable):
+        async def compute_and_store(key: str, args, kwargs) -> bytes:
+            # Serialized once, before any caller sees the result, so every waiter (the first
+            # caller included) decodes its own copy and callers can mutate what they get
+            raw = _dump_json(await func(*args, **kwargs))
+            await _cache_set_raw(key, raw, ttl or settings.gpt_cache_ttl_seconds)
+            return raw
+
+        async def join(task: asyncio.Task):
+            logger.info(f"Joining in-flight {func.__name__} call ({prefix})")
+            return orjson.loads(await asyncio.shield(task))
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = cache_key(prefix, *args, version=version, **kwargs)
+            inflight = _inflight.get(key)
+            if inflight is not None:
+                return await join(inflight)
+            cached = await cache_get_json(key)
+            if cached is not None:
+                logger.info(f"Cache hit for {func.__name__} ({prefix})")
+                return cached
+            # Another caller may have started the call while we checked Redis
+            inflight = _inflight.get(key)
+            if inflight is not None:
+                return await join(inflight)
+            
+            task = asyncio.ensure_future(compute_and_store(key, args, kwargs))
+            _inflight[key] = task
+            task.add_done_callback(functools.partial(_finish_inflight, key))
+            # Shielded so a cancelled first caller doesn't cancel the call for the others
+            return orjson.loads(await asyncio.shield(task))
+        return wrapper
+    return decorator
+
+
+def _finish_inflight(key: str, task: asyncio.Task):
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # Mark retrieved even if every waiter was cancelled
@@ -1,7 +1,9 @@
 """File processing utilities for extracting text from various file formats."""
+import mmap
+import zipfile
 import PyPDF2
 import pdfplumber
-from docx import Document
+from lxml import etree
 from typing import Optional
 from src.utils.logger import get_logger
 
@@ -16,11 +18,17 @@ def extract_text_from_pdf(file_path: str) -> str:
     try:
         # Try pdfplumber first (better for complex PDFs)
         with pdfplumber.open(file_path) as pdf:
-            text = ""
+            parts = []
             for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+                # Image-only pages have no character stream, so there is nothing to lay out
+                if page.chars:
+                    # Simple line clustering over the cached chars; skips the word-layout pass
+                    page_text = page.extract_text_simple()
+                    if page_text:
+                        parts.append(page_text)
+                # Drop the page's parsed objects so memory stays flat across long PDFs
+                page.flush_cache()
+            text = "\n".join(parts)
             
             if text.strip():
                 logger.info(f"Extracted {len(text)} characters from PDF using pdfplumber")
@@ -30,8 +38,9 @@ def extract_text_from_pdf(file_path: str) -> str:
     
     # Fallback to PyPDF2
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
+        # Read through a memory map so pages come from the page cache instead of being copied in
+        with open(file_path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pdf_reader = PyPDF2.PdfReader(mm)
             text = ""
             for page in pdf_reader.pages:
                 text += page.extract_text() + "\n"
@@ -43,11 +52,31 @@ def extract_text_from_pdf(file_path: str) -> str:
         return ""
 
 
+_W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_P, _W_T, _W_TAB, _W_BR = (_W_NS + tag for tag in ('p', 't', 'tab', 'br'))
+
+
 def extract_text_from_docx(file_path: str) -> str:
-    """Extract text from DOCX file."""
+    """
+    Extract text from DOCX file.
+    Streams word/document.xml instead of building a python-docx Document.
+    """
     try:
-        doc = Document(file_path)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+        paragraphs = []
+        runs = []
+        with zipfile.ZipFile(file_path) as archive, archive.open('word/document.xml') as xml_file:
+            for _, element in etree.iterparse(xml_file, tag=(_W_P, _W_T, _W_TAB, _W_BR)):
+                if element.tag == _W_T:
+                    runs.append(element.text or '')
+                elif element.tag == _W_TAB:
+                    runs.append('\t')
+                elif element.tag == _W_BR:
+                    runs.append('\n')
+                else:
+                    paragraphs.append(''.join(runs))
+                    runs = []
+                    element.clear()
+        text = "\n".join(paragraphs)
         logger.info(f"Extracted {len(text)} characters from DOCX")
         return text.strip()
     except Exception as e:
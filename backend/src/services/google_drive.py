@@ -4,7 +4,7 @@ from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
 from googleapiclient.errors import HttpError
-from typing import Optional, Tuple
+from typing import BinaryIO, Optional, Tuple, Union
 from src.utils.logger import get_logger
 from src.config.settings import settings
 import io
@@ -40,7 +40,7 @@ def get_google_drive_service():
 
 
 async def upload_file_to_gdrive(
-    file_bytes: bytes,
+    file_bytes: Union[bytes, BinaryIO],
     filename: str,
     folder_id: Optional[str] = None
 ) -> Tuple[str, str]:
@@ -62,7 +62,7 @@ async def upload_file_to_gdrive(
             file_metadata['parents'] = [folder_id]
         
         media = MediaIoBaseUpload(
-            io.BytesIO(file_bytes),
+            io.BytesIO(file_bytes) if isinstance(file_bytes, bytes) else file_bytes,
             mimetype='application/pdf' if filename.endswith('.pdf') else 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
             resumable=True
         )
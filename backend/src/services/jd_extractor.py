@@ -2,6 +2,7 @@
 import json
 from typing import Dict, List
 from src.utils.logger import get_logger
+from src.utils.skill_taxonomy import normalize_skills
 from .openai_service import extract_jd_requirements as _extract_jd_requirements
 
 logger = get_logger(__name__)
@@ -21,8 +22,7 @@ async def extract_jd_keywords(jd_text: str) -> List[str]:
         required = req.get("required_skills", [])
         preferred = req.get("preferred_skills", [])
         # Merge and de-duplicate
-        merged = list({*(keywords or []), *(required or []), *(preferred or [])})
-        return merged
+        return normalize_skills([*(keywords or []), *(required or []), *(preferred or [])])
     except Exception as e:
         logger.error(f"JD keyword extraction failed: {e}")
         return []
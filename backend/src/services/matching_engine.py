@@ -1,11 +1,63 @@
 """Matching engine for resume-JD matching."""
-from typing import Dict, List
+import asyncio
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import ahocorasick
 from src.services import openai_service
+from src.config.settings import settings
 from src.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+class _RateLimiter:
+    """Spaces out call starts so no more than per_second begin each second."""
+
+    def __init__(self, per_second: float):
+        self._interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self._interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self._interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def score_candidates(
+    resumes: List[Dict],
+    jd_requirements: Dict,
+    max_concurrency: Optional[int] = None,
+    max_per_second: Optional[float] = None
+) -> List[Optional[Dict]]:
+    """
+    Score many candidates against one JD, keeping OpenAI busy without exceeding
+    the account rate limit. Returns one result per resume (None if scoring failed).
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or settings.openai_max_concurrency)
+    limiter = _RateLimiter(max_per_second or settings.openai_rps)
+
+    async def score(resume_data: Dict) -> Optional[Dict]:
+        # Clear-cut strong matches don't take a GPT slot at all
+        high_confidence = _high_confidence_result(resume_data, jd_requirements)
+        if high_confidence:
+            return high_confidence
+        async with semaphore:
+            await limiter.wait()
+            try:
+                return await _calculate_gpt_match_score(resume_data, jd_requirements)
+            except Exception as e:
+                logger.error(f"Error matching resume {resume_data.get('resume_id')}: {e}")
+                return None
+
+    return await asyncio.gather(*(score(resume_data) for resume_data in resumes))
+
+
 async def calculate_match_score(resume_data: Dict, jd_requirements: Dict) -> Dict:
     """
     Calculate match score using Deterministic Scoring Architecture.
@@ -15,7 +67,43 @@ async def calculate_match_score(resume_data: Dict, jd_requirements: Dict) -> Dic
     Flow:
     1. GPT-4o → Qualitative judgments (match level, ownership, evidence)
     2. Backend → Numeric calculations (deterministic, auditable)
+    
+    Candidates whose traditional score and skill overlap are already near perfect
+    skip GPT (method 'traditional_high_confidence'); it would not change their rank.
     """
+    high_confidence = _high_confidence_result(resume_data, jd_requirements)
+    if high_confidence:
+        return high_confidence
+    return await _calculate_gpt_match_score(resume_data, jd_requirements)
+
+
+def _high_confidence_result(resume_data: Dict, jd_requirements: Dict) -> Optional[Dict]:
+    """Traditional result for a near-perfect match, or None when GPT should score it."""
+    if not jd_requirements.get('required_skills'):
+        return None  # No requirements to be confident about
+    skill_match = calculate_skill_match(
+        resume_data.get('skills', []),
+        jd_requirements.get('required_skills', [])
+    )
+    if skill_match < settings.high_confidence_skill_match:
+        return None
+    traditional_score = calculate_traditional_score(resume_data, jd_requirements, skill_match=skill_match)
+    if traditional_score < settings.high_confidence_traditional_score:
+        return None
+    
+    logger.info(
+        f"High-confidence gate: skipping GPT for {resume_data.get('resume_candidate_name', 'Unknown')} "
+        f"(traditional={traditional_score:.1f}, skills={skill_match:.1f})"
+    )
+    return _calculate_traditional_fallback(
+        resume_data, jd_requirements,
+        method='traditional_high_confidence',
+        explanation='Strong traditional match on skills, experience and keywords'
+    )
+
+
+async def _calculate_gpt_match_score(resume_data: Dict, jd_requirements: Dict) -> Dict:
+    """GPT qualitative judgments plus deterministic backend scoring (see calculate_match_score)."""
     from src.services import deterministic_scorer
     
     try:
@@ -90,7 +178,12 @@ async def calculate_match_score(resume_data: Dict, jd_requirements: Dict) -> Dic
         return _calculate_traditional_fallback(resume_data, jd_requirements)
 
 
-def _calculate_traditional_fallback(resume_data: Dict, jd_requirements: Dict) -> Dict:
+def _calculate_traditional_fallback(
+    resume_data: Dict,
+    jd_requirements: Dict,
+    method: str = 'traditional_fallback',
+    explanation: str = 'Fallback traditional scoring used'
+) -> Dict:
     """
     Fallback to traditional scoring if Universal Fit Scorer fails.
     This is the old 3-factor model for emergency use only.
@@ -105,10 +198,7 @@ def _calculate_traditional_fallback(resume_data: Dict, jd_requirements: Dict) ->
         jd_requirements.get('min_experience_years', 0)
     )
     
-    keyword_match = calculate_keyword_match(
-        resume_data.get('raw_text', ''),
-        jd_requirements.get('keywords', [])
-    )
+    keyword_match = _resume_keyword_match(resume_data, jd_requirements.get('keywords', []))
     
     traditional_score = (skill_match * 0.4) + (exp_match * 0.3) + (keyword_match * 0.3)
     
@@ -122,78 +212,128 @@ def _calculate_traditional_fallback(resume_data: Dict, jd_requirements: Dict) ->
         'communication_score': 0.0,
         'matched_skills': [],
         'missing_skills': [],
-        'match_explanation': 'Fallback traditional scoring used',
+        'match_explanation': explanation,
         'factor_breakdown': {},
-        'method': 'traditional_fallback'
+        'method': method
     }
 
 
-def calculate_traditional_score(resume_data: Dict, jd_requirements: Dict) -> float:
+def calculate_traditional_score(resume_data: Dict, jd_requirements: Dict,
+                                skill_match: Optional[float] = None) -> float:
     """
     Traditional scoring algorithm:
     - Skill match: 40%
     - Experience match: 30%
     - Keyword match: 30%
+    skill_match may be passed in when it was precomputed with batch_skill_scores.
     """
-    skill_score = calculate_skill_match(
-        resume_data.get('skills', []),
-        jd_requirements.get('required_skills', [])
-    ) * 0.4
+    if skill_match is None:
+        skill_match = calculate_skill_match(
+            resume_data.get('skills', []),
+            jd_requirements.get('required_skills', [])
+        )
+    skill_score = skill_match * 0.4
     
     experience_score = calculate_experience_match(
         resume_data.get('experience_years', 0),
         jd_requirements.get('min_experience_years', 0)
     ) * 0.3
     
-    keyword_score = calculate_keyword_match(
-        resume_data.get('raw_text', ''),
-        jd_requirements.get('keywords', [])
-    ) * 0.3
+    keyword_score = _resume_keyword_match(resume_data, jd_requirements.get('keywords', [])) * 0.3
     
     total_score = skill_score + experience_score + keyword_score
     return min(total_score, 100)  # Cap at 100
 
 
+def _normalize_skill_list(skills: List[str]) -> List[str]:
+    return [s.lower().strip() for s in skills if s and len(s) > 1]
+
+
+def _skill_fuzzy_matches(req_skill: str, res_skill: str) -> bool:
+    """Substring or multi-word overlap match of one required skill against one resume skill."""
+    if req_skill in res_skill or res_skill in req_skill:
+        return True
+    
+    # Smart overlap for multi-word skills (e.g. "Palo Alto Threat Protection" matches "Palo Alto")
+    if " " in req_skill:
+        req_parts = set(req_skill.split())
+        if len(req_parts) > 1:
+            # If 50% of the words in the required skill are present in the resume skill
+            overlap = req_parts.intersection(res_skill.split())
+            return len(overlap) >= max(1, len(req_parts) // 2)
+    return False
+
+
+def _fuzzy_skill_match(req_skill: str, resume_skills_lower: List[str]) -> bool:
+    """Substring or multi-word overlap match of one required skill (exact matches checked by the caller)."""
+    return any(_skill_fuzzy_matches(req_skill, res_skill) for res_skill in resume_skills_lower)
+
+
 def calculate_skill_match(resume_skills: List[str], required_skills: List[str]) -> float:
     """Calculate skill overlap percentage with smart substring support."""
     if not required_skills:
         return 70.0  # Be optimistic if no requirements are set
     
     # Normalize skills to lowercase for comparison
-    resume_skills_lower = [s.lower().strip() for s in resume_skills if s and len(s) > 1]
-    required_skills_lower = [s.lower().strip() for s in required_skills if s and len(s) > 1]
+    resume_skills_lower = _normalize_skill_list(resume_skills)
+    resume_skills_set = frozenset(resume_skills_lower)
+    required_skills_lower = _normalize_skill_list(required_skills)
     
     if not required_skills_lower:
         return 70.0
 
     matched_count = 0
     for req_skill in required_skills_lower:
-        is_matched = False
-        # 1. Exact or simple substring match
-        for res_skill in resume_skills_lower:
-            if req_skill == res_skill or req_skill in res_skill or res_skill in req_skill:
-                is_matched = True
-                break
-        
-        # 2. Smart overlap for multi-word skills (e.g. "Palo Alto Threat Protection" matches "Palo Alto")
-        if not is_matched and " " in req_skill:
-            req_parts = set(req_skill.split())
-            if len(req_parts) > 1:
-                for res_skill in resume_skills_lower:
-                    res_parts = set(res_skill.split())
-                    # If 50% of the words in the required skill are present in the resume skill
-                    overlap = req_parts.intersection(res_parts)
-                    if len(overlap) >= max(1, len(req_parts) // 2):
-                        is_matched = True
-                        break
-        
-        if is_matched:
+        # Exact match is a set lookup; only misses pay for the substring scan
+        if req_skill in resume_skills_set or _fuzzy_skill_match(req_skill, resume_skills_lower):
             matched_count += 1
             
     match_percentage = (matched_count / len(required_skills_lower)) * 100
     return min(match_percentage, 100.0)
 
 
+def batch_skill_scores(candidate_skills: List[List[str]], required_skills: List[str]) -> List[Optional[float]]:
+    """
+    calculate_skill_match for many candidates against one JD.
+    Candidates are indexed by skill (skill -> candidates), and each required skill is
+    matched once against the distinct skills rather than against every candidate's list,
+    so a skill shared by many candidates is compared once. None marks a candidate whose
+    skill list could not be read (e.g. non-string entries in GPT output).
+    """
+    if not required_skills:
+        return [70.0] * len(candidate_skills)
+    required_skills_lower = _normalize_skill_list(required_skills)
+    if not required_skills_lower:
+        return [70.0] * len(candidate_skills)
+    
+    postings: Dict[str, set] = {}
+    failed = set()
+    for i, skills in enumerate(candidate_skills):
+        try:
+            normalized = _normalize_skill_list(skills)
+        except Exception as e:
+            logger.error(f"Skill scoring failed for candidate {i}: {e}")
+            failed.add(i)
+            continue
+        for skill in normalized:
+            postings.setdefault(skill, set()).add(i)
+    
+    counts = [0] * len(candidate_skills)
+    for req_skill in required_skills_lower:
+        matched = set()
+        for skill, holders in postings.items():
+            # Exact matches are substring matches too
+            if _skill_fuzzy_matches(req_skill, skill):
+                matched |= holders
+        for i in matched:
+            counts[i] += 1
+    
+    return [
+        None if i in failed else min((count / len(required_skills_lower)) * 100, 100.0)
+        for i, count in enumerate(counts)
+    ]
+
+
 def calculate_experience_match(resume_exp: float, required_exp: float) -> float:
     """Calculate experience match score with more generous thresholds for Phase 1."""
     # Harden against NoneType
@@ -211,19 +351,60 @@ def calculate_experience_match(resume_exp: float, required_exp: float) -> float:
     return (ratio * 80) + 20 # Minimum 20 points if they have ANY experience
 
 
+# Above this many keywords, one Aho-Corasick pass over the text beats a substring search per keyword
+# (the automaton is cached per keyword list, so its build cost is paid once per JD)
+KEYWORD_AUTOMATON_THRESHOLD = 8
+
+
+@lru_cache(maxsize=64)
+def _keyword_automaton(keywords_lower: Tuple[str, ...]) -> ahocorasick.Automaton:
+    """Automaton for one JD's keywords, built once and reused for every resume scored against it."""
+    automaton = ahocorasick.Automaton()
+    for kw in keywords_lower:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+
+def _keywords_in_text(keywords_lower: List[str], text_lower: str) -> set:
+    """Return the subset of keywords occurring in text_lower."""
+    if len(keywords_lower) <= KEYWORD_AUTOMATON_THRESHOLD:
+        return {kw for kw in keywords_lower if kw in text_lower}
+    automaton = _keyword_automaton(tuple(keywords_lower))
+    return {kw for _, kw in automaton.iter(text_lower)}
+
+
 def calculate_keyword_match(resume_text: str, keywords: List[str]) -> float:
     """Calculate keyword match percentage with boundary checks."""
     if not keywords:
         return 70.0
     
-    resume_text_lower = resume_text.lower()
+    keywords_lower = [kw.lower().strip() for kw in keywords]
+    return _keyword_match_normalized(resume_text.lower(), keywords_lower, len(keywords))
+
+
+def _resume_text_lower(resume_data: Dict) -> str:
+    """Lowercased resume text, reusing raw_text_lower when the caller already computed it."""
+    return resume_data.get('raw_text_lower') or (resume_data.get('raw_text') or '').lower()
+
+
+def _resume_keyword_match(resume_data: Dict, keywords: List[str]) -> float:
+    """calculate_keyword_match over a resume_data dict without re-lowercasing its text."""
+    if not keywords:
+        return 70.0
+    keywords_lower = [kw.lower().strip() for kw in keywords]
+    return _keyword_match_normalized(_resume_text_lower(resume_data), keywords_lower, len(keywords))
+
+
+def _keyword_match_normalized(resume_text_lower: str, keywords_lower: List[str], keyword_count: int) -> float:
+    """calculate_keyword_match for text and keywords that are already lowercased."""
+    found = _keywords_in_text([kw for kw in keywords_lower if kw], resume_text_lower)
     matched = 0
-    for keyword in keywords:
-        kw_lower = keyword.lower().strip()
+    for kw_lower in keywords_lower:
         if not kw_lower: continue
         
         # Check if keyword is in text
-        if kw_lower in resume_text_lower:
+        if kw_lower in found:
             matched += 1
         # Smart check for multi-word keywords
         elif " " in kw_lower:
@@ -231,6 +412,40 @@ def calculate_keyword_match(resume_text: str, keywords: List[str]) -> float:
             if all(p in resume_text_lower for p in parts if len(p) > 2):
                 matched += 1
                 
-    match_percentage = (matched / len(keywords)) * 100
+    match_percentage = (matched / keyword_count) * 100
     return min(match_percentage, 100.0)
 
+
+def batch_traditional_scores(resumes: List[Dict], jd_requirements: Dict) -> List[Optional[float]]:
+    """
+    calculate_traditional_score for many candidates against one JD.
+    The JD's skills and keywords are normalized once; per candidate only the three
+    factor scores are computed and combined. None marks a candidate that failed to score.
+    """
+    skill_scores = batch_skill_scores(
+        [resume_data.get('skills', []) for resume_data in resumes],
+        jd_requirements.get('required_skills', [])
+    )
+    keywords = jd_requirements.get('keywords', [])
+    keywords_lower = [kw.lower().strip() for kw in keywords]
+    required_exp = jd_requirements.get('min_experience_years', 0)
+    
+    totals: List[Optional[float]] = []
+    for resume_data, skill_score in zip(resumes, skill_scores):
+        if skill_score is None:
+            # Unreadable skills; batch_skill_scores already logged it
+            totals.append(None)
+            continue
+        try:
+            experience_score = calculate_experience_match(resume_data.get('experience_years', 0), required_exp)
+            if keywords:
+                keyword_score = _keyword_match_normalized(
+                    _resume_text_lower(resume_data), keywords_lower, len(keywords)
+                )
+            else:
+                keyword_score = 70.0
+            totals.append(min(skill_score * 0.4 + experience_score * 0.3 + keyword_score * 0.3, 100))
+        except Exception as e:
+            logger.error(f"Traditional scoring failed for resume {resume_data.get('resume_id')}: {e}")
+            totals.append(None)
+    return totals
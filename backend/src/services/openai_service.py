@@ -1,9 +1,14 @@
 """OpenAI service for AI-powered parsing and matching."""
 import json
+from itertools import islice
+import httpx
+import orjson
 from openai import AsyncOpenAI
-from typing import Dict, List
+from typing import Dict, List, Union
 from src.utils.logger import get_logger
 from src.config.settings import settings
+from src.utils.text_compaction import compact_resume, compact_jd
+from src.services.cache import cached_json, cache_key, cache_get_json, cache_set_json, content_hash
 
 logger = get_logger(__name__)
 
@@ -11,42 +16,22 @@ logger = get_logger(__name__)
 OPENAI_API_KEY = settings.openai_api_key
 OPENAI_MODEL = settings.openai_model
 OPENAI_MAX_TOKENS = settings.openai_max_tokens
-
-# Initialize OpenAI client lazily to avoid import-time errors
-_client = None
-
-
-def get_openai_client():
-    """Get or create OpenAI client (lazy initialization)."""
-    global _client
-    if _client is None and OPENAI_API_KEY:
-        try:
-            _client = AsyncOpenAI(api_key=OPENAI_API_KEY)
-        except Exception as e:
-            logger.warning(f"Failed to initialize OpenAI client: {e}")
-            _client = None
-    return _client
-
-
-async def parse_resume_with_gpt(resume_text: str) -> Dict:
-    """
-    Use GPT-4 to extract structured data from resume text.
-    Returns: Structured resume data as dictionary matching ParsedResume schema.
-    """
-    client = get_openai_client()
-    if not client:
-        logger.error("OpenAI client not initialized - API key missing or invalid")
-        raise ValueError("OpenAI API key not configured")
-    
-    try:
-        system_prompt = """You are an expert resume parser and HR analyst. 
+# Output caps sized to each response schema (resume parse ~300-800 tokens)
+MAX_TOKENS_PARSE = min(settings.openai_max_tokens_parse, OPENAI_MAX_TOKENS)
+MAX_TOKENS_JD = min(settings.openai_max_tokens_jd, OPENAI_MAX_TOKENS)
+MAX_TOKENS_MATCH = min(settings.openai_max_tokens_match, OPENAI_MAX_TOKENS)
+# A batch request gets MAX_TOKENS_PARSE per resume, so this many fit under the ceiling
+MAX_PARSE_BATCH_SIZE = max(1, OPENAI_MAX_TOKENS // MAX_TOKENS_PARSE)
+
+# Prompts are module-level constants and always sent before the variable
+# resume/JD text, so every request shares an identical prefix that OpenAI's
+# prompt cache can reuse. Keep per-request data out of these strings.
+RESUME_PARSE_SYSTEM_PROMPT = """You are an expert resume parser and HR analyst. 
 Extract structured information from resumes with high accuracy.
 NEVER hallucinate or invent data. If information is not present, use "Not mentioned" for strings, 0.0 for numbers, or empty arrays.
 Return data as valid JSON only, no additional text."""
-        
-        logger.info(f"Parsing resume. Text length: {len(resume_text)}")
-        user_prompt = f"""Extract Resume Data (JSON only):
-{resume_text[:4000]}
+
+RESUME_PARSE_INSTRUCTIONS = """Extract Resume Data (JSON only) from the resume in the next message.
 
 Fields:
 "resume_candidate_name", 
@@ -64,7 +49,7 @@ Fields:
 "notice_period" (days), 
 "ready_to_relocate" (bool),
 "work_history": [
-  {{
+  {
     "company": "...",
     "role": "...",
     "location": "...",
@@ -72,63 +57,16 @@ Fields:
     "end_date": "...",
     "is_current": 0 | 1,
     "description": "Brief summary of responsibilities and achievements in this role"
-  }}
+  }
 ]
 """
-        
-        response = await client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=min(OPENAI_MAX_TOKENS, 4096),
-            temperature=0.1 # High precision
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        
-        # Normalize skills to lowercase and deduplicate
-        if "resume_technical_skills" in result:
-            result["resume_technical_skills"] = list(set([s.lower().strip() for s in result["resume_technical_skills"] if s]))
-        if "all_skills" in result:
-            result["all_skills"] = list(set([s.lower().strip() for s in result["all_skills"] if s]))
-        
-        # Ensure all required fields have defaults
-        result.setdefault("resume_candidate_name", "Not mentioned")
-        result.setdefault("resume_contact_info", "Not mentioned")
-        result.setdefault("resume_role", "Not mentioned")
-        result.setdefault("resume_location", "Not mentioned")
-        result.setdefault("resume_degree", "Not mentioned")
-        result.setdefault("resume_university", "Not mentioned")
-        result.setdefault("resume_experience", 0.0)
-        result.setdefault("resume_technical_skills", [])
-        result.setdefault("resume_projects", [])
-        result.setdefault("resume_achievements", [])
-        result.setdefault("resume_certificates", [])
-        result.setdefault("all_skills", [])
-        
-        logger.info(f"Successfully parsed resume with GPT-4")
-        return result
-    
-    except Exception as e:
-        logger.error(f"GPT-4 resume parsing failed: {e}")
-        raise
 
+RESUME_BATCH_INSTRUCTIONS = """The next message contains several resumes, each starting with a
+"--- RESUME <n> ---" delimiter. Parse each one independently using the fields above.
+Return JSON {"results": [{...}, {...}]} with exactly one object per resume, in the same order.
+"""
 
-async def extract_jd_requirements(jd_text: str) -> Dict:
-    """
-    Use GPT-4 to analyze job description and extract requirements.
-    Returns: Structured JD requirements.
-    """
-    client = get_openai_client()
-    if not client:
-        logger.error("OpenAI client not initialized - API key missing or invalid")
-        raise ValueError("OpenAI API key not configured")
-    
-    try:
-        system_prompt = """You are an enterprise-grade Job Description (JD) Decomposition Engine.
+JD_EXTRACT_SYSTEM_PROMPT = """You are an enterprise-grade Job Description (JD) Decomposition Engine.
 
 Your ONLY task is to analyze a Job Description (JD) and convert it into a
 structured, weighted requirement model suitable for strict resume matching.
@@ -200,70 +138,13 @@ return JSON in the following structure ONLY:
   }
 }
 """
-        
-        user_prompt = f"""Analyze this job description:
 
-{jd_text[:3500]}
+JD_EXTRACT_INSTRUCTIONS = """Analyze the job description in the next message.
 
 Decompose into the strict JSON format required.
 """
-        
-        # Use a safe maximum for tokens
-        max_tokens = min(OPENAI_MAX_TOKENS, 4096)
-        
-        response = await client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=max_tokens,
-            temperature=0.2 # Low temperature for consistency
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        
-        # Backward compatibility mapping for `jd_analysis.py` which expects flat structure
-        # We perform this mapping here so the rest of the app continues to work while we transition
-        flattened_result = {
-            "job_level": (result.get("experience_seniority") or {}).get("role_level", "Experienced"),
-            "min_experience_years": (result.get("experience_seniority") or {}).get("required_years") or 0,
-            "required_skills": (
-                result.get("core_technical_skills", {}).get("items", []) + 
-                result.get("networking_protocols", {}).get("items", []) +
-                result.get("security_technologies", {}).get("items", []) +
-                result.get("cloud_architecture", {}).get("items", [])
-            ),
-            "keywords": (
-                result.get("compliance_governance", {}).get("items", []) +
-                result.get("incident_operations", {}).get("items", [])
-            ),
-            # Store the full structured decomposition for the matcher
-            "structured_requirements": result,
-            "weights": {k: v.get("weight", 0) for k, v in result.items() if isinstance(v, dict)}
-        }
-        
-        logger.info(f"Successfully extracted JD requirements with GPT-4")
-        return flattened_result
-    
-    except Exception as e:
-        logger.error(f"GPT-4 JD extraction failed: {e}")
-        raise
 
-
-async def calculate_intelligent_match(resume_data: Dict, jd_requirements: Dict) -> Dict:
-    """
-    Use GPT-4 to perform intelligent semantic matching.
-    Returns: Match score and detailed analysis.
-    """
-    client = get_openai_client()
-    if not client:
-        logger.error("OpenAI client not initialized - API key missing or invalid")
-        raise ValueError("OpenAI API key not configured")
-    
-    try:
-        system_prompt = """You are an enterprise-grade Resume Analysis Engine.
+MATCH_SYSTEM_PROMPT = """You are an enterprise-grade Resume Analysis Engine.
 
 Your task is to provide QUALITATIVE JUDGMENTS ONLY for each JD category.
 
@@ -343,16 +224,295 @@ OUTPUT FORMAT (JSON ONLY):
   }
 }
 """
+
+MATCH_INSTRUCTIONS = """ANALYZE THE CANDIDATE RESUME AGAINST THE JD REQUIREMENTS PROVIDED IN THE NEXT MESSAGES.
+
+For EACH JD category, provide:
+1. Match level (HIGH/MEDIUM/LOW/NO)
+2. Ownership level (LED/OWNED/CONTRIBUTED/ASSISTED/NONE)
+3. Specific evidence from resume
+4. Whether experience is recent (last 5 years)
+
+Return ONLY the JSON structure specified in the system prompt.
+"""
+
+# Cached resume parses are keyed by model and prompt, so editing the prompt re-parses
+RESUME_CACHE_VERSION = f"{OPENAI_MODEL}:{content_hash(RESUME_PARSE_SYSTEM_PROMPT + RESUME_PARSE_INSTRUCTIONS)[:8]}"
+
+# Shared OpenAI client; created at app startup (or lazily on first use in scripts/workers)
+_client = None
+
+
+def get_openai_client():
+    """Get or create OpenAI client (lazy initialization)."""
+    global _client
+    if _client is None and OPENAI_API_KEY:
+        try:
+            # One pooled HTTP/2 client for all calls so connections and TLS sessions are reused
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=200, max_keepalive_connections=100, keepalive_expiry=60.0),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                http2=True
+            )
+            # The SDK backs off exponentially with jitter (honouring Retry-After) on 429s
+            _client = AsyncOpenAI(
+                api_key=OPENAI_API_KEY,
+                max_retries=settings.openai_max_retries,
+                http_client=http_client
+            )
+        except Exception as e:
+            logger.warning(f"Failed to initialize OpenAI client: {e}")
+            _client = None
+    return _client
+
+
+async def init_openai_client():
+    """
+    Create the OpenAI client during app startup and open its HTTP/2 connection
+    with a cheap models lookup, so the first request doesn't pay for the TLS handshake.
+    """
+    client = get_openai_client()
+    if not client:
+        return
+    try:
+        await client.with_options(timeout=5.0, max_retries=0).models.retrieve(OPENAI_MODEL)
+        logger.info("OpenAI client initialized and connected")
+    except Exception as e:
+        # Not fatal: the connection is opened on first use instead
+        logger.warning(f"OpenAI preconnect failed: {e}")
+
+
+async def close_openai_client():
+    """Close the OpenAI client and its connection pool (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+
+@cached_json("resume", version=RESUME_CACHE_VERSION)
+async def parse_resume_with_gpt(resume_text: str) -> Dict:
+    """
+    Use GPT-4 to extract structured data from resume text.
+    Returns: Structured resume data as dictionary matching ParsedResume schema.
+    """
+    client = get_openai_client()
+    if not client:
+        logger.error("OpenAI client not initialized - API key missing or invalid")
+        raise ValueError("OpenAI API key not configured")
+    
+    try:
+        logger.info(f"Parsing resume. Text length: {len(resume_text)}")
         
-        # Prepare structured inputs for the prompt
-        structured_jd = jd_requirements.get('structured_requirements', jd_requirements)
+        response = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": RESUME_PARSE_SYSTEM_PROMPT},
+                {"role": "user", "content": RESUME_PARSE_INSTRUCTIONS},
+                {"role": "user", "content": f"RESUME:\n{compact_resume(resume_text)}"}
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=MAX_TOKENS_PARSE,
+            temperature=0.1 # High precision
+        )
+        
+        _warn_if_truncated(response, "resume parse")
+        result = _normalize_parsed_resume(orjson.loads(response.choices[0].message.content))
+        
+        logger.info(f"Successfully parsed resume with GPT-4")
+        return result
+    
+    except Exception as e:
+        logger.error(f"GPT-4 resume parsing failed: {e}")
+        raise
+
+
+async def parse_resumes_batch(
+    resume_texts: List[str],
+    batch_size: int = None
+) -> List[Union[Dict, Exception]]:
+    """
+    Parse several resumes with one GPT request per batch (row-marshaling).
+    Returns one entry per input, in order: the parsed dict, or the exception
+    if that resume could not be parsed. Cached resumes are not re-sent, and a
+    batch whose response can't be unpacked is retried one resume at a time.
+    """
+    batch_size = min(batch_size or settings.openai_parse_batch_size, MAX_PARSE_BATCH_SIZE)
+    results: List[Union[Dict, Exception]] = [None] * len(resume_texts)
+    
+    # Serve what we can from the per-resume cache shared with parse_resume_with_gpt
+    pending = []
+    for i, text in enumerate(resume_texts):
+        cached = await cache_get_json(cache_key("resume", text, version=RESUME_CACHE_VERSION))
+        if cached is not None:
+            results[i] = cached
+        else:
+            pending.append(i)
+    
+    pending_iter = iter(pending)
+    while chunk := list(islice(pending_iter, batch_size)):
+        if len(chunk) > 1:
+            try:
+                parsed = await _parse_resume_chunk([resume_texts[i] for i in chunk])
+                for i, result in zip(chunk, parsed):
+                    results[i] = result
+                    await cache_set_json(
+                        cache_key("resume", resume_texts[i], version=RESUME_CACHE_VERSION),
+                        result,
+                        settings.gpt_cache_ttl_seconds
+                    )
+                continue
+            except Exception as e:
+                logger.warning(f"Batch resume parsing failed ({e}), parsing {len(chunk)} resumes individually")
+        
+        for i in chunk:
+            try:
+                results[i] = await parse_resume_with_gpt(resume_texts[i])
+            except Exception as e:
+                results[i] = e
+    
+    return results
+
+
+async def _parse_resume_chunk(resume_texts: List[str]) -> List[Dict]:
+    """Send one request covering several resumes and unpack the per-resume results."""
+    client = get_openai_client()
+    if not client:
+        logger.error("OpenAI client not initialized - API key missing or invalid")
+        raise ValueError("OpenAI API key not configured")
+    
+    count = len(resume_texts)
+    resumes_block = "\n\n".join(
+        f"--- RESUME {n} ---\n{compact_resume(text)}" for n, text in enumerate(resume_texts, start=1)
+    )
+    logger.info(f"Parsing {count} resumes in one request")
+    
+    response = await client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": RESUME_PARSE_SYSTEM_PROMPT},
+            {"role": "user", "content": RESUME_PARSE_INSTRUCTIONS},
+            {"role": "user", "content": RESUME_BATCH_INSTRUCTIONS},
+            {"role": "user", "content": f"Parse the following {count} resumes.\n\n{resumes_block}"}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=min(MAX_TOKENS_PARSE * count, OPENAI_MAX_TOKENS),
+        temperature=0.1
+    )
+    
+    _warn_if_truncated(response, f"batch parse of {count} resumes")
+    results = orjson.loads(response.choices[0].message.content).get("results")
+    if not isinstance(results, list) or len(results) != count:
+        raise ValueError(f"Expected {count} results, got {len(results) if isinstance(results, list) else 'none'}")
+    return [_normalize_parsed_resume(result) for result in results]
+
+
+def _warn_if_truncated(response, call: str):
+    """Log completions cut off by max_tokens so the per-call caps can be tuned."""
+    if response.choices[0].finish_reason == "length":
+        logger.warning(f"OpenAI {call} response was cut off at max_tokens")
+
+
+def _normalize_parsed_resume(result: Dict) -> Dict:
+    """Normalize skills and fill defaults on a GPT-parsed resume."""
+    # Normalize skills to lowercase and deduplicate
+    if "resume_technical_skills" in result:
+        result["resume_technical_skills"] = list(set([s.lower().strip() for s in result["resume_technical_skills"] if s]))
+    if "all_skills" in result:
+        result["all_skills"] = list(set([s.lower().strip() for s in result["all_skills"] if s]))
+    
+    # Ensure all required fields have defaults
+    result.setdefault("resume_candidate_name", "Not mentioned")
+    result.setdefault("resume_contact_info", "Not mentioned")
+    result.setdefault("resume_role", "Not mentioned")
+    result.setdefault("resume_location", "Not mentioned")
+    result.setdefault("resume_degree", "Not mentioned")
+    result.setdefault("resume_university", "Not mentioned")
+    result.setdefault("resume_experience", 0.0)
+    result.setdefault("resume_technical_skills", [])
+    result.setdefault("resume_projects", [])
+    result.setdefault("resume_achievements", [])
+    result.setdefault("resume_certificates", [])
+    result.setdefault("all_skills", [])
+    return result
+
+
+@cached_json("jd", version=OPENAI_MODEL)
+async def extract_jd_requirements(jd_text: str) -> Dict:
+    """
+    Use GPT-4 to analyze job description and extract requirements.
+    Returns: Structured JD requirements.
+    """
+    client = get_openai_client()
+    if not client:
+        logger.error("OpenAI client not initialized - API key missing or invalid")
+        raise ValueError("OpenAI API key not configured")
+    
+    try:
+        response = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": JD_EXTRACT_SYSTEM_PROMPT},
+                {"role": "user", "content": JD_EXTRACT_INSTRUCTIONS},
+                {"role": "user", "content": f"JOB DESCRIPTION:\n{compact_jd(jd_text)}"}
+            ],
+            response_format={"type": "json_object"},
+            max_tokens=MAX_TOKENS_JD,
+            temperature=0.2 # Low temperature for consistency
+        )
         
-        user_prompt = f"""ANALYZE THIS RESUME AGAINST JD REQUIREMENTS:
+        _warn_if_truncated(response, "JD extraction")
+        result = orjson.loads(response.choices[0].message.content)
+        
+        # Backward compatibility mapping for `jd_analysis.py` which expects flat structure
+        # We perform this mapping here so the rest of the app continues to work while we transition
+        flattened_result = {
+            "job_level": (result.get("experience_seniority") or {}).get("role_level", "Experienced"),
+            "min_experience_years": (result.get("experience_seniority") or {}).get("required_years") or 0,
+            "required_skills": (
+                result.get("core_technical_skills", {}).get("items", []) + 
+                result.get("networking_protocols", {}).get("items", []) +
+                result.get("security_technologies", {}).get("items", []) +
+                result.get("cloud_architecture", {}).get("items", [])
+            ),
+            "keywords": (
+                result.get("compliance_governance", {}).get("items", []) +
+                result.get("incident_operations", {}).get("items", [])
+            ),
+            # Store the full structured decomposition for the matcher
+            "structured_requirements": result,
+            "weights": {k: v.get("weight", 0) for k, v in result.items() if isinstance(v, dict)}
+        }
+        
+        logger.info(f"Successfully extracted JD requirements with GPT-4")
+        return flattened_result
+    
+    except Exception as e:
+        logger.error(f"GPT-4 JD extraction failed: {e}")
+        raise
 
-[JD REQUIREMENTS BY CATEGORY]
-{json.dumps(structured_jd, indent=2)}
 
-[CANDIDATE RESUME]
+@cached_json("match", version=OPENAI_MODEL)
+async def calculate_intelligent_match(resume_data: Dict, jd_requirements: Dict) -> Dict:
+    """
+    Use GPT-4 to perform intelligent semantic matching.
+    Returns: Match score and detailed analysis.
+    """
+    client = get_openai_client()
+    if not client:
+        logger.error("OpenAI client not initialized - API key missing or invalid")
+        raise ValueError("OpenAI API key not configured")
+    
+    try:
+        # Prepare structured inputs for the prompt
+        structured_jd = jd_requirements.get('structured_requirements', jd_requirements)
+        
+        # Static prefix first, then the JD (shared by every candidate of one analysis), then the resume
+        jd_prompt = f"""[JD REQUIREMENTS BY CATEGORY]
+{json.dumps(structured_jd, indent=2, sort_keys=True)}
+"""
+        
+        resume_prompt = f"""[CANDIDATE RESUME]
 Name: {resume_data.get('resume_candidate_name', 'Unknown')}
 Current Role: {resume_data.get('role', 'N/A')}
 Total Experience: {resume_data.get('experience_years', 0)} years
@@ -363,29 +523,24 @@ Resume Summary:
 {resume_data.get('summary', '')[:2000]}
 
 Resume Text (Recent Experience):
-{resume_data.get('raw_text', '')[:3500]}
-
-For EACH JD category above, provide:
-1. Match level (HIGH/MEDIUM/LOW/NO)
-2. Ownership level (LED/OWNED/CONTRIBUTED/ASSISTED/NONE)
-3. Specific evidence from resume
-4. Whether experience is recent (last 5 years)
-
-Return ONLY the JSON structure specified in the system prompt.
+{compact_resume(resume_data.get('raw_text', ''), 3500)}
 """
         
         response = await client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
+                {"role": "system", "content": MATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": MATCH_INSTRUCTIONS},
+                {"role": "user", "content": jd_prompt},
+                {"role": "user", "content": resume_prompt}
             ],
             response_format={"type": "json_object"},
-            max_tokens=min(OPENAI_MAX_TOKENS, 4096),
+            max_tokens=MAX_TOKENS_MATCH,
             temperature=0.1 # Very low temperature for deterministic scoring
         )
         
-        result = json.loads(response.choices[0].message.content)
+        _warn_if_truncated(response, "matching")
+        result = orjson.loads(response.choices[0].message.content)
         logger.info(f"Successfully calculated intelligent match with GPT-4")
         return result
     
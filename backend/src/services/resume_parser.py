@@ -1,20 +1,68 @@
 """Resume parsing service with OpenAI and fallback support."""
+import hashlib
 import re
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from src.services.file_processor import extract_text_from_file
 from src.services import openai_service
+from src.services.cache import cache_get_json, cache_set_json
+from src.config.settings import settings
 from src.schemas.resume import ParsedResume
 from src.utils.logger import get_logger
+from src.utils.skill_taxonomy import find_skills, find_skills_lower, normalize_skills as _normalize_skills
 
 logger = get_logger(__name__)
 
+# Compiled once; the fallback parser runs these over the whole resume text
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'[\+]?[(]?[0-9]{1,4}[)]?[-\s\.]?[(]?[0-9]{1,4}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}')
+# Matches "5 years experience", "5+ years of experience", "experience: 5 years", "5 yrs"
+_EXP_RE = re.compile(
+    r'(\d+)\+?\s*years?\s*(?:of\s*)?experience'
+    r'|experience\s*:?\s*(\d+)\+?\s*years?'
+    r'|(\d+)\+?\s*yrs',
+    re.IGNORECASE
+)
+
+# Certification section parsing (run line by line, so compile once here)
+_CERT_HEADER_RE = re.compile(
+    r'^(?:certifications?|professional certifications?|licenses? and certifications?|'
+    r'credentials?|professional credentials?|certificates?)\s*:?\s*$'
+)
+_CERT_SECTION_END = ('experience', 'education', 'skills', 'projects', 'summary', 'objective', 'work history')
+_CERT_BULLET_RE = re.compile(r'^[•\-\*\d\.]+\s*')
+_YEAR_RE = re.compile(r'\b\d{4}\b')
+_MONTH_YEAR_RE = re.compile(r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b', re.IGNORECASE)
+_PARENS_RE = re.compile(r'\([^)]+\)')
+_ISSUER_SUFFIX_RE = re.compile(r'\s*[-–—]\s*[A-Z][a-z]+.*$')
+# Well-known certifications, used when there is no certification section
+_CERT_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'AWS\s+Certified\s+[A-Za-z\s\-]+',
+    r'Microsoft\s+Certified\s+[A-Za-z\s\-]+',
+    r'Google\s+Cloud\s+[A-Za-z\s\-]+',
+    r'Cisco\s+Certified\s+[A-Za-z\s\-]+',
+    r'Oracle\s+Certified\s+[A-Za-z\s\-]+',
+    r'Red\s+Hat\s+Certified\s+[A-Za-z\s\-]+',
+    r'CompTIA\s+[A-Za-z\+\s]+',
+    r'PMP\s+Certification',
+    r'Scrum\s+Master\s+Certified',
+    r'ITIL\s+[A-Za-z\s]+',
+    r'CISSP',
+    r'CISA',
+    r'CISM',
+    r'CEH',
+    r'CCNA',
+    r'CCNP'
+))
+_ACHIEVEMENT_RE = re.compile('|'.join(re.escape(keyword.lower()) for keyword in (
+    'Award', 'Honor', 'Dean\'s List', 'Scholarship', 'Recognized',
+    'Achieved', 'Successfully', 'Won', 'Winner', 'Gold Medal',
+    'Employee of the Month', 'Star Performer', 'Appreciation'
+)))
+
 
 def normalize_skills(skills: List[str]) -> List[str]:
     """Normalize skills: lowercase, strip, deduplicate."""
-    if not skills:
-        return []
-    normalized = [s.lower().strip() for s in skills if s and s.strip()]
-    return list(set(normalized))
+    return _normalize_skills(skills)
 
 
 def merge_skills(resume_skills: List[str], form_skills: Optional[str] = None) -> List[str]:
@@ -28,10 +76,38 @@ def merge_skills(resume_skills: List[str], form_skills: Optional[str] = None) ->
     return normalize_skills(all_skills)
 
 
+def file_content_hash(file_path: str) -> str:
+    """blake2b digest of a file's bytes, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parsed_cache_key(content_hash: str) -> str:
+    return f"parsed:{content_hash}:{openai_service.RESUME_CACHE_VERSION}"
+
+
+async def _get_cached_parse(content_hash: str) -> Optional[Dict]:
+    """Return {'raw_text', 'parsed'} for a previously parsed file with identical bytes."""
+    return await cache_get_json(_parsed_cache_key(content_hash))
+
+
+async def _cache_parse(content_hash: str, raw_text: str, parsed_data: Dict):
+    """Remember a successful GPT parse (before form data is merged) by file hash."""
+    await cache_set_json(
+        _parsed_cache_key(content_hash),
+        {'raw_text': raw_text, 'parsed': parsed_data},
+        settings.parsed_resume_cache_ttl_seconds
+    )
+
+
 async def parse_resume(
     file_path: str, 
     file_extension: str,
-    form_data: Optional[Dict] = None
+    form_data: Optional[Dict] = None,
+    content_hash: Optional[str] = None
 ) -> Dict:
     """
     Parse resume and extract structured data.
@@ -42,7 +118,15 @@ async def parse_resume(
         file_path: Path to resume file
         file_extension: File extension (pdf, docx)
         form_data: Optional form data to merge (name, email, phone, skills)
+        content_hash: Hash of the file bytes (computed from file_path if omitted)
     """
+    # Identical file bytes parsed before: skip text extraction and OpenAI entirely
+    content_hash = content_hash or file_content_hash(file_path)
+    cached = await _get_cached_parse(content_hash)
+    if cached:
+        logger.info(f"Using cached parse for file hash {content_hash}")
+        return finalize_parsed_resume(cached['parsed'], cached['raw_text'], form_data)
+    
     # Step 1: Extract raw text from file
     raw_text = extract_text_from_file(file_path, file_extension)
     
@@ -52,14 +136,61 @@ async def parse_resume(
     # Step 2: Try OpenAI parsing first
     try:
         parsed_data = await openai_service.parse_resume_with_gpt(raw_text)
-        parsed_data['raw_text'] = raw_text
-        parsed_data['parsing_method'] = 'openai'
+        await _cache_parse(content_hash, raw_text, parsed_data)
     except Exception as e:
-        logger.warning(f"OpenAI parsing failed: {e}, falling back to traditional parsing")
+        parsed_data = e
+    
+    return finalize_parsed_resume(parsed_data, raw_text, form_data)
+
+
+async def parse_resumes(files: List[Tuple[str, ...]]) -> List[Union[Dict, Exception]]:
+    """
+    Parse several resume files, sending them to OpenAI in batches.
+    Each entry is (file_path, file_extension) or (file_path, file_extension, content_hash).
+    Returns one entry per file, in order: the parsed dict, or the exception raised for that file.
+    """
+    results: List[Union[Dict, Exception]] = [None] * len(files)
+    texts = {}
+    hashes = {}
+    for i, (file_path, file_extension, *known_hash) in enumerate(files):
+        hashes[i] = known_hash[0] if known_hash else file_content_hash(file_path)
+        cached = await _get_cached_parse(hashes[i])
+        if cached:
+            results[i] = finalize_parsed_resume(cached['parsed'], cached['raw_text'])
+            continue
+        raw_text = extract_text_from_file(file_path, file_extension)
+        if raw_text:
+            texts[i] = raw_text
+        else:
+            results[i] = ValueError("Failed to extract text from resume")
+    
+    parsed_batch = await openai_service.parse_resumes_batch(list(texts.values()))
+    for (i, raw_text), parsed_data in zip(texts.items(), parsed_batch):
+        if not isinstance(parsed_data, Exception):
+            await _cache_parse(hashes[i], raw_text, parsed_data)
+        results[i] = finalize_parsed_resume(parsed_data, raw_text)
+    
+    return results
+
+
+def finalize_parsed_resume(
+    parsed_data: Union[Dict, Exception],
+    raw_text: str,
+    form_data: Optional[Dict] = None
+) -> Dict:
+    """
+    Complete a GPT parse result (or fall back to traditional parsing if it is an
+    exception), merge form data and validate against the ParsedResume schema.
+    """
+    if isinstance(parsed_data, Exception):
+        logger.warning(f"OpenAI parsing failed: {parsed_data}, falling back to traditional parsing")
         # Step 3: Fallback to traditional parsing
         parsed_data = fallback_parse_resume(raw_text)
         parsed_data['raw_text'] = raw_text
         parsed_data['parsing_method'] = 'fallback'
+    else:
+        parsed_data['raw_text'] = raw_text
+        parsed_data['parsing_method'] = 'openai'
     
     # Step 4: Merge form data (form data takes priority for explicit corrections)
     if form_data:
@@ -136,12 +267,15 @@ def fallback_parse_resume(text: str) -> Dict:
     """
     logger.info("Using fallback resume parsing")
     
+    # Lowercase once; the skill, certificate and achievement scans all reuse it
+    text_lower = text.lower()
+    
     name = extract_name(text)
     email = extract_email(text)
-    skills = extract_skills(text)
+    skills = extract_skills(text, text_lower)
     experience = extract_experience_years(text)
-    certs = extract_certificates(text)
-    achieve = extract_achievements(text)
+    certs = extract_certificates(text, text_lower)
+    achieve = extract_achievements(text, text_lower)
     
     result = {
         "resume_candidate_name": name if name else "Not mentioned",
@@ -151,54 +285,40 @@ def fallback_parse_resume(text: str) -> Dict:
         "resume_degree": "Not mentioned",
         "resume_university": "Not mentioned",
         "resume_experience": experience,
-        "resume_technical_skills": normalize_skills(skills),
+        "resume_technical_skills": skills,
         "resume_projects": [],
         "resume_achievements": achieve,
         "resume_certificates": certs,
-        "all_skills": normalize_skills(skills)
+        "all_skills": list(skills)
     }
     
     return result
 
 
-def extract_certificates(text: str) -> List[str]:
+def extract_certificates(text: str, text_lower: Optional[str] = None) -> List[str]:
     """Extract certifications using advanced section-based parsing."""
-    import re
-    
     found_certs = []
     
-    # Common certification section headers
-    cert_section_headers = [
-        r'certifications?',
-        r'professional certifications?',
-        r'licenses? and certifications?',
-        r'credentials?',
-        r'professional credentials?',
-        r'certificates?'
-    ]
-    
     # Split text into lines
     lines = text.split('\n')
+    lower_lines = (text_lower if text_lower is not None else text.lower()).split('\n')
     
     # Try to find certification section
     in_cert_section = False
     section_lines = []
     
-    for i, line in enumerate(lines):
-        line_lower = line.lower().strip()
+    for line, line_lower in zip(lines, lower_lines):
+        line_lower = line_lower.strip()
         
         # Check if we're entering a certification section
-        for header in cert_section_headers:
-            if re.match(f'^{header}\\s*:?\\s*$', line_lower):
-                in_cert_section = True
-                section_lines = []
-                break
+        if _CERT_HEADER_RE.match(line_lower):
+            in_cert_section = True
+            section_lines = []
         
         # Check if we're leaving the section (new major section starts)
         if in_cert_section and line_lower and not line.startswith(' ') and not line.startswith('\t'):
             # Check if this is a new section header
-            common_sections = ['experience', 'education', 'skills', 'projects', 'summary', 'objective', 'work history']
-            if any(section in line_lower for section in common_sections):
+            if any(section in line_lower for section in _CERT_SECTION_END):
                 break
         
         # Collect lines in certification section
@@ -206,94 +326,58 @@ def extract_certificates(text: str) -> List[str]:
             section_lines.append(line.strip())
     
     # Parse certification lines
-    if section_lines:
-        for line in section_lines:
-            # Remove common prefixes
-            clean_line = re.sub(r'^[•\-\*\d\.]+\s*', '', line).strip()
-            
-            # Remove dates (e.g., "2020", "Jan 2020", "2020-2023")
-            clean_line = re.sub(r'\b\d{4}\b', '', clean_line)
-            clean_line = re.sub(r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{4}\b', '', clean_line, flags=re.IGNORECASE)
-            
-            # Remove issuer info in parentheses or after dash
-            clean_line = re.sub(r'\([^)]+\)', '', clean_line)
-            clean_line = re.sub(r'\s*[-–—]\s*[A-Z][a-z]+.*$', '', clean_line)
-            
-            clean_line = clean_line.strip(' ,-–—')
-            
-            if clean_line and len(clean_line) > 3 and len(clean_line) < 100:
-                found_certs.append(clean_line)
+    for line in section_lines:
+        # Remove common prefixes
+        clean_line = _CERT_BULLET_RE.sub('', line).strip()
+        
+        # Remove dates (e.g., "2020", "Jan 2020", "2020-2023")
+        clean_line = _YEAR_RE.sub('', clean_line)
+        clean_line = _MONTH_YEAR_RE.sub('', clean_line)
+        
+        # Remove issuer info in parentheses or after dash
+        clean_line = _PARENS_RE.sub('', clean_line)
+        clean_line = _ISSUER_SUFFIX_RE.sub('', clean_line)
+        
+        clean_line = clean_line.strip(' ,-–—')
+        
+        if clean_line and len(clean_line) > 3 and len(clean_line) < 100:
+            found_certs.append(clean_line)
     
     # If no section found, use keyword-based extraction
     if not found_certs:
-        cert_patterns = [
-            r'AWS\s+Certified\s+[A-Za-z\s\-]+',
-            r'Microsoft\s+Certified\s+[A-Za-z\s\-]+',
-            r'Google\s+Cloud\s+[A-Za-z\s\-]+',
-            r'Cisco\s+Certified\s+[A-Za-z\s\-]+',
-            r'Oracle\s+Certified\s+[A-Za-z\s\-]+',
-            r'Red\s+Hat\s+Certified\s+[A-Za-z\s\-]+',
-            r'CompTIA\s+[A-Za-z\+\s]+',
-            r'PMP\s+Certification',
-            r'Scrum\s+Master\s+Certified',
-            r'ITIL\s+[A-Za-z\s]+',
-            r'CISSP',
-            r'CISA',
-            r'CISM',
-            r'CEH',
-            r'CCNA',
-            r'CCNP'
-        ]
-        
-        for pattern in cert_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
+        for pattern in _CERT_PATTERNS:
+            for match in pattern.finditer(text):
                 cert = match.group(0).strip()
-                if cert and cert not in found_certs:
+                if cert:
                     found_certs.append(cert)
     
-    # Deduplicate and limit
-    unique_certs = []
-    for cert in found_certs:
-        if cert not in unique_certs:
-            unique_certs.append(cert)
-    
-    return unique_certs[:10]  # Return up to 10 certifications
+    # Deduplicate (keeping order) and limit
+    return list(dict.fromkeys(found_certs))[:10]  # Return up to 10 certifications
 
 
-def extract_achievements(text: str) -> List[str]:
+def extract_achievements(text: str, text_lower: Optional[str] = None) -> List[str]:
     """Extract achievements/awards using keywords."""
-    achieve_keywords = [
-        'Award', 'Honor', 'Dean\'s List', 'Scholarship', 'Recognized', 
-        'Achieved', 'Successfully', 'Won', 'Winner', 'Gold Medal', 
-        'Employee of the Month', 'Star Performer', 'Appreciation'
-    ]
-    
     found = []
-    lines = text.split('\n')
-    for line in lines:
-        for keyword in achieve_keywords:
-            if keyword.lower() in line.lower():
-                clean_line = line.strip()
-                if clean_line and len(clean_line) < 120:
-                    found.append(clean_line)
-                    break
+    lower_lines = (text_lower if text_lower is not None else text.lower()).split('\n')
+    for line, line_lower in zip(text.split('\n'), lower_lines):
+        if _ACHIEVEMENT_RE.search(line_lower):
+            clean_line = line.strip()
+            if clean_line and len(clean_line) < 120:
+                found.append(clean_line)
     
     return list(set(found))[:3]  # Limit to top 3
 
 
 def extract_email(text: str) -> str:
     """Extract email using regex."""
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    matches = re.findall(email_pattern, text)
-    return matches[0] if matches else ""
+    match = _EMAIL_RE.search(text)
+    return match.group(0) if match else ""
 
 
 def extract_phone(text: str) -> str:
     """Extract phone number using regex."""
-    phone_pattern = r'[\+]?[(]?[0-9]{1,4}[)]?[-\s\.]?[(]?[0-9]{1,4}[)]?[-\s\.]?[0-9]{1,4}[-\s\.]?[0-9]{1,9}'
-    matches = re.findall(phone_pattern, text)
-    return matches[0] if matches else ""
+    match = _PHONE_RE.search(text)
+    return match.group(0) if match else ""
 
 
 def extract_name(text: str) -> str:
@@ -321,43 +405,17 @@ def extract_summary(text: str) -> str:
     return ""
 
 
-def extract_skills(text: str) -> List[str]:
+def extract_skills(text: str, text_lower: Optional[str] = None) -> List[str]:
     """Extract skills using common tech keywords (returns lowercase)."""
-    common_skills = [
-        'Python', 'JavaScript', 'Java', 'C++', 'C#', 'Ruby', 'PHP', 'Swift', 'Kotlin',
-        'React', 'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Spring', 'Express',
-        'SQL', 'MongoDB', 'PostgreSQL', 'MySQL', 'Redis', 'Cassandra',
-        'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Jenkins', 'Git',
-        'Machine Learning', 'Deep Learning', 'NLP', 'Computer Vision',
-        'HTML', 'CSS', 'TypeScript', 'REST', 'GraphQL', 'Microservices'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in common_skills:
-        if skill.lower() in text_lower:
-            found_skills.append(skill.lower())  # Return lowercase
-    
-    return list(set(found_skills))  # Remove duplicates
+    if text_lower is not None:
+        return find_skills_lower(text_lower)
+    return find_skills(text)
 
 
 def extract_experience_years(text: str) -> float:
     """Extract years of experience using pattern matching."""
-    # Look for patterns like "5 years", "5+ years", "3-5 years"
-    patterns = [
-        r'(\d+)\+?\s*years?\s*(?:of\s*)?experience',
-        r'experience\s*:?\s*(\d+)\+?\s*years?',
-        r'(\d+)\+?\s*yrs'
-    ]
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text.lower())
-        if matches:
-            try:
-                return float(matches[0])
-            except:
-                pass
-    
+    # Look for patterns like "5 years", "5+ years", "3-5 years" in a single pass
+    match = _EXP_RE.search(text)
+    if match:
+        return float(next(g for g in match.groups() if g))
     return 0.0
-
@@ -1,10 +1,13 @@
 """Storage service with Google Drive and local fallback support."""
+import hashlib
 import os
+import tempfile
 import uuid
 import aiofiles
 from pathlib import Path
+from typing import AsyncIterator, Iterator, Union
 from fastapi import UploadFile
-from src.utils.validators import sanitize_filename, validate_file_size
+from src.utils.validators import sanitize_filename, validate_file_size, validate_file_signature
 from src.utils.logger import get_logger
 from src.services.google_drive import upload_file_to_gdrive
 from src.config.settings import settings
@@ -15,6 +18,10 @@ logger = get_logger(__name__)
 UPLOAD_DIR = settings.upload_dir
 MAX_FILE_SIZE_MB = settings.max_file_size_mb
 
+# Uploads are streamed in chunks so memory per request stays bounded
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_BYTES = 1_000_000
+
 
 class StorageService:
     """Unified storage service with Google Drive and local fallback."""
@@ -25,64 +32,114 @@ class StorageService:
         Upload file to storage (Google Drive if configured, otherwise local).
         Returns: (file_path, file_url)
         """
-        # Read file content
-        content = await file.read()
-        
-        # Validate file size
-        if not validate_file_size(len(content), MAX_FILE_SIZE_MB):
-            raise ValueError(f"File size exceeds {MAX_FILE_SIZE_MB}MB limit")
-            
-        # Validate file signature (Magic Numbers)
-        from src.utils.validators import validate_file_signature
-        file_extension = file.filename.split('.')[-1].lower()
-        if not validate_file_signature(content, file_extension):
-            logger.warning(f"Security Rejection: File signature mismatch for {file.filename}")
-            raise ValueError(f"Invalid file content: The file does not appear to be a valid {file_extension.upper()} file.")
+        file_path, file_url, _ = await StorageService.upload_with_hash(file, subfolder)
+        return file_path, file_url
+    
+    @staticmethod
+    async def upload_with_hash(file: UploadFile, subfolder: str = "resumes") -> tuple[str, str, str]:
+        """
+        Upload file like upload(), hashing the bytes in the same pass.
+        Returns: (file_path, file_url, content_hash), where content_hash matches
+        resume_parser.file_content_hash so the parse cache needs no second read.
+        """
+        digest = hashlib.blake2b(digest_size=16)
         
         # Try Google Drive first if enabled
         if settings.use_google_drive:
-            try:
-                original_filename = sanitize_filename(file.filename)
-                file_id, web_view_link = await upload_file_to_gdrive(
-                    content,
-                    original_filename
+            # Small files stay in memory, larger ones spill to disk
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+                async for chunk in StorageService._read_validated(file, digest):
+                    spool.write(chunk)
+                try:
+                    spool.seek(0)
+                    original_filename = sanitize_filename(file.filename)
+                    file_id, web_view_link = await upload_file_to_gdrive(
+                        spool,
+                        original_filename
+                    )
+                    logger.info(f"Uploaded to Google Drive: {web_view_link}")
+                    # Return Google Drive link as file_url, file_id as file_path for reference
+                    return file_id, web_view_link, digest.hexdigest()
+                except Exception as e:
+                    logger.warning(f"Google Drive upload failed, falling back to local: {e}")
+                
+                spool.seek(0)
+                file_path, file_url = await StorageService._save_local(
+                    file, iter(lambda: spool.read(CHUNK_SIZE), b""), subfolder
                 )
-                logger.info(f"Uploaded to Google Drive: {web_view_link}")
-                # Return Google Drive link as file_url, file_id as file_path for reference
-                return file_id, web_view_link
-            except Exception as e:
-                logger.warning(f"Google Drive upload failed, falling back to local: {e}")
+                return file_path, file_url, digest.hexdigest()
         
-        # Fallback to local storage
-        return await StorageService._save_local(file, content, subfolder)
+        # Local storage: stream straight to disk
+        file_path, file_url = await StorageService._save_local(
+            file, StorageService._read_validated(file, digest), subfolder
+        )
+        return file_path, file_url, digest.hexdigest()
     
     @staticmethod
-    async def _save_local(file: UploadFile, content: bytes, subfolder: str) -> tuple[str, str]:
-        """Save file to local disk."""
+    async def _read_validated(file: UploadFile, digest=None) -> AsyncIterator[bytes]:
+        """
+        Yield the upload in chunks, enforcing the size limit as bytes arrive and
+        checking the file signature (magic numbers) on the first chunk.
+        Each chunk is also fed to digest when one is given.
+        """
+        file_extension = file.filename.split('.')[-1].lower()
+        total = 0
+        first = True
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if first:
+                first = False
+                if not validate_file_signature(chunk, file_extension):
+                    logger.warning(f"Security Rejection: File signature mismatch for {file.filename}")
+                    raise ValueError(f"Invalid file content: The file does not appear to be a valid {file_extension.upper()} file.")
+            if not chunk:
+                break
+            total += len(chunk)
+            if not validate_file_size(total, MAX_FILE_SIZE_MB):
+                raise ValueError(f"File size exceeds {MAX_FILE_SIZE_MB}MB limit")
+            if digest is not None:
+                digest.update(chunk)
+            yield chunk
+    
+    @staticmethod
+    async def _save_local(
+        file: UploadFile,
+        chunks: Union[AsyncIterator[bytes], Iterator[bytes]],
+        subfolder: str
+    ) -> tuple[str, str]:
+        """Save file to local disk, writing chunks as they arrive."""
+        # Create upload directory if it doesn't exist
+        upload_path = Path(UPLOAD_DIR) / subfolder
+        upload_path.mkdir(parents=True, exist_ok=True)
+        
+        # Generate unique filename
+        original_filename = sanitize_filename(file.filename)
+        file_extension = original_filename.split('.')[-1]
+        unique_filename = f"{uuid.uuid4()}.{file_extension}"
+        file_path = upload_path / unique_filename
+        
         try:
-            # Create upload directory if it doesn't exist
-            upload_path = Path(UPLOAD_DIR) / subfolder
-            upload_path.mkdir(parents=True, exist_ok=True)
-            
-            # Generate unique filename
-            original_filename = sanitize_filename(file.filename)
-            file_extension = original_filename.split('.')[-1]
-            unique_filename = f"{uuid.uuid4()}.{file_extension}"
-            file_path = upload_path / unique_filename
-            
             # Save file
             async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(content)
-            
-            # Generate file URL (relative path)
-            file_url = f"/{UPLOAD_DIR}/{subfolder}/{unique_filename}"
-            
-            logger.info(f"Saved file locally: {file_path}")
-            return str(file_path), file_url
-        
+                if hasattr(chunks, '__aiter__'):
+                    async for chunk in chunks:
+                        await f.write(chunk)
+                else:
+                    for chunk in chunks:
+                        await f.write(chunk)
         except Exception as e:
-            logger.error(f"Failed to save file locally: {e}")
+            # Don't leave partial files behind (e.g. when the size limit is hit mid-stream)
+            if file_path.exists():
+                file_path.unlink()
+            if not isinstance(e, ValueError):
+                logger.error(f"Failed to save file locally: {e}")
             raise
+        
+        # Generate file URL (relative path)
+        file_url = f"/{UPLOAD_DIR}/{subfolder}/{unique_filename}"
+        
+        logger.info(f"Saved file locally: {file_path}")
+        return str(file_path), file_url
 
 
 # Backward compatibility function
@@ -91,6 +148,11 @@ async def save_uploaded_file(file: UploadFile, subfolder: str = "resumes") -> tu
     return await StorageService.upload(file, subfolder)
 
 
+async def save_uploaded_file_with_hash(file: UploadFile, subfolder: str = "resumes") -> tuple[str, str, str]:
+    """Save uploaded file and return (file_path, file_url, content_hash)."""
+    return await StorageService.upload_with_hash(file, subfolder)
+
+
 def delete_file(file_path: str) -> bool:
     """Delete file from disk."""
     try:
@@ -1,5 +1,70 @@
-from sqlalchemy import delete
+from sqlalchemy import delete, insert
 from src.models.resume import Resume, Experience, Certification
+from src.utils.user_type_mapper import get_user_type_from_source_type
+from src.services.cache import invalidate_dashboard_stats
+
+
+def clean_null_bytes(text: str) -> str:
+    """Remove null bytes from text to prevent PostgreSQL errors"""
+    if text is None:
+        return ""
+    if isinstance(text, str):
+        return text.replace('\x00', '').replace('\0', '')
+    return str(text).replace('\x00', '').replace('\0', '')
+
+
+def clean_dict_values(data: dict) -> dict:
+    """Recursively clean null bytes from dictionary values"""
+    if not isinstance(data, dict):
+        return data
+    cleaned = {}
+    for key, value in data.items():
+        if isinstance(value, str):
+            cleaned[key] = clean_null_bytes(value)
+        elif isinstance(value, dict):
+            cleaned[key] = clean_dict_values(value)
+        elif isinstance(value, list):
+            cleaned[key] = [clean_null_bytes(str(v)) if isinstance(v, str) else v for v in value]
+        else:
+            cleaned[key] = value
+    return cleaned
+
+
+async def store_admin_resume(db, parsed_data, filename, file_url, file_size, uploaded_by):
+    """
+    Persist an admin-uploaded resume and its structured child records.
+    Used by the bulk upload endpoint and the background parsing task.
+    """
+    # Clean null bytes from parsed data
+    parsed_data = clean_dict_values(parsed_data)
+    
+    # Create resume record
+    resume = Resume(
+        filename=filename,
+        file_url=file_url,
+        source_type='admin',
+        source_id=None,
+        raw_text=clean_null_bytes(parsed_data.get('raw_text', '')),
+        parsed_data=parsed_data,
+        skills=parsed_data.get('all_skills', parsed_data.get('resume_technical_skills', [])),
+        experience_years=parsed_data.get('resume_experience', 0),
+        uploaded_by=uploaded_by,
+        meta_data={
+            'parsing_method': parsed_data.get('parsing_method', 'unknown'),
+            'file_size': file_size,
+            'user_type': get_user_type_from_source_type('admin')  # Always set normalized user_type
+        }
+    )
+    
+    db.add(resume)
+    # Flush for the id only; the resume and its child records commit together
+    await db.flush()
+    
+    # Save structured child records (Experience, Certifications)
+    await save_structured_resume_data(db, resume.id, parsed_data)
+    await db.commit()
+    await invalidate_dashboard_stats()
+    return resume
 
 async def save_structured_resume_data(db, resume_id, parsed_data, clear_existing=False):
     """
@@ -11,28 +76,26 @@ async def save_structured_resume_data(db, resume_id, parsed_data, clear_existing
             await db.execute(delete(Experience).where(Experience.resume_id == resume_id))
             await db.execute(delete(Certification).where(Certification.resume_id == resume_id))
 
-        # 1. Save Certifications
+        # 1. Save Certifications (one multi-row INSERT; no ORM objects are needed afterwards)
         certs = parsed_data.get("resume_certificates", [])
-        for cert_name in certs:
-            if cert_name and cert_name != "Not mentioned":
-                new_cert = Certification(
-                    resume_id=resume_id,
-                    name=cert_name,
-                    issuer="Detected"
-                )
-                db.add(new_cert)
+        cert_rows = [
+            {'resume_id': resume_id, 'name': cert_name, 'issuer': "Detected"}
+            for cert_name in certs
+            if cert_name and cert_name != "Not mentioned"
+        ]
+        if cert_rows:
+            await db.execute(insert(Certification), cert_rows)
 
         # 2. Save Experience (Initial implementation from primary role)
         # In a more advanced version, we would iterate through a list of past jobs
         role = parsed_data.get("resume_role") or parsed_data.get("role")
         if role and role != "Not mentioned":
-            new_exp = Experience(
+            await db.execute(insert(Experience).values(
                 resume_id=resume_id,
                 role=role,
                 company=parsed_data.get("resume_company") or "Detected",
                 description=parsed_data.get("resume_summary") or ""
-            )
-            db.add(new_exp)
+            ))
             
         return True
     except Exception as e:
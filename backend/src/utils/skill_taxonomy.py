@@ -0,0 +1,60 @@
+"""Canonical skill taxonomy and skill normalization helpers."""
+from typing import Iterable, List, Union
+
+import ahocorasick
+
+# Canonical tech skills recognised in free text (matched case-insensitively)
+SKILL_TAXONOMY = (
+    'Python', 'JavaScript', 'Java', 'C++', 'C#', 'Ruby', 'PHP', 'Swift', 'Kotlin',
+    'React', 'Angular', 'Vue', 'Node.js', 'Django', 'Flask', 'Spring', 'Express',
+    'SQL', 'MongoDB', 'PostgreSQL', 'MySQL', 'Redis', 'Cassandra',
+    'AWS', 'Azure', 'GCP', 'Docker', 'Kubernetes', 'Jenkins', 'Git',
+    'Machine Learning', 'Deep Learning', 'NLP', 'Computer Vision',
+    'HTML', 'CSS', 'TypeScript', 'REST', 'GraphQL', 'Microservices'
+)
+
+
+def _build_automaton(words: Iterable[str]) -> ahocorasick.Automaton:
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        key = word.lower()
+        automaton.add_word(key, key)
+    automaton.make_automaton()
+    return automaton
+
+
+# Built once at import; scanning text is a single pass in C
+SKILL_AUTOMATON = _build_automaton(SKILL_TAXONOMY)
+
+
+def find_skills(text: str) -> List[str]:
+    """Return lowercase taxonomy skills occurring anywhere in text (substring match)."""
+    if not text:
+        return []
+    return find_skills_lower(text.lower())
+
+
+def find_skills_lower(text_lower: str) -> List[str]:
+    """find_skills for text the caller has already lowercased."""
+    if not text_lower:
+        return []
+    found = {skill for _, skill in SKILL_AUTOMATON.iter(text_lower)}
+    return sorted(found)
+
+
+def normalize_skills(text_or_list: Union[str, Iterable[str], None]) -> List[str]:
+    """
+    Normalize skills to lowercase, stripped, de-duplicated values.
+    A string is scanned for taxonomy skills; a list is cleaned item by item.
+    """
+    if not text_or_list:
+        return []
+    if isinstance(text_or_list, str):
+        return find_skills(text_or_list)
+    seen = {}
+    for skill in text_or_list:
+        if isinstance(skill, str):
+            cleaned = skill.strip().lower()
+            if cleaned:
+                seen.setdefault(cleaned, None)
+    return list(seen)
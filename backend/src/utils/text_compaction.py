@@ -0,0 +1,83 @@
+"""Section-aware truncation of resume and JD text before it is sent to GPT."""
+import re
+from typing import List
+
+# Resume section headings (a heading line starts with one of these words)
+_RESUME_HEADER_RE = re.compile(
+    r'^[ \t]*(?:professional\s+|work\s+|technical\s+|key\s+)?'
+    r'(?:summary|profile|objective|experience|employment|skills|education|projects|'
+    r'certifications?|achievements|accomplishments)\b.*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Job description section headings
+_JD_HEADER_RE = re.compile(
+    r'^[ \t]*(?:key\s+|job\s+|required\s+|preferred\s+|minimum\s+)?'
+    r'(?:summary|overview|about|responsibilities|duties|requirements|qualifications|'
+    r'skills|experience|education|benefits)\b.*$',
+    re.IGNORECASE | re.MULTILINE
+)
+
+_SPACES_RE = re.compile(r'[ \t\u00a0]+')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n+')
+
+
+def _squeeze_whitespace(text: str) -> str:
+    text = _SPACES_RE.sub(' ', text)
+    return _BLANK_LINES_RE.sub('\n\n', text).strip()
+
+
+def _cut_at_word(text: str, limit: int) -> str:
+    """Cut text to at most limit chars, backing up to the last space when one is close."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    space = cut.rfind(' ')
+    if space > limit - 40:
+        cut = cut[:space]
+    return cut.rstrip()
+
+
+def _split_sections(text: str, header_re: re.Pattern) -> List[str]:
+    """Split text at heading lines; the part before the first heading (name, contact) is its own section."""
+    starts = [m.start() for m in header_re.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    starts.append(len(text))
+    return [text[a:b] for a, b in zip(starts, starts[1:]) if text[a:b].strip()]
+
+
+def compact_sections(text: str, max_chars: int, header_re: re.Pattern) -> str:
+    """
+    Shrink text to about max_chars, giving every section a fair share of the budget
+    instead of keeping only the beginning. Sections shorter than their share keep
+    everything and pass the remainder on to longer ones.
+    """
+    if not text:
+        return ""
+    text = _squeeze_whitespace(text)
+    if len(text) <= max_chars:
+        return text
+
+    sections = _split_sections(text, header_re)
+    # Reserve the separators between sections
+    remaining = max(max_chars - 2 * (len(sections) - 1), 0)
+    allowance = {}
+    by_length = sorted(range(len(sections)), key=lambda i: len(sections[i]))
+    for n, i in enumerate(by_length):
+        share = remaining // (len(sections) - n)
+        allowance[i] = min(len(sections[i]), share)
+        remaining -= allowance[i]
+
+    kept = (_cut_at_word(section.strip(), allowance[i]) for i, section in enumerate(sections))
+    return "\n\n".join(part for part in kept if part)
+
+
+def compact_resume(text: str, max_chars: int = 3000) -> str:
+    """Resume text trimmed to max_chars while keeping the header, skills, experience and other sections."""
+    return compact_sections(text, max_chars, _RESUME_HEADER_RE)
+
+
+def compact_jd(text: str, max_chars: int = 3500) -> str:
+    """Job description trimmed to max_chars while keeping each requirements/responsibilities section."""
+    return compact_sections(text, max_chars, _JD_HEADER_RE)
@@ -13,21 +13,23 @@ SOURCE_TO_USER_TYPE = {
 USER_TYPE_TO_SOURCE = {v: k for k, v in SOURCE_TO_USER_TYPE.items()}
 
 
+# Accepted spellings of each user type
+USER_TYPE_ALIASES = {
+    'Guest': 'Guest User',
+    'Guest User': 'Guest User',
+    'Company Employee': 'Company Employee',
+    'Freelancer': 'Freelancer',
+    'Admin Uploads': 'Admin Uploads',
+    'Admin': 'Admin Uploads',
+    'Gmail Resume': 'Gmail Resume'
+}
+
+
 def normalize_user_type(user_type: str) -> str:
     """Normalize user type names for consistency."""
     if not user_type:
         return 'Admin Uploads'
-    
-    normalization_map = {
-        'Guest': 'Guest User',
-        'Guest User': 'Guest User',
-        'Company Employee': 'Company Employee',
-        'Freelancer': 'Freelancer',
-        'Admin Uploads': 'Admin Uploads',
-        'Admin': 'Admin Uploads',
-        'Gmail Resume': 'Gmail Resume'
-    }
-    return normalization_map.get(user_type, user_type)
+    return USER_TYPE_ALIASES.get(user_type, user_type)
 
 
 def get_source_type_from_user_type(user_type: str) -> str:
@@ -3,9 +3,12 @@ from src.workers.celery_app import celery_app
 from src.services.resume_parser import parse_resume
 from src.services.storage import StorageService
 from src.models.resume import Resume
-from src.config.database import AsyncSessionLocal
+from src.config.database import AsyncSessionLocal, engine
 from sqlalchemy import select
 from src.utils.logger import get_logger
+from src.utils.resume_processor import store_admin_resume
+from src.services.cache import close_redis_client, invalidate_dashboard_stats
+from src.services.openai_service import close_openai_client
 import base64
 import tempfile
 import os
@@ -13,6 +16,17 @@ import os
 logger = get_logger(__name__)
 
 
+async def _release_loop_resources():
+    """
+    Close every shared async client before the task's event loop ends. Each task runs in
+    its own asyncio.run() loop, and pooled DB connections, the OpenAI HTTP pool and the
+    Redis client all stay bound to the loop that opened them.
+    """
+    await engine.dispose()
+    await close_openai_client()
+    await close_redis_client()
+
+
 @celery_app.task(name="src.workers.tasks.process_gmail_resume")
 def process_gmail_resume(message_id: str, attachment_data: bytes, sender: str = None, subject: str = None):
     """
@@ -110,6 +124,7 @@ def process_gmail_resume(message_id: str, attachment_data: bytes, sender: str =
                     await db.commit()
                     await db.refresh(resume)
                     logger.info(f"Successfully processed Gmail resume: {message_id}")
+                await invalidate_dashboard_stats()
             
             finally:
                 # Clean up temporary file
@@ -121,8 +136,43 @@ def process_gmail_resume(message_id: str, attachment_data: bytes, sender: str =
             raise
         finally:
             await db.close()
+            await _release_loop_resources()
     
     # Run async function
     asyncio.run(_process())
     return {"status": "success", "message_id": message_id}
 
+
+@celery_app.task(bind=True, max_retries=3, name="src.workers.tasks.process_admin_resume")
+def process_admin_resume(self, file_path: str, file_url: str, file_extension: str,
+                         filename: str, file_size: int, uploaded_by: str, content_hash: str = None):
+    """
+    Parse and store an admin-uploaded resume (Celery task).
+    Queued by the bulk upload endpoint so the request doesn't wait on OpenAI.
+    """
+    import asyncio
+    
+    async def _process():
+        try:
+            async with AsyncSessionLocal() as db:
+                parsed_data = await parse_resume(file_path, file_extension, content_hash=content_hash)
+                resume = await store_admin_resume(db, parsed_data, filename, file_url, file_size, uploaded_by)
+                return {
+                    'id': resume.id,
+                    'filename': resume.filename,
+                    'candidate_name': resume.parsed_data.get('resume_candidate_name', 'Unknown'),
+                    'skills': resume.skills,
+                    'experience_years': resume.experience_years
+                }
+        finally:
+            await _release_loop_resources()
+    
+    try:
+        return asyncio.run(_process())
+    except ValueError as e:
+        # Unreadable file: retrying won't help
+        logger.error(f"Error processing admin resume {filename}: {e}")
+        raise
+    except Exception as e:
+        logger.error(f"Error processing admin resume {filename}, retrying: {e}")
+        raise self.retry(exc=e, countdown=2 ** self.request.retries * 10)
@@ -55,6 +55,8 @@ def client(test_db):
     app.dependency_overrides[get_postgres_db] = override_get_db
     
     with TestClient(app) as test_client:
+        # Startup schema initialization runs in the background; wait for it to settle
+        test_client.portal.call(app.state.schema_ready.wait)
         yield test_client
     
     app.dependency_overrides.clear()
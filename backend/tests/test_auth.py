@@ -17,3 +17,82 @@ def test_root_endpoint(client):
     assert "message" in response.json()
     assert "version" in response.json()
 
+
+
+def test_verify_and_update_rehashes_outdated_argon2():
+    """Hashes made with weaker argon2 settings verify and come back re-hashed."""
+    from argon2 import PasswordHasher
+    from src.routes import auth
+
+    old_hash = PasswordHasher(time_cost=1, memory_cost=8192, parallelism=1).hash("s3cret!")
+    assert auth._verify_and_update("wrong", old_hash) == (False, None)
+
+    ok, new_hash = auth._verify_and_update("s3cret!", old_hash)
+    assert ok and new_hash is not None
+    assert not auth._password_hasher.check_needs_rehash(new_hash)
+    assert auth._verify_and_update("s3cret!", new_hash) == (True, None)
+
+
+def test_verify_and_update_upgrades_bcrypt():
+    """Legacy bcrypt hashes verify once and are replaced with argon2."""
+    bcrypt = pytest.importorskip("bcrypt")
+    from src.routes import auth
+
+    legacy_hash = bcrypt.hashpw(b"s3cret!", bcrypt.gensalt(rounds=4)).decode()
+    assert auth._verify_and_update("wrong", legacy_hash) == (False, None)
+
+    ok, new_hash = auth._verify_and_update("s3cret!", legacy_hash)
+    assert ok and new_hash.startswith("$argon2id$")
+
+
+async def test_verify_and_update_password_runs_in_executor():
+    from src.routes import auth
+
+    hashed = await auth.hash_password("s3cret!")
+    assert await auth.verify_and_update_password("s3cret!", hashed) == (True, None)
+
+
+def test_employee_index_reads_bom_csv(tmp_path, monkeypatch):
+    """Excel-saved CSVs start with a BOM, which must not end up in the employee_id header."""
+    from src.routes import auth
+
+    csv_path = tmp_path / "Company_employee.csv"
+    csv_path.write_text("employee_id,email\nemp001, Jane.Doe@Example.com \nEMP001,jdoe@example.com\n", encoding="utf-8-sig")
+    monkeypatch.setattr(auth, "_EMPLOYEE_CSV_PATHS", (str(csv_path),))
+    monkeypatch.setattr(auth, "_employee_index", {})
+    monkeypatch.setattr(auth, "_employee_index_source", None)
+
+    assert auth._get_employee_index() == {"EMP001": {"jane.doe@example.com", "jdoe@example.com"}}
+
+
+def test_google_certs_refetch_is_rate_limited(monkeypatch):
+    """Unknown key IDs trigger at most one certificate fetch per GOOGLE_CERTS_MIN_REFETCH_SECONDS."""
+    import time
+    from types import SimpleNamespace
+    from src.routes import auth
+
+    fetches = []
+
+    def fake_request(url, method):
+        fetches.append(url)
+        return SimpleNamespace(status=200, data=b'{"key-1": "cert-1"}')
+
+    monkeypatch.setattr(auth, "_google_request", fake_request)
+    monkeypatch.setattr(auth, "_google_certs", {})
+    monkeypatch.setattr(auth, "_google_certs_expires_at", 0.0)
+    monkeypatch.setattr(auth, "_google_certs_fetched_at", float("-inf"))
+
+    assert auth._get_google_certs("key-1") == {"key-1": "cert-1"}
+    assert auth._get_google_certs("key-1") == {"key-1": "cert-1"}
+    assert len(fetches) == 1
+
+    # Made-up key IDs inside the window are rejected without another request
+    for key_id in ("forged-1", "forged-2"):
+        with pytest.raises(ValueError):
+            auth._get_google_certs(key_id)
+    assert len(fetches) == 1
+
+    # Once the window has passed, a new key ID is fetched again (e.g. after a key rotation)
+    monkeypatch.setattr(auth, "_google_certs_fetched_at", time.monotonic() - auth.GOOGLE_CERTS_MIN_REFETCH_SECONDS)
+    assert auth._get_google_certs("forged-1") == {"key-1": "cert-1"}
+    assert len(fetches) == 2
@@ -0,0 +1,85 @@
+"""Tests for the token revocation lookups in the auth middleware."""
+import time
+
+import pytest
+
+from src.middleware import auth_middleware
+from src.middleware.auth_middleware import REVOCATIONS_KEY, REVOCATIONS_LOADED_FIELD, _TTLCache, token_digest
+
+
+@pytest.fixture
+def revocations(monkeypatch):
+    """Stub the Redis hash and record which lookups reach Postgres."""
+    state = {"fields": {}, "available": True, "postgres_lookups": 0}
+
+    async def fake_get_many(key, fields):
+        assert key == REVOCATIONS_KEY
+        if not state["available"]:
+            return None
+        return [state["fields"].get(field) for field in fields]
+
+    async def fake_query_blacklist(digest, db):
+        state["postgres_lookups"] += 1
+        return False
+
+    monkeypatch.setattr(auth_middleware, "cache_hash_get_many", fake_get_many)
+    monkeypatch.setattr(auth_middleware, "_query_blacklist", fake_query_blacklist)
+    monkeypatch.setattr(auth_middleware, "_blacklist_cache", _TTLCache(maxsize=100))
+    return state
+
+
+async def test_loaded_cache_answers_misses_without_postgres(revocations):
+    revocations["fields"][REVOCATIONS_LOADED_FIELD] = str(time.time() + 60).encode()
+    assert await auth_middleware.is_token_blacklisted("token-a", db="db") is False
+    assert revocations["postgres_lookups"] == 0
+
+
+async def test_revoked_token_is_found_in_redis(revocations):
+    revocations["fields"][token_digest("token-a").hex()] = str(time.time() + 60).encode()
+    assert await auth_middleware.is_token_blacklisted("token-a", db="db") is True
+    assert revocations["postgres_lookups"] == 0
+
+
+async def test_expired_redis_entry_is_not_revoked(revocations):
+    revocations["fields"][REVOCATIONS_LOADED_FIELD] = str(time.time() + 60).encode()
+    revocations["fields"][token_digest("token-a").hex()] = str(time.time() - 1).encode()
+    assert await auth_middleware.is_token_blacklisted("token-a", db="db") is False
+    assert revocations["postgres_lookups"] == 0
+
+
+@pytest.mark.parametrize("loaded_until", [None, time.time() - 1])
+async def test_incomplete_cache_falls_through_to_postgres(revocations, loaded_until):
+    # Marker missing (evicted, Redis restarted) or expired
+    if loaded_until is not None:
+        revocations["fields"][REVOCATIONS_LOADED_FIELD] = str(loaded_until).encode()
+    assert await auth_middleware.is_token_blacklisted("token-a", db="db") is False
+    assert revocations["postgres_lookups"] == 1
+
+
+async def test_redis_unavailable_falls_through_to_postgres(revocations):
+    revocations["available"] = False
+    assert await auth_middleware.is_token_blacklisted("token-a", db="db") is False
+    assert revocations["postgres_lookups"] == 1
+
+
+async def test_failed_revocation_write_drops_loaded_marker(monkeypatch):
+    deleted = []
+
+    async def fake_set(key, mapping):
+        return False
+
+    async def fake_delete(key, *fields):
+        deleted.append((key, fields))
+        return True
+
+    async def fake_publish(channel, message):
+        pass
+
+    monkeypatch.setattr(auth_middleware, "cache_hash_set", fake_set)
+    monkeypatch.setattr(auth_middleware, "cache_hash_delete", fake_delete)
+    monkeypatch.setattr(auth_middleware, "cache_publish", fake_publish)
+    monkeypatch.setattr(auth_middleware, "_revocation_share_failed", False)
+
+    await auth_middleware._share_revocation(token_digest("token-a"), 60)
+    assert deleted == [(REVOCATIONS_KEY, (REVOCATIONS_LOADED_FIELD,))]
+    assert auth_middleware._revocation_share_failed is True
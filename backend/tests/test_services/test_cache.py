@@ -0,0 +1,34 @@
+"""Tests for the cached_json decorator."""
+import asyncio
+
+from src.services import cache
+
+
+async def test_cached_json_waiters_get_independent_copies(monkeypatch):
+    # Redis unavailable: concurrent calls are still shared in-process
+    monkeypatch.setattr(cache, "get_redis_client", lambda: None)
+    release = asyncio.Event()
+    calls = 0
+
+    @cache.cached_json("test-single-flight")
+    async def compute(value):
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"v": value}
+
+    async def owner():
+        result = await compute(1)
+        result["owner_only"] = True  # Mutated before the joiner gets to run
+        return result
+
+    owner_task = asyncio.ensure_future(owner())
+    await asyncio.sleep(0)
+    joiner_task = asyncio.ensure_future(compute(1))
+    await asyncio.sleep(0)
+    release.set()
+
+    owner_result, joiner_result = await asyncio.gather(owner_task, joiner_task)
+    assert calls == 1
+    assert owner_result == {"v": 1, "owner_only": True}
+    assert joiner_result == {"v": 1}
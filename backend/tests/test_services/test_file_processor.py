@@ -0,0 +1,42 @@
+import PyPDF2
+from src.services.file_processor import extract_text_from_pdf
+
+
+def _write_pdf(path, lines):
+    """Write a minimal PDF with one text line per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>"]
+    page_ids = [4 + 2 * i for i in range(len(lines))]
+    objects.append(f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(lines)} >>")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for page_id, line in zip(page_ids, lines):
+        stream = f"BT /F1 12 Tf 72 720 Td ({line}) Tj ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    path.write_bytes(out)
+
+
+def test_extract_text_from_pdf_uses_pdfplumber(tmp_path, monkeypatch):
+    # The PyPDF2 fallback must not be needed for a plain text PDF
+    def fail(*args, **kwargs):
+        raise AssertionError("fell back to PyPDF2")
+    monkeypatch.setattr(PyPDF2, "PdfReader", fail)
+
+    pdf_path = tmp_path / "resume.pdf"
+    _write_pdf(pdf_path, ["Jane Doe Python Engineer", "Skills SQL FastAPI"])
+
+    text = extract_text_from_pdf(str(pdf_path))
+    assert "Jane Doe Python Engineer" in text
+    assert "Skills SQL FastAPI" in text
@@ -0,0 +1,24 @@
+"""Tests for batch scoring in the matching engine."""
+from src.services.matching_engine import (
+    batch_skill_scores, batch_traditional_scores, calculate_skill_match, calculate_traditional_score
+)
+
+
+def test_batch_skill_scores_match_single_scores():
+    required = ["Python", "AWS", "Palo Alto Threat Protection"]
+    candidates = [["python", "aws lambda"], ["Palo Alto"], [], ["JavaScript"]]
+    assert batch_skill_scores(candidates, required) == [
+        calculate_skill_match(skills, required) for skills in candidates
+    ]
+
+
+def test_batch_traditional_scores_skip_unreadable_skills():
+    # Skills from GPT JSON may contain non-strings; only that candidate is dropped
+    jd = {"required_skills": ["Python"], "keywords": ["fastapi"], "min_experience_years": 2}
+    good = {"skills": ["Python"], "experience_years": 3, "raw_text": "FastAPI services"}
+    bad = {"skills": ["Python", {"name": "SQL"}, 5], "experience_years": 3, "raw_text": ""}
+
+    scores = batch_traditional_scores([good, bad, good], jd)
+
+    assert scores[1] is None
+    assert scores[0] == scores[2] == calculate_traditional_score(good, jd)
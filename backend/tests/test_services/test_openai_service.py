@@ -0,0 +1,70 @@
+"""Tests for batched resume parsing."""
+from types import SimpleNamespace
+
+import orjson
+import pytest
+
+from src.services import openai_service
+
+
+class _FakeCompletions:
+    def __init__(self, payload):
+        self.payload = payload
+        self.calls = []
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        message = SimpleNamespace(content=orjson.dumps(self.payload).decode())
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+
+@pytest.fixture
+def batch_env(monkeypatch):
+    """Skip Redis and allow batches of two resumes."""
+    async def cache_miss(key):
+        return None
+
+    async def cache_store(key, value, ttl):
+        pass
+
+    monkeypatch.setattr(openai_service, "cache_get_json", cache_miss)
+    monkeypatch.setattr(openai_service, "cache_set_json", cache_store)
+    monkeypatch.setattr(openai_service, "MAX_PARSE_BATCH_SIZE", 2)
+
+    def use_payload(payload):
+        completions = _FakeCompletions(payload)
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        monkeypatch.setattr(openai_service, "get_openai_client", lambda: client)
+        return completions
+    return use_payload
+
+
+async def test_parse_resumes_batch_unpacks_results_in_order(batch_env):
+    completions = batch_env({"results": [
+        {"resume_candidate_name": "Ann", "all_skills": ["Python ", "python"]},
+        {"resume_candidate_name": "Bob"},
+    ]})
+
+    results = await openai_service.parse_resumes_batch(["resume one", "resume two"], batch_size=2)
+
+    assert len(completions.calls) == 1
+    assert completions.calls[0]["max_tokens"] <= openai_service.OPENAI_MAX_TOKENS
+    assert [r["resume_candidate_name"] for r in results] == ["Ann", "Bob"]
+    assert results[0]["all_skills"] == ["python"]
+    assert results[1]["resume_role"] == "Not mentioned"
+
+
+async def test_parse_resumes_batch_falls_back_to_single_parses(batch_env, monkeypatch):
+    # One result for two resumes can't be unpacked, so each resume is parsed on its own
+    batch_env({"results": [{"resume_candidate_name": "Ann"}]})
+    error = ValueError("unparseable")
+
+    async def parse_one(text):
+        if text == "bad resume":
+            raise error
+        return {"resume_candidate_name": text}
+    monkeypatch.setattr(openai_service, "parse_resume_with_gpt", parse_one)
+
+    results = await openai_service.parse_resumes_batch(["good resume", "bad resume"], batch_size=2)
+
+    assert results == [{"resume_candidate_name": "good resume"}, error]